@@ -3,12 +3,17 @@ Internal Cron Endpoints - Not user-facing.
 These endpoints are called by external schedulers (cron jobs).
 """
 
-from fastapi import APIRouter, Depends, Header, HTTPException
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
 from app.db.session import get_db
+from app.core.events import stage_write
 from app.core.config import settings
+from app.features.occupancy.service import OccupancyService
 
 router = APIRouter(tags=["cron"])
 
@@ -29,34 +34,69 @@ def update_tenant_status(
 ):
     """
     Update tenant status from 'aktif' to 'telat' if they haven't paid rent
-    for the current month.
+    for the current month. Each change is recorded in tenant_status_history.
     
     This is idempotent and safe to run repeatedly.
     Requires X-Cron-Key header for authentication.
     """
     result = db.execute(text("""
-        UPDATE tenants t
-        SET status = 'telat'
-        WHERE
-            t.end_date IS NULL
-            AND t.status = 'aktif'
-            AND t.is_active = true
-            AND current_date > t.start_date + interval '1 month'
-            AND NOT EXISTS (
-                SELECT 1
-                FROM transactions tr
-                WHERE
-                    tr.tenant_id = t.id
-                    AND tr.financial_class = 'REVENUE'
-                    AND tr.is_frozen = false
-                    AND tr.category = 'rent'
-                    AND date_trunc('month', tr.transaction_date)
-                        = date_trunc('month', current_date)
-            )
+        WITH updated AS (
+            UPDATE tenants t
+            SET status = 'telat'
+            WHERE
+                t.end_date IS NULL
+                AND t.status = 'aktif'
+                AND t.is_active = true
+                AND current_date > t.start_date + interval '1 month'
+                AND NOT EXISTS (
+                    SELECT 1
+                    FROM transactions tr
+                    WHERE
+                        tr.tenant_id = t.id
+                        AND tr.financial_class = 'REVENUE'
+                        AND tr.is_frozen = false
+                        AND tr.category = 'rent'
+                        AND date_trunc('month', tr.transaction_date)
+                            = date_trunc('month', current_date)
+                )
+            RETURNING t.id, t.kost_id
+        )
+        INSERT INTO tenant_status_history
+            (tenant_id, kost_id, from_status, to_status, from_active, to_active, source, changed_at)
+        SELECT id, kost_id, 'aktif', 'telat', true, true, 'cron', now()
+        FROM updated
     """))
 
+    if result.rowcount:
+        # Statuses may change in any region.
+        stage_write(db, "tenant")
     db.commit()
 
     return {
         "updated": result.rowcount
     }
+
+
+@router.post("/occupancy-snapshot")
+def build_occupancy_snapshot(
+    snapshot_date: Optional[date] = Query(None, description="Day to snapshot (default: yesterday)"),
+    db: Session = Depends(get_db),
+    _: bool = Depends(verify_cron_secret)
+):
+    """
+    Build the per-kost occupancy snapshot for the end of a day from
+    tenant_status_history.
+
+    Idempotent: re-running overwrites that day's rows.
+    Requires X-Cron-Key header for authentication.
+    """
+    snapshot_date = snapshot_date or date.today() - timedelta(days=1)
+    rows = OccupancyService(db).build_snapshot(snapshot_date)
+    # Stats and occupancy charts read snapshots; drop cached/validated copies.
+    stage_write(db, "occupancy")
+    db.commit()
+
+    return {
+        "snapshot_date": snapshot_date.isoformat(),
+        "kosts": rows,
+    }
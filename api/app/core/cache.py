@@ -0,0 +1,148 @@
+"""
+In-process TTL/LRU cache with single-flight computation and stale serving.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Entry:
+    __slots__ = ("value", "fresh_until", "stale_until")
+
+    def __init__(self, value: Any, fresh_until: float, stale_until: float):
+        self.value = value
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+
+
+class _Flight:
+    """A computation in progress; concurrent callers wait on it."""
+    __slots__ = ("done", "value", "error", "invalidated")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+        self.invalidated = False
+
+
+class TTLCache:
+    """
+    Thread-safe cache for expensive computations.
+
+    - Entries are fresh for `ttl_seconds`, then may be served stale for
+      `stale_seconds` more while one caller recomputes them.
+    - Concurrent misses for the same key share one computation (single-flight).
+    - At most `max_entries` entries are kept; the least recently used is evicted.
+    - `invalidate` drops entries immediately (they are never served stale).
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 30, stale_seconds: float = 0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._counters = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "refreshes": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for `key`, computing it at most once concurrently."""
+        with self._lock:
+            now = self._clock()
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.fresh_until:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return entry.value
+
+            usable_stale = entry is not None and now < entry.stale_until
+            flight = self._inflight.get(key)
+            if flight is not None:
+                if usable_stale:
+                    self._counters["stale_hits"] += 1
+                    return entry.value
+                self._counters["coalesced"] += 1
+                leader = False
+            else:
+                flight = _Flight()
+                self._inflight[key] = flight
+                self._counters["refreshes" if usable_stale else "misses"] += 1
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            value = compute()
+        except BaseException as exc:
+            with self._lock:
+                self._release(key, flight)
+            flight.error = exc
+            flight.done.set()
+            raise
+
+        with self._lock:
+            self._release(key, flight)
+            if not flight.invalidated:
+                now = self._clock()
+                self._entries[key] = _Entry(
+                    value,
+                    fresh_until=now + self.ttl_seconds,
+                    stale_until=now + self.ttl_seconds + self.stale_seconds,
+                )
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._counters["evictions"] += 1
+        flight.value = value
+        flight.done.set()
+        return value
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches `predicate`. Returns the number dropped."""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            # Results of computations already running may predate the write:
+            # detach them so later callers start a new computation, and flag
+            # them so their leaders do not store the result.
+            for key in [key for key in self._inflight if predicate(key)]:
+                self._inflight.pop(key).invalidated = True
+            self._counters["invalidations"] += len(keys)
+            return len(keys)
+
+    def _release(self, key: Hashable, flight: _Flight) -> None:
+        # The key may already belong to a newer flight if this one was invalidated.
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+
+    def clear(self) -> None:
+        self.invalidate(lambda key: True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["stale_hits"] + self._counters["misses"] + self._counters["refreshes"]
+            hit_count = self._counters["hits"] + self._counters["stale_hits"]
+            return {
+                **self._counters,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_rate": round(hit_count / lookups, 4) if lookups else 0.0,
+            }
@@ -53,6 +53,51 @@ class Settings(BaseSettings):
     # Cron Authentication
     CRON_SECRET: str = ""
 
+    # Dashboard response cache (per process)
+    DASHBOARD_CACHE_ENABLED: bool = True
+    DASHBOARD_CACHE_TTL_SECONDS: float = 30
+    # Expired entries may be served this much longer while one request refreshes them
+    DASHBOARD_CACHE_STALE_SECONDS: float = 120
+    DASHBOARD_CACHE_MAX_ENTRIES: int = 512
+
+    # Dashboard summary: "parallel" runs stats/trend/DP parts on separate sessions
+    # (the request session is released first; size the DB pool for the fan-out)
+    DASHBOARD_SUMMARY_MODE: str = "serial"
+    # Max summary parts running at once across all requests (extra pooled connections)
+    DASHBOARD_FANOUT_LIMIT: int = 6
+
+    # Dashboard SSE stream (per process): queued deltas per client before it must resync
+    DASHBOARD_STREAM_QUEUE_SIZE: int = 100
+    DASHBOARD_STREAM_HEARTBEAT_SECONDS: float = 15
+
+    # Cached totals of paged lists (per process), dropped on writes to their scope
+    LIST_TOTAL_CACHE_TTL_SECONDS: float = 300
+    LIST_TOTAL_CACHE_MAX_ENTRIES: int = 1024
+
+    # Sheets of multi-type exports fetched at once across all exports (each uses a pooled connection)
+    EXPORT_SHEET_CONCURRENCY: int = 4
+    # XLSX column widths are sized from the header plus this many leading rows (0: header only)
+    EXPORT_XLSX_WIDTH_SAMPLE_ROWS: int = 200
+
+    # Finished export files reused while the exported data is unchanged
+    EXPORT_CACHE_ENABLED: bool = True
+    EXPORT_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    # Directory for cached export files (default: <system temp>/kost-export-cache)
+    EXPORT_CACHE_DIR: str = ""
+
+    # Delta exports stop this far behind database time, so rows from transactions
+    # still in flight are picked up by the next export instead of being skipped
+    EXPORT_DELTA_SETTLE_SECONDS: int = 60
+
+    # Background export jobs (per process)
+    EXPORT_JOB_WORKERS: int = 2
+    # Jobs queued or running at once; further submissions are rejected
+    EXPORT_JOB_MAX_PENDING: int = 20
+    # Finished files are deleted this long after completion
+    EXPORT_JOB_TTL_SECONDS: float = 3600
+    # Directory for job files (default: <system temp>/kost-exports)
+    EXPORT_JOB_DIR: str = ""
+
     @field_validator("CORS_ORIGINS", mode="before")
     @classmethod
     def parse_cors_origins(cls, v: Union[str, List[str]]) -> List[str]:
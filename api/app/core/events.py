@@ -0,0 +1,93 @@
+"""
+Write notifications.
+
+Write paths stage a WriteEvent on their DB session. Staged events are delivered
+to subscribers only after that session commits, and are dropped on rollback,
+so listeners (caches, streams) never observe uncommitted data.
+"""
+
+import logging
+from datetime import date
+from typing import Callable, Iterable, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "pending_write_events"
+
+
+class WriteEvent(NamedTuple):
+    """A committed write to tenants, transactions, kosts or regions."""
+    entity: str  # transaction, tenant, kost, occupancy, region
+    region_id: Optional[UUID] = None  # None together with kost_id=None means "any region"
+    kost_id: Optional[UUID] = None
+    tenant_id: Optional[UUID] = None
+    transaction_date: Optional[date] = None
+    tenant_ids: Tuple[UUID, ...] = ()  # Every tenant written; tenant_id alone for single writes
+
+    @property
+    def is_global(self) -> bool:
+        return self.region_id is None and self.kost_id is None
+
+
+WriteListener = Callable[[WriteEvent], None]
+
+_subscribers: List[WriteListener] = []
+
+
+def subscribe(listener: WriteListener) -> WriteListener:
+    """Register a listener for committed writes. Usable as a decorator."""
+    _subscribers.append(listener)
+    return listener
+
+
+def stage_write(
+    db: Session,
+    entity: str,
+    region_id: Optional[UUID] = None,
+    kost_id: Optional[UUID] = None,
+    tenant_id: Optional[UUID] = None,
+    transaction_date: Optional[date] = None,
+    tenant_ids: Iterable[UUID] = (),
+) -> None:
+    """
+    Stage a write event; it is published when `db` commits.
+
+    Batch writes pass `tenant_ids` instead of `tenant_id`, so one event covers
+    every tenant they touched.
+    """
+    tenant_ids = tuple(tenant_ids) or ((tenant_id,) if tenant_id else ())
+    db.info.setdefault(_PENDING_KEY, []).append(
+        WriteEvent(
+            entity=entity,
+            region_id=region_id,
+            kost_id=kost_id,
+            tenant_id=tenant_id,
+            transaction_date=transaction_date,
+            tenant_ids=tenant_ids,
+        )
+    )
+
+
+def pending_writes(session: Session) -> List[WriteEvent]:
+    """Write events staged on `session` and not yet committed."""
+    return list(session.info.get(_PENDING_KEY, ()))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    for write in session.info.pop(_PENDING_KEY, []):
+        for listener in list(_subscribers):
+            try:
+                listener(write)
+            except Exception:
+                logger.exception("Write listener %r failed", listener)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,88 @@
+"""
+Conditional GET support (ETag / Last-Modified) backed by data versions.
+"""
+
+import hashlib
+from datetime import date, datetime, time, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import List, Optional
+from uuid import UUID
+
+from fastapi import Request, Response, status
+from sqlalchemy.orm import Session
+
+from app.features.versions.service import DataVersionService
+
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/"x" matches "x".
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def _not_modified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+
+def check_not_modified(
+    request: Request,
+    response: Response,
+    db: Session,
+    kost_id: UUID = None,
+    region_id: UUID = None,
+    region_ids: Optional[List[UUID]] = None,
+    daily: bool = False,
+) -> Optional[Response]:
+    """
+    Validate a GET against the scope's data version.
+
+    Returns a 304 response when the client's copy is current; otherwise sets
+    ETag/Last-Modified on `response` and returns None. Call it before any
+    service query. `daily` marks responses that also depend on today's date.
+    """
+    version, updated_at = DataVersionService(db).current(kost_id=kost_id, region_id=region_id, region_ids=region_ids)
+
+    # The resolved scope is part of the tag: two users can send the same URL
+    # but be limited to different regions.
+    parts = [
+        request.url.path,
+        "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items())),
+        str(kost_id),
+        str(region_id),
+        ",".join(sorted(str(r) for r in region_ids)) if region_ids is not None else "*",
+        str(version),
+    ]
+    last_modified = updated_at
+    if daily:
+        today = date.today()
+        parts.append(today.isoformat())
+        midnight = datetime.combine(today, time.min).astimezone()
+        last_modified = max(last_modified, midnight) if last_modified else midnight
+
+    etag = 'W/"' + hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:20] + '"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        fresh = _etag_matches(if_none_match, etag)
+    else:
+        fresh = bool(if_modified_since and last_modified and _not_modified_since(if_modified_since, last_modified))
+
+    if fresh:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,27 @@
+"""
+Opaque cursor helpers for keyset pagination.
+"""
+
+import base64
+import json
+from typing import Any, Dict
+
+from app.core.exceptions import BadRequestException
+
+
+def encode_cursor(payload: Dict[str, Any]) -> str:
+    """Encode a JSON-serializable payload as a URL-safe cursor string."""
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a cursor produced by encode_cursor. Raises 400 on malformed input."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise BadRequestException(detail="Invalid cursor")
+    if not isinstance(payload, dict):
+        raise BadRequestException(detail="Invalid cursor")
+    return payload
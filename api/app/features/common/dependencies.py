@@ -2,7 +2,7 @@
 Common dependencies for features.
 """
 
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 from fastapi import Depends, HTTPException, status, Query
@@ -52,3 +52,52 @@ async def get_current_user_region(
     if region_id and region_id in assigned_ids:
         return region_id
     return assigned_ids[0]
+
+
+async def get_current_user_regions(
+    region_id: Optional[UUID] = Query(None, description="Limit to one region"),
+    firebase_uid: str = Depends(get_current_firebase_uid),
+    db: Session = Depends(get_db),
+) -> Optional[List[UUID]]:
+    """
+    Get every region the current user can see.
+
+    Logic:
+    - If user is OWNER: [region_id] when provided, otherwise None (all regions).
+    - If user is NOT OWNER: the assigned regions, or just region_id when it is
+      one of them.
+    """
+    user_service = UserProfileService(db)
+    profile = user_service.get_by_firebase_uid(firebase_uid)
+
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User profile not found."
+        )
+
+    if profile.role == "owner":
+        return [region_id] if region_id else None
+
+    assigned_ids = [
+        r.region_id
+        for r in db.query(UserRegion.region_id).filter(UserRegion.user_id == profile.id).all()
+    ]
+    if region_id and region_id in assigned_ids:
+        return [region_id]
+    return assigned_ids
+
+
+async def get_streaming_user_region(
+    region_id: Optional[UUID] = Depends(get_current_user_region),
+    db: Session = Depends(get_db),
+) -> Optional[UUID]:
+    """
+    get_current_user_region for streaming endpoints.
+
+    The request session is closed as soon as the region is known; otherwise
+    get_db would keep its pooled connection (idle in transaction) until the
+    response finished streaming.
+    """
+    db.close()
+    return region_id
@@ -0,0 +1,53 @@
+"""
+Cached list totals.
+
+Exact counts of a filtered list re-scan the whole filtered set, so paged list
+endpoints take their total from here. Entries are keyed by (scope, list,
+filters) and dropped when a committed write touches their scope, like the
+dashboard cache.
+"""
+
+from typing import Callable, Hashable, Optional, Tuple
+from uuid import UUID
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.events import WriteEvent, subscribe
+
+
+list_totals = TTLCache(
+    max_entries=settings.LIST_TOTAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.LIST_TOTAL_CACHE_TTL_SECONDS,
+)
+
+
+def _scope(kost_id: Optional[UUID], region_id: Optional[UUID]) -> Tuple:
+    if kost_id:
+        return ("kost", kost_id)
+    if region_id:
+        return ("region", region_id)
+    return ("all",)
+
+
+def cached_total(
+    name: str,
+    compute: Callable[[], int],
+    kost_id: Optional[UUID] = None,
+    region_id: Optional[UUID] = None,
+    filters: Hashable = None,
+) -> int:
+    """Total rows of a list, counted at most once per scope and filters until a write."""
+    key = (_scope(kost_id, region_id), name, region_id, filters)
+    return list_totals.get_or_compute(key, compute)
+
+
+@subscribe
+def _invalidate_on_write(write: WriteEvent) -> None:
+    if write.is_global or write.region_id is None:
+        list_totals.clear()
+        return
+
+    touched = {("all",), ("region", write.region_id)}
+    if write.kost_id:
+        touched.add(("kost", write.kost_id))
+    list_totals.invalidate(lambda key: key[0] in touched)
@@ -0,0 +1,320 @@
+"""
+Dashboard bucketing engine - aggregates ledger totals for a whole bucket set in one query.
+
+Totals are read from the ledger_daily rollup, so the cost depends on the number
+of days in the range, not on the number of transactions.
+"""
+
+from datetime import date, timedelta
+import calendar
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import Date, DateTime, Integer, and_, cast, column, func, literal_column, or_, select, values
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import FromClause
+
+from app.core.exceptions import BadRequestException
+from app.features.ledger.model import LedgerDaily
+
+
+# Month abbreviations in Indonesian
+MONTH_ABBR = ["Jan", "Feb", "Mar", "Apr", "Mei", "Jun",
+              "Jul", "Agu", "Sep", "Okt", "Nov", "Des"]
+
+GRANULARITY_DAY = "day"
+GRANULARITY_WEEK = "week"
+GRANULARITY_MONTH = "month"
+GRANULARITY_CUSTOM = "custom"
+
+COMPARE_PREVIOUS_PERIOD = "previous_period"
+COMPARE_PREVIOUS_YEAR = "previous_year"
+
+# Upper bound on buckets for an explicit start/end range
+MAX_BUCKETS = 400
+
+# generate_series step and inclusive bucket length per granularity
+_SERIES_STEP = {
+    GRANULARITY_DAY: ("interval '1 day'", "interval '0 days'"),
+    GRANULARITY_WEEK: ("interval '7 days'", "interval '6 days'"),
+    GRANULARITY_MONTH: ("interval '1 month'", "interval '1 month' - interval '1 day'"),
+}
+
+
+class Bucket(NamedTuple):
+    """Totals for a single time bucket."""
+    index: int
+    anchor: date  # Unclamped series value (week Monday / first of month)
+    start: date
+    end: date
+    revenue: int  # REVENUE, not frozen
+    fee_offset: int  # EXPENSE linked to a rent payment (extra fees)
+    linked_total: int  # Any row linked to a rent payment
+    expense: int  # All EXPENSE
+    previous_revenue: int = 0  # Same totals over the comparison range, if any
+    previous_fee_offset: int = 0
+    previous_linked_total: int = 0
+    previous_expense: int = 0
+
+
+class CompareShift(NamedTuple):
+    """How far back the comparison range lies (months first, then days)."""
+    months: int = 0
+    days: int = 0
+
+
+def resolve_period(period: str, today: Optional[date] = None) -> Tuple[date, date, str]:
+    """Return (start_date, end_date, label) for the current month, semester or year."""
+    today = today or date.today()
+
+    if period == "month":
+        start_date = today.replace(day=1)
+        end_date = today.replace(day=calendar.monthrange(today.year, today.month)[1])
+        label = f"Bulan {MONTH_ABBR[today.month - 1]} {today.year}"
+    elif period == "semester":
+        if today.month <= 6:
+            start_date = today.replace(month=1, day=1)
+            end_date = today.replace(month=6, day=30)
+            label = f"Semester 1 {today.year}"
+        else:
+            start_date = today.replace(month=7, day=1)
+            end_date = today.replace(month=12, day=31)
+            label = f"Semester 2 {today.year}"
+    else:  # year
+        start_date = today.replace(month=1, day=1)
+        end_date = today.replace(month=12, day=31)
+        label = f"Tahun {today.year}"
+
+    return start_date, end_date, label
+
+
+def date_label(value: date) -> str:
+    return f"{value.day} {MONTH_ABBR[value.month - 1]} {value.year}"
+
+
+def resolve_range(
+    period: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    granularity: Optional[str] = None,
+) -> Tuple[date, date, str, Optional[str]]:
+    """
+    Return (start_date, end_date, label, granularity).
+
+    Without start/end this is the current period and granularity is None
+    (the endpoint's own default bucketing). With an explicit range the
+    granularity defaults to day, week or month depending on its length.
+    """
+    if start is None and end is None:
+        start_date, end_date, label = resolve_period(period)
+        return start_date, end_date, label, granularity
+
+    if start is None or end is None:
+        raise BadRequestException("start and end must be given together")
+    if start > end:
+        raise BadRequestException("start must not be after end")
+
+    days = (end - start).days + 1
+    if granularity is None:
+        if days <= 31:
+            granularity = GRANULARITY_DAY
+        elif days <= 190:
+            granularity = GRANULARITY_WEEK
+        else:
+            granularity = GRANULARITY_MONTH
+
+    bucket_count = {
+        GRANULARITY_DAY: days,
+        GRANULARITY_WEEK: days // 7 + 2,
+        GRANULARITY_MONTH: (end.year - start.year) * 12 + end.month - start.month + 1,
+    }[granularity]
+    if bucket_count > MAX_BUCKETS:
+        raise BadRequestException(f"Range too large for {granularity} granularity (max {MAX_BUCKETS} buckets)")
+
+    return start, end, f"{date_label(start)} - {date_label(end)}", granularity
+
+
+def _is_whole_months(start: date, end: date) -> bool:
+    return start.day == 1 and end.day == calendar.monthrange(end.year, end.month)[1]
+
+
+def compare_shift(compare_to: Optional[str], start_date: date, end_date: date) -> Optional[CompareShift]:
+    """
+    Offset of the comparison range.
+
+    - previous_year: the same dates one year earlier
+    - previous_period: the range of equal length right before; whole-month
+      ranges shift by whole months so buckets stay aligned to months
+    """
+    if compare_to is None:
+        return None
+    if compare_to == COMPARE_PREVIOUS_YEAR:
+        return CompareShift(months=12)
+    if _is_whole_months(start_date, end_date):
+        months = (end_date.year - start_date.year) * 12 + end_date.month - start_date.month + 1
+        return CompareShift(months=months)
+    return CompareShift(days=(end_date - start_date).days + 1)
+
+
+def _shift_back(value: date, shift: CompareShift) -> date:
+    month_index = value.year * 12 + value.month - 1 - shift.months
+    year, month = divmod(month_index, 12)
+    day = min(value.day, calendar.monthrange(year, month + 1)[1])
+    return date(year, month + 1, day) - timedelta(days=shift.days)
+
+
+def shifted_range(start_date: date, end_date: date, shift: CompareShift) -> Tuple[date, date]:
+    """Comparison range for [start_date, end_date]; mirrors the SQL bucket shift."""
+    return _shift_back(start_date, shift), _shift_back(end_date + timedelta(days=1), shift) - timedelta(days=1)
+
+
+def bucket_label(granularity: str, anchor: date) -> str:
+    """Label a series bucket by its anchor date."""
+    if granularity == GRANULARITY_DAY:
+        return f"{anchor.day} {MONTH_ABBR[anchor.month - 1]}"
+    if granularity == GRANULARITY_MONTH:
+        return f"{MONTH_ABBR[anchor.month - 1]} {anchor.year}"
+    return week_label(anchor)
+
+
+def week_label(anchor: date) -> str:
+    """Label a week bucket as '<Mon> W<n>' based on its Monday."""
+    week_of_month = (anchor.day - 1) // 7 + 1
+    return f"{MONTH_ABBR[anchor.month - 1]} W{week_of_month}"
+
+
+class BucketAggregator:
+    """Computes revenue, fee-offset and expense totals for every bucket in one grouped query."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @staticmethod
+    def _series_buckets(granularity: str, start_date: date, end_date: date) -> FromClause:
+        """Bucket set built with generate_series, clamped to [start_date, end_date]."""
+        step, length = _SERIES_STEP[granularity]
+        if granularity == GRANULARITY_DAY:
+            first = start_date
+        elif granularity == GRANULARITY_WEEK:
+            first = start_date - timedelta(days=start_date.weekday())  # Monday
+        else:
+            first = start_date.replace(day=1)
+
+        series = (
+            func.generate_series(
+                cast(first, DateTime),
+                cast(end_date, DateTime),
+                literal_column(step),
+            )
+            .table_valued("value", with_ordinality="idx")
+            .render_derived(name="series")
+        )
+        anchor = cast(series.c.value, Date)
+        return select(
+            series.c.idx.label("idx"),
+            anchor.label("anchor"),
+            func.greatest(anchor, start_date).label("bucket_start"),
+            func.least(cast(series.c.value + literal_column(length), Date), end_date).label("bucket_end"),
+        ).subquery("buckets")
+
+    @staticmethod
+    def _custom_buckets(ranges: Sequence[Tuple[date, date]]) -> FromClause:
+        """Bucket set from explicit (start, end) ranges."""
+        return values(
+            column("idx", Integer),
+            column("anchor", Date),
+            column("bucket_start", Date),
+            column("bucket_end", Date),
+            name="buckets",
+        ).data([(idx, start, start, end) for idx, (start, end) in enumerate(ranges, start=1)])
+
+    def aggregate(
+        self,
+        start_date: date = None,
+        end_date: date = None,
+        granularity: str = GRANULARITY_WEEK,
+        ranges: Optional[Sequence[Tuple[date, date]]] = None,
+        kost_id: UUID = None,
+        region_id: UUID = None,
+        kost_only: bool = False,
+        shift: Optional[CompareShift] = None,
+    ) -> List[Bucket]:
+        """
+        Aggregate totals per bucket.
+
+        - day/week/month: buckets come from generate_series over [start_date, end_date]
+        - custom: buckets are the given (start, end) ranges
+        - kost_only: ignore region-level rows that have no kost
+        - shift: also total each bucket's comparison range (previous_* fields),
+          scanned together with the current range in the same query
+        """
+        if granularity == GRANULARITY_CUSTOM:
+            if not ranges:
+                return []
+            buckets = self._custom_buckets(ranges)
+        else:
+            buckets = self._series_buckets(granularity, start_date, end_date)
+
+        in_current = and_(
+            LedgerDaily.ledger_date >= buckets.c.bucket_start,
+            LedgerDaily.ledger_date <= buckets.c.bucket_end,
+        )
+        if shift:
+            offset = func.make_interval(0, shift.months, 0, 0)
+            one_day = literal_column("interval '1 day'")
+            previous_start = cast(buckets.c.bucket_start - offset, Date) - shift.days
+            previous_end = cast(buckets.c.bucket_end + one_day - offset, Date) - (shift.days + 1)
+            in_previous = and_(
+                LedgerDaily.ledger_date >= previous_start,
+                LedgerDaily.ledger_date <= previous_end,
+            )
+            join_conditions = [or_(in_current, in_previous)]
+        else:
+            join_conditions = [in_current]
+        if kost_id:
+            join_conditions.append(LedgerDaily.kost_id == kost_id)
+        elif region_id:
+            join_conditions.append(LedgerDaily.region_id == region_id)
+        if kost_only:
+            join_conditions.append(LedgerDaily.kost_id.isnot(None))
+
+        def total(*conditions):
+            return func.coalesce(func.sum(LedgerDaily.amount).filter(and_(*conditions)), 0)
+
+        def totals(window, prefix=""):
+            # Without a comparison every joined row is in the current range.
+            scope = [window] if shift else []
+            return [
+                total(
+                    *scope,
+                    LedgerDaily.financial_class == "REVENUE",
+                    LedgerDaily.is_frozen == False,
+                ).label(f"{prefix}revenue"),
+                total(
+                    *scope,
+                    LedgerDaily.financial_class == "EXPENSE",
+                    LedgerDaily.is_linked == True,
+                ).label(f"{prefix}fee_offset"),
+                total(*scope, LedgerDaily.is_linked == True).label(f"{prefix}linked_total"),
+                total(*scope, LedgerDaily.financial_class == "EXPENSE").label(f"{prefix}expense"),
+            ]
+
+        columns = totals(in_current)
+        if shift:
+            columns += totals(in_previous, prefix="previous_")
+
+        stmt = (
+            select(
+                buckets.c.idx,
+                buckets.c.anchor,
+                buckets.c.bucket_start,
+                buckets.c.bucket_end,
+                *columns,
+            )
+            .select_from(buckets)
+            .outerjoin(LedgerDaily, and_(*join_conditions))
+            .group_by(buckets.c.idx, buckets.c.anchor, buckets.c.bucket_start, buckets.c.bucket_end)
+            .order_by(buckets.c.idx)
+        )
+
+        return [Bucket(*row) for row in self.db.execute(stmt).all()]
@@ -0,0 +1,70 @@
+"""
+Dashboard response cache.
+
+Responses are keyed by (scope, endpoint, period, today). Committed writes to
+tenants, transactions or kosts invalidate every entry whose scope they touch.
+"""
+
+from datetime import date
+from typing import Any, Callable, Hashable, Iterable, Optional, Tuple
+from uuid import UUID
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.events import WriteEvent, subscribe
+
+
+dashboard_cache = TTLCache(
+    max_entries=settings.DASHBOARD_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.DASHBOARD_CACHE_TTL_SECONDS,
+    stale_seconds=settings.DASHBOARD_CACHE_STALE_SECONDS,
+)
+
+
+def dashboard_scope(
+    kost_id: Optional[UUID] = None,
+    region_id: Optional[UUID] = None,
+    region_ids: Optional[Iterable[UUID]] = None,
+) -> Tuple:
+    """Scope a dashboard query covers: one kost, one region, a set of regions or everything."""
+    if kost_id:
+        return ("kost", kost_id)
+    if region_id:
+        return ("region", region_id)
+    if region_ids is not None:
+        return ("regions", frozenset(region_ids))
+    return ("all",)
+
+
+def cached(
+    endpoint: str,
+    compute: Callable[[], Any],
+    kost_id: Optional[UUID] = None,
+    region_id: Optional[UUID] = None,
+    period: Optional[Hashable] = None,
+    region_ids: Optional[Iterable[UUID]] = None,
+) -> Any:
+    """Serve a dashboard response from cache, computing it on miss."""
+    if not settings.DASHBOARD_CACHE_ENABLED:
+        return compute()
+    key = (dashboard_scope(kost_id, region_id, region_ids), endpoint, period, date.today())
+    return dashboard_cache.get_or_compute(key, compute)
+
+
+@subscribe
+def _invalidate_on_write(write: WriteEvent) -> None:
+    if write.is_global or write.region_id is None:
+        dashboard_cache.clear()
+        return
+
+    touched = {("all",), ("region", write.region_id)}
+    if write.kost_id:
+        touched.add(("kost", write.kost_id))
+
+    def is_touched(key) -> bool:
+        scope = key[0]
+        if scope[0] == "regions":
+            return write.region_id in scope[1]
+        return scope in touched
+
+    dashboard_cache.invalidate(is_touched)
@@ -2,85 +2,287 @@
 Dashboard router - API endpoints.
 """
 
+import asyncio
+import time
+from datetime import date
 from uuid import UUID
-from typing import Optional
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.db.session import get_db
 from app.core.auth import get_current_firebase_uid
 from app.features.users.service import UserProfileService
 from app.features.dashboard.schemas import (
+    DashboardBreakdownResponse,
     DashboardStats,
     DashboardSummaryResponse,
     IncomeTrendResponse,
+    OccupancyHistoryResponse,
     TrendBarResponse,
     TenantTrackerResponse,
 )
 from app.features.dashboard.service import DashboardService
+from app.features.dashboard.cache import cached, dashboard_cache
+from app.features.dashboard.stream import dashboard_stream
 
 router = APIRouter()
 
 
-from app.features.common.dependencies import get_current_user_region
+from app.features.common.dependencies import get_current_user_region, get_current_user_regions, get_streaming_user_region
+from app.features.common.conditional import check_not_modified
 
 
+# Endpoints are sync so concurrent requests run in the threadpool and can share
+# one computation through the dashboard cache. Each one first answers
+# conditional requests from the scope's data version (304, no service queries).
 @router.get("/stats", response_model=DashboardStats)
-async def get_dashboard_stats(
+def get_dashboard_stats(
+    request: Request,
+    response: Response,
     kost_id: Optional[UUID] = Query(None, description="Filter by kost ID"),
     region_id: Optional[UUID] = Depends(get_current_user_region),
     db: Session = Depends(get_db),
 ):
     """Get dashboard statistics (total tenants, rooms, occupancy)."""
+    not_modified = check_not_modified(request, response, db, kost_id=kost_id, region_id=region_id, daily=True)
+    if not_modified:
+        return not_modified
     service = DashboardService(db)
     # If kost_id is provided, it overrides region filtering in the service logic (or refines it)
     # But for "collective data", we pass region_id mainy.
-    return service.get_stats(kost_id=kost_id, region_id=region_id)
+    return cached(
+        "stats",
+        lambda: service.get_stats(kost_id=kost_id, region_id=region_id),
+        kost_id=kost_id,
+        region_id=region_id,
+    )
 
 
 @router.get("/summary", response_model=DashboardSummaryResponse)
-async def get_dashboard_summary(
+def get_dashboard_summary(
+    request: Request,
+    response: Response,
     kost_id: Optional[UUID] = Query(None, description="Filter by kost ID"),
+    mode: Optional[str] = Query(
+        None,
+        pattern="^(serial|parallel)$",
+        description="serial: one session; parallel: parts run concurrently (default from DASHBOARD_SUMMARY_MODE)",
+    ),
     region_id: Optional[UUID] = Depends(get_current_user_region),
     db: Session = Depends(get_db),
 ):
-    """Get bundled dashboard data."""
+    """Get bundled dashboard data. Per-part timings are returned in the Server-Timing header."""
+    not_modified = check_not_modified(request, response, db, kost_id=kost_id, region_id=region_id, daily=True)
+    if not_modified:
+        return not_modified
+    mode = mode or settings.DASHBOARD_SUMMARY_MODE
+    timings = {}
+
+    def compute():
+        started = time.perf_counter()
+        if mode == "parallel":
+            # Give the request's connection back before the parts take theirs,
+            # so waiting requests never hold one connection while needing more.
+            db.close()
+            result = DashboardService.get_summary_parallel(kost_id=kost_id, region_id=region_id, timings=timings)
+        else:
+            result = DashboardService(db).get_summary(kost_id=kost_id, region_id=region_id, timings=timings)
+        timings["total"] = (time.perf_counter() - started) * 1000
+        return result
+
+    summary = cached("summary", compute, kost_id=kost_id, region_id=region_id)
+
+    if timings:
+        response.headers["Server-Timing"] = ", ".join(
+            f"{part};dur={elapsed:.1f}" for part, elapsed in timings.items()
+        ) + f', mode;desc="{mode}"'
+    else:
+        response.headers["Server-Timing"] = 'cache;desc="hit"'
+    return summary
+
+
+@router.get("/breakdown", response_model=DashboardBreakdownResponse)
+def get_dashboard_breakdown(
+    request: Request,
+    response: Response,
+    region_ids: Optional[List[UUID]] = Depends(get_current_user_regions),
+    db: Session = Depends(get_db),
+):
+    """Get stats, net revenue and DP liabilities per region and kost in one response."""
+    not_modified = check_not_modified(request, response, db, region_ids=region_ids, daily=True)
+    if not_modified:
+        return not_modified
     service = DashboardService(db)
-    return service.get_summary(kost_id=kost_id, region_id=region_id)
+    return cached(
+        "breakdown",
+        lambda: service.get_breakdown(region_ids=region_ids),
+        region_ids=region_ids,
+    )
 
 
 @router.get("/income-trend", response_model=IncomeTrendResponse)
-async def get_income_trend(
+def get_income_trend(
+    request: Request,
+    response: Response,
     kost_id: Optional[UUID] = Query(None, description="Filter by kost ID"),
     period: str = Query("month", pattern="^(month|semester|year)$", description="Period: month, semester, or year"),
+    start: Optional[date] = Query(None, description="Range start (overrides period, requires end)"),
+    end: Optional[date] = Query(None, description="Range end, inclusive"),
+    granularity: Optional[str] = Query(None, pattern="^(day|week|month)$", description="Bucket size for a start/end range"),
+    compare_to: Optional[str] = Query(
+        None,
+        pattern="^(previous_period|previous_year)$",
+        description="Add a comparison series: previous_period or previous_year",
+    ),
     region_id: Optional[UUID] = Depends(get_current_user_region),
     db: Session = Depends(get_db),
 ):
     """Get income trend data for chart."""
+    not_modified = check_not_modified(request, response, db, kost_id=kost_id, region_id=region_id, daily=True)
+    if not_modified:
+        return not_modified
     service = DashboardService(db)
-    return service.get_income_trend(kost_id=kost_id, region_id=region_id, period=period)
+    return cached(
+        "income-trend",
+        lambda: service.get_income_trend(
+            kost_id=kost_id,
+            region_id=region_id,
+            period=period,
+            start=start,
+            end=end,
+            granularity=granularity,
+            compare_to=compare_to,
+        ),
+        kost_id=kost_id,
+        region_id=region_id,
+        period=(period, start, end, granularity, compare_to),
+    )
 
 
 @router.get("/trend-bars", response_model=TrendBarResponse)
-async def get_trend_bars(
+def get_trend_bars(
+    request: Request,
+    response: Response,
     kost_id: Optional[UUID] = Query(None, description="Filter by kost ID"),
     period: str = Query("month", pattern="^(month|semester|year)$", description="Period: month, semester, or year"),
+    start: Optional[date] = Query(None, description="Range start (overrides period, requires end)"),
+    end: Optional[date] = Query(None, description="Range end, inclusive"),
+    granularity: Optional[str] = Query(None, pattern="^(day|week|month)$", description="Bucket size for a start/end range"),
+    compare_to: Optional[str] = Query(
+        None,
+        pattern="^(previous_period|previous_year)$",
+        description="Add a comparison series: previous_period or previous_year",
+    ),
     region_id: Optional[UUID] = Depends(get_current_user_region),
     db: Session = Depends(get_db),
 ):
     """Get income vs expense trend data for bar chart."""
+    not_modified = check_not_modified(request, response, db, kost_id=kost_id, region_id=region_id, daily=True)
+    if not_modified:
+        return not_modified
+    service = DashboardService(db)
+    return cached(
+        "trend-bars",
+        lambda: service.get_trend_bars(
+            kost_id=kost_id,
+            region_id=region_id,
+            period=period,
+            start=start,
+            end=end,
+            granularity=granularity,
+            compare_to=compare_to,
+        ),
+        kost_id=kost_id,
+        region_id=region_id,
+        period=(period, start, end, granularity, compare_to),
+    )
+
+
+@router.get("/occupancy-history", response_model=OccupancyHistoryResponse)
+def get_occupancy_history(
+    request: Request,
+    response: Response,
+    kost_id: Optional[UUID] = Query(None, description="Filter by kost ID"),
+    start: Optional[date] = Query(None, description="First day (default: 29 days before end)"),
+    end: Optional[date] = Query(None, description="Last day, inclusive (default: today)"),
+    region_id: Optional[UUID] = Depends(get_current_user_region),
+    db: Session = Depends(get_db),
+):
+    """Get daily occupancy points for an occupancy-over-time chart."""
+    not_modified = check_not_modified(request, response, db, kost_id=kost_id, region_id=region_id, daily=True)
+    if not_modified:
+        return not_modified
     service = DashboardService(db)
-    return service.get_trend_bars(kost_id=kost_id, region_id=region_id, period=period)
+    return cached(
+        "occupancy-history",
+        lambda: service.get_occupancy_history(kost_id=kost_id, region_id=region_id, start=start, end=end),
+        kost_id=kost_id,
+        region_id=region_id,
+        period=(start, end),
+    )
 
 
 @router.get("/tenant-tracker", response_model=TenantTrackerResponse)
-async def get_tenant_tracker(
+def get_tenant_tracker(
+    request: Request,
+    response: Response,
     kost_id: Optional[UUID] = Query(None, description="Filter by kost ID"),
-    limit: int = Query(10, ge=1, le=50, description="Number of tenants to return"),
+    limit: int = Query(10, ge=1, le=100, description="Number of tenants to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     region_id: Optional[UUID] = Depends(get_current_user_region),
     db: Session = Depends(get_db),
 ):
-    """Get tenant payment status tracker."""
+    """Get tenant payment status tracker, most urgent first, paged by cursor."""
+    not_modified = check_not_modified(request, response, db, kost_id=kost_id, region_id=region_id, daily=True)
+    if not_modified:
+        return not_modified
     service = DashboardService(db)
-    return service.get_tenant_tracker(kost_id=kost_id, region_id=region_id, limit=limit)
+    return service.get_tenant_tracker(kost_id=kost_id, region_id=region_id, limit=limit, cursor=cursor)
+
+
+@router.get("/stream")
+async def stream_dashboard(
+    request: Request,
+    kost_id: Optional[UUID] = Query(None, description="Filter by kost ID"),
+    region_id: Optional[UUID] = Depends(get_streaming_user_region),
+):
+    """
+    Server-sent events with dashboard deltas after each committed write in scope.
+
+    Events: `delta` (DashboardStreamDelta JSON) and `resync` (refetch everything).
+    Comment lines are sent as heartbeats.
+    """
+    subscriber_id, subscriber = dashboard_stream.subscribe(kost_id=kost_id, region_id=region_id)
+
+    async def events():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event, data = await asyncio.wait_for(
+                        subscriber.queue.get(), timeout=settings.DASHBOARD_STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event}\ndata: {data}\n\n"
+        finally:
+            dashboard_stream.unsubscribe(subscriber_id)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/cache-stats")
+def get_dashboard_cache_stats(
+    firebase_uid: str = Depends(get_current_firebase_uid),
+):
+    """Get dashboard cache counters (hits, misses, evictions, size) and open streams."""
+    return {**dashboard_cache.stats(), "stream_subscribers": dashboard_stream.subscriber_count()}
@@ -5,6 +5,7 @@ Dashboard schemas - Pydantic models for API responses.
 from typing import List, Optional
 from decimal import Decimal
 from datetime import date
+from uuid import UUID
 
 from pydantic import BaseModel
 
@@ -19,10 +20,36 @@ class DashboardStats(BaseModel):
     net_revenue_to_date: Decimal = 0
 
 
+class BreakdownStats(DashboardStats):
+    """Dashboard statistics plus outstanding DP for one breakdown scope."""
+    dp_total: Decimal = 0
+    dp_count: int = 0
+
+
+class KostBreakdownItem(BreakdownStats):
+    """Breakdown figures for a single kost."""
+    kost_id: UUID
+    kost_name: Optional[str] = None
+
+
+class RegionBreakdownItem(BreakdownStats):
+    """Breakdown figures for a region and each of its kosts."""
+    region_id: UUID
+    region_name: Optional[str] = None
+    kosts: List[KostBreakdownItem] = []
+
+
+class DashboardBreakdownResponse(BaseModel):
+    """Per-region and per-kost dashboard figures for everything the caller can see."""
+    totals: BreakdownStats
+    regions: List[RegionBreakdownItem]
+
+
 class IncomeTrendItem(BaseModel):
     """Single income trend data point."""
     label: str
     amount: Decimal
+    previous_amount: Optional[Decimal] = None
 
 
 class IncomeTrendResponse(BaseModel):
@@ -30,6 +57,9 @@ class IncomeTrendResponse(BaseModel):
     period: str
     items: List[IncomeTrendItem]
     total: Decimal
+    compare_to: Optional[str] = None
+    previous_period: Optional[str] = None
+    previous_total: Optional[Decimal] = None
 
 
 class TrendBarItem(BaseModel):
@@ -37,12 +67,34 @@ class TrendBarItem(BaseModel):
     label: str
     income: Decimal
     expense: Decimal
+    previous_income: Optional[Decimal] = None
+    previous_expense: Optional[Decimal] = None
 
 
 class TrendBarResponse(BaseModel):
     """Bar trend response."""
     period: str
     items: List[TrendBarItem]
+    compare_to: Optional[str] = None
+    previous_period: Optional[str] = None
+
+
+class OccupancyHistoryPoint(BaseModel):
+    """Occupancy at the end of one day."""
+    snapshot_date: date
+    total_rooms: int
+    occupied: int
+    active_tenants: int
+    occupancy_rate: float  # occupied / total_rooms, as in DashboardStats
+    dp_tenants: int
+    occupancy_rate: float
+
+
+class OccupancyHistoryResponse(BaseModel):
+    """Occupancy over time response."""
+    start: date
+    end: date
+    items: List[OccupancyHistoryPoint]
 
 
 class DashboardSummaryResponse(BaseModel):
@@ -77,3 +129,18 @@ class TenantTrackerResponse(BaseModel):
     """Tenant tracker list response."""
     items: List[TenantTrackerItem]
     total: int
+    next_cursor: Optional[str] = None
+
+
+class DashboardStreamDelta(BaseModel):
+    """Incremental dashboard update pushed on /dashboard/stream after a committed write."""
+    entity: str  # transaction, tenant, kost, occupancy, region
+    kost_id: Optional[UUID] = None
+    region_id: Optional[UUID] = None
+    stats: DashboardStats
+    # Month trend bar containing the transaction date (current month only)
+    trend_bar_index: Optional[int] = None
+    trend_bar: Optional[TrendBarItem] = None
+    # Tracker rows to merge by id; ids that left the tracker are in tracker_removed
+    tracker: List[TenantTrackerItem] = []
+    tracker_removed: List[str] = []
@@ -2,31 +2,105 @@
 Dashboard service - Business logic for dashboard endpoints.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
 import calendar
+import threading
+import time
 from decimal import Decimal
-from typing import List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional
 from uuid import UUID
 
-from sqlalchemy import func, and_
+from sqlalchemy import and_, case, func, select, true, tuple_
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.core.exceptions import BadRequestException
+from app.db.session import SessionLocal
+
 from app.features.kosts.model import Kost
 from app.features.tenants.model import Tenant
 from app.features.transactions.model import Transaction
+from app.features.ledger.model import LedgerDaily
+from app.features.regions.model import Regions
+from app.features.occupancy.model import OccupancySnapshot
+from app.features.occupancy.service import OccupancyService
+from app.features.common.cursor import decode_cursor, encode_cursor
+from app.features.dashboard.buckets import (
+    BucketAggregator,
+    GRANULARITY_CUSTOM,
+    GRANULARITY_WEEK,
+    MONTH_ABBR,
+    bucket_label,
+    compare_shift,
+    date_label,
+    resolve_range,
+    shifted_range,
+    week_label,
+)
 from app.features.dashboard.schemas import (
+    BreakdownStats,
+    DashboardBreakdownResponse,
     DashboardStats,
+    KostBreakdownItem,
+    RegionBreakdownItem,
     IncomeTrendItem,
     IncomeTrendResponse,
     TrendBarItem,
     TrendBarResponse,
     DashboardSummaryResponse,
+    OccupancyHistoryPoint,
+    OccupancyHistoryResponse,
     TenantPaymentStatus,
     TenantTrackerItem,
     TenantTrackerResponse,
 )
 
 
+# GROUPING() levels of a (region, kost) grouping set.
+BREAKDOWN_LEVEL_KOST = 0
+BREAKDOWN_LEVEL_REGION = 1
+BREAKDOWN_LEVEL_TOTAL = 3
+
+
+def _last_month_end() -> date:
+    """Reference day for tenant_change_percent: its occupancy snapshot is last month's closing count."""
+    return date.today().replace(day=1) - timedelta(days=1)
+
+
+def _stats_fields(total_rooms, occupied, total_tenants, last_month_count, net_revenue_to_date) -> dict:
+    """Derived dashboard stats shared by get_stats and get_breakdown."""
+    total_rooms = int(total_rooms or 0)
+    occupied = int(occupied or 0)
+    total_tenants = int(total_tenants or 0)
+    last_month_count = int(last_month_count or 0)
+
+    # Empty rooms = total_units - units held by active tenants (any status)
+    empty_rooms = max(0, total_rooms - occupied)
+
+    # Occupancy rate = (occupied / total) * 100
+    occupancy_rate = (occupied / total_rooms * 100) if total_rooms > 0 else 0
+
+    tenant_change = None
+    if last_month_count > 0:
+        tenant_change = round((total_tenants - last_month_count) / last_month_count * 100, 1)
+
+    return {
+        "total_tenants": total_tenants,
+        "total_rooms": total_rooms,
+        "empty_rooms": empty_rooms,
+        "occupancy_rate": round(occupancy_rate, 1),
+        "tenant_change_percent": tenant_change,
+        "net_revenue_to_date": net_revenue_to_date,
+    }
+
+
+# Tenant tracker urgency, most urgent first.
+TRACKER_RANK_LATE = 0
+TRACKER_RANK_WAITING = 1
+TRACKER_RANK_PAID = 2
+
+
 class DashboardService:
     """Service for dashboard operations."""
 
@@ -49,11 +123,14 @@ class DashboardService:
         elif region_id:
             kost_filter = [Kost.region_id == region_id]
             
-        # Get total rooms from kost.total_units
-        total_rooms_query = self.db.query(func.coalesce(func.sum(Kost.total_units), 0))
+        # Total rooms and occupied units from the kost rows (kost.active_tenants counter)
+        rooms_query = self.db.query(
+            func.coalesce(func.sum(Kost.total_units), 0),
+            func.coalesce(func.sum(Kost.active_tenants), 0),
+        )
         if kost_filter:
-            total_rooms_query = total_rooms_query.filter(*kost_filter)
-        total_rooms = total_rooms_query.scalar() or 0
+            rooms_query = rooms_query.filter(*kost_filter)
+        total_rooms, occupied = rooms_query.one()
 
         # Count active tenants
         # Join with Kost to filter by region if needed
@@ -65,235 +142,428 @@ class DashboardService:
             active_tenants_query = active_tenants_query.filter(*kost_filter)
         total_tenants = active_tenants_query.scalar() or 0
 
-        # Empty rooms = total_units - active tenants
-        empty_rooms = max(0, total_rooms - total_tenants)
-        
-        # Occupancy rate = (occupied / total) * 100
-        occupancy_rate = (total_tenants / total_rooms * 100) if total_rooms > 0 else 0
-
-        # Calculate tenant change (compare with last month)
-        last_month = date.today().replace(day=1) - timedelta(days=1)
-        last_month_start = last_month.replace(day=1)
-        
-        last_month_query = self.db.query(func.count(Tenant.id)).join(Kost, Tenant.kost_id == Kost.id).filter(
-            Tenant.status == "aktif",
-            Tenant.is_active == True,
-            Tenant.created_at < last_month_start
-        )
-        if kost_filter:
-            last_month_query = last_month_query.filter(*kost_filter)
-        last_month_count = last_month_query.scalar() or 0
-
-        tenant_change = None
-        if last_month_count > 0:
-            tenant_change = round((total_tenants - last_month_count) / last_month_count * 100, 1)
-
-        # Net revenue up to today (exclude frozen DP)
-        revenue_query = self.db.query(func.coalesce(func.sum(Transaction.amount), 0)).filter(
-            Transaction.financial_class == "REVENUE",
-            Transaction.is_frozen == False,
-            Transaction.transaction_date <= date.today(),
-        )
-        expense_query = self.db.query(func.coalesce(func.sum(Transaction.amount), 0)).filter(
-            Transaction.financial_class == "EXPENSE",
-            Transaction.transaction_date <= date.today(),
+        # Calculate tenant change (compare with last month's closing occupancy snapshot)
+        last_month_count = OccupancyService(self.db).active_tenants_on(
+            _last_month_end(), kost_id=kost_id, region_id=region_id
         )
 
+        # Net revenue up to today (exclude frozen DP), from the daily rollup
+        net_query = self.db.query(
+            func.coalesce(func.sum(LedgerDaily.amount).filter(
+                LedgerDaily.financial_class == "REVENUE",
+                LedgerDaily.is_frozen == False,
+            ), 0),
+            func.coalesce(func.sum(LedgerDaily.amount).filter(
+                LedgerDaily.financial_class == "EXPENSE",
+            ), 0),
+        ).filter(LedgerDaily.ledger_date <= date.today())
+
         if kost_id:
-            revenue_query = revenue_query.filter(Transaction.kost_id == kost_id)
-            expense_query = expense_query.filter(Transaction.kost_id == kost_id)
+            net_query = net_query.filter(LedgerDaily.kost_id == kost_id)
         elif region_id:
-            revenue_query = revenue_query.filter(Transaction.region_id == region_id)
-            expense_query = expense_query.filter(Transaction.region_id == region_id)
+            net_query = net_query.filter(LedgerDaily.region_id == region_id)
 
-        revenue_total = revenue_query.scalar() or Decimal("0")
-        expense_total = expense_query.scalar() or Decimal("0")
-        net_revenue_to_date = revenue_total - expense_total
+        revenue_total, expense_total = net_query.one()
+        revenue_total = revenue_total or Decimal("0")
+        expense_total = expense_total or Decimal("0")
 
-        return DashboardStats(
+        return DashboardStats(**_stats_fields(
+            total_rooms=total_rooms,
+            occupied=occupied,
             total_tenants=total_tenants,
-            total_rooms=int(total_rooms),
-            empty_rooms=empty_rooms,
-            occupancy_rate=round(occupancy_rate, 1),
-            tenant_change_percent=tenant_change,
-            net_revenue_to_date=net_revenue_to_date,
-        )
+            last_month_count=last_month_count,
+            net_revenue_to_date=revenue_total - expense_total,
+        ))
+
+    def get_breakdown(self, region_ids: Optional[List[UUID]] = None) -> DashboardBreakdownResponse:
+        """
+        Get stats, net revenue and DP liabilities for every visible region and kost.
 
-    def get_income_trend(self, kost_id: UUID = None, region_id: UUID = None, period: str = "month") -> IncomeTrendResponse:
-        """Get income trend for a specific period (month, semester, year)."""
+        region_ids=None means all regions. Each figure set is computed once with
+        GROUPING SETS ((region, kost), (region), ()) instead of one call per scope.
+        """
         today = date.today()
-        items = []
-        total = Decimal("0")
-        
-        # Month abbreviations in Indonesian
-        month_abbr = ["Jan", "Feb", "Mar", "Apr", "Mei", "Jun", 
-                      "Jul", "Agu", "Sep", "Okt", "Nov", "Des"]
-        
-        # Determine start and end dates based on period
-        if period == "month":
-            # Current month only
-            start_date = today.replace(day=1)
-            # End of current month
-            if today.month == 12:
-                end_date = today.replace(year=today.year + 1, month=1, day=1) - timedelta(days=1)
-            else:
-                end_date = today.replace(month=today.month + 1, day=1) - timedelta(days=1)
-            period_label = f"Bulan {month_abbr[today.month - 1]} {today.year}"
-            
-        elif period == "semester":
-            # Current semester (Jan-Jun or Jul-Dec)
-            if today.month <= 6:
-                start_date = today.replace(month=1, day=1)
-                end_date = today.replace(month=6, day=30)
-                period_label = f"Semester 1 {today.year}"
-            else:
-                start_date = today.replace(month=7, day=1)
-                end_date = today.replace(month=12, day=31)
-                period_label = f"Semester 2 {today.year}"
-                
-        else:  # year
-            # Current year
-            start_date = today.replace(month=1, day=1)
-            end_date = today.replace(month=12, day=31)
-            period_label = f"Tahun {today.year}"
-        
-        # Determine filters
-        kost_filter = []
-        if kost_id:
-            kost_filter = [Kost.id == kost_id]
-        elif region_id:
-            kost_filter = [Kost.region_id == region_id]
 
-        # Generate weeks within the period
-        current = start_date
-        current = current - timedelta(days=current.weekday()) # Start of week (Monday)
-        
-        week_num = 1
-        while current <= end_date:
-            week_start = current
-            week_end = current + timedelta(days=6)
-            
-            # Clamp to period boundaries
-            query_start = max(week_start, start_date)
-            query_end = min(week_end, end_date)
-            
-            if query_start <= query_end:
-                # Query income for this week
-                income_query = self.db.query(func.coalesce(func.sum(Transaction.amount), 0)).join(
-                    Kost, Transaction.kost_id == Kost.id
-                ).filter(
-                    and_(
-                        Transaction.financial_class == "REVENUE",
-                        Transaction.is_frozen == False,
-                        Transaction.transaction_date >= query_start,
-                        Transaction.transaction_date <= query_end,
+        def level(region_col, kost_col):
+            # 0 = per kost, 1 = per region, 3 = grand total
+            return func.grouping(region_col, kost_col)
+
+        # 1) Rooms and tenants, pre-aggregated per kost so units are not multiplied.
+        tenant_counts = (
+            select(
+                Tenant.kost_id.label("kost_id"),
+                func.count(Tenant.id).label("total_tenants"),
+            )
+            .where(Tenant.status == "aktif", Tenant.is_active == True)
+            .group_by(Tenant.kost_id)
+            .subquery("tenant_counts")
+        )
+        last_snapshot_date = (
+            select(func.max(OccupancySnapshot.snapshot_date))
+            .where(OccupancySnapshot.snapshot_date <= _last_month_end())
+            .scalar_subquery()
+        )
+        last_month_counts = (
+            select(
+                OccupancySnapshot.kost_id.label("kost_id"),
+                OccupancySnapshot.active_tenants.label("last_month_count"),
+            )
+            .where(OccupancySnapshot.snapshot_date == last_snapshot_date)
+            .subquery("last_month_counts")
+        )
+        occupancy_query = (
+            self.db.query(
+                level(Kost.region_id, Kost.id).label("level"),
+                Kost.region_id,
+                Kost.id,
+                func.max(Kost.name).label("kost_name"),
+                func.max(Regions.name).label("region_name"),
+                func.coalesce(func.sum(Kost.total_units), 0).label("total_rooms"),
+                func.coalesce(func.sum(Kost.active_tenants), 0).label("occupied"),
+                func.coalesce(func.sum(tenant_counts.c.total_tenants), 0).label("total_tenants"),
+                func.coalesce(func.sum(last_month_counts.c.last_month_count), 0).label("last_month_count"),
+            )
+            .outerjoin(tenant_counts, tenant_counts.c.kost_id == Kost.id)
+            .outerjoin(last_month_counts, last_month_counts.c.kost_id == Kost.id)
+            .outerjoin(Regions, Regions.id == Kost.region_id)
+            .group_by(func.grouping_sets(
+                tuple_(Kost.region_id, Kost.id),
+                tuple_(Kost.region_id),
+                tuple_(),
+            ))
+        )
+        if region_ids is not None:
+            occupancy_query = occupancy_query.filter(Kost.region_id.in_(region_ids))
+
+        # 2) Net revenue to date from the daily rollup.
+        money_query = (
+            self.db.query(
+                level(LedgerDaily.region_id, LedgerDaily.kost_id).label("level"),
+                LedgerDaily.region_id,
+                LedgerDaily.kost_id,
+                func.coalesce(func.sum(LedgerDaily.amount).filter(
+                    LedgerDaily.financial_class == "REVENUE",
+                    LedgerDaily.is_frozen == False,
+                ), 0).label("revenue"),
+                func.coalesce(func.sum(LedgerDaily.amount).filter(
+                    LedgerDaily.financial_class == "EXPENSE",
+                ), 0).label("expense"),
+            )
+            .filter(LedgerDaily.ledger_date <= today)
+            .group_by(func.grouping_sets(
+                tuple_(LedgerDaily.region_id, LedgerDaily.kost_id),
+                tuple_(LedgerDaily.region_id),
+                tuple_(),
+            ))
+        )
+        if region_ids is not None:
+            money_query = money_query.filter(LedgerDaily.region_id.in_(region_ids))
+
+        # 3) Outstanding DP liabilities (distinct tenants need the raw rows).
+        dp_query = (
+            self.db.query(
+                level(Transaction.region_id, Transaction.kost_id).label("level"),
+                Transaction.region_id,
+                Transaction.kost_id,
+                func.coalesce(func.sum(Transaction.amount), 0).label("dp_total"),
+                func.count(func.distinct(Transaction.tenant_id)).label("dp_count"),
+            )
+            .filter(
+                Transaction.category == "dp",
+                Transaction.is_frozen == True,
+                Transaction.financial_class == "LIABILITY",
+            )
+            .group_by(func.grouping_sets(
+                tuple_(Transaction.region_id, Transaction.kost_id),
+                tuple_(Transaction.region_id),
+                tuple_(),
+            ))
+        )
+        if region_ids is not None:
+            dp_query = dp_query.filter(Transaction.region_id.in_(region_ids))
+
+        def scope_key(row):
+            if row.level == BREAKDOWN_LEVEL_TOTAL:
+                return ("all",)
+            if row.level == BREAKDOWN_LEVEL_REGION:
+                return ("region", row.region_id)
+            return ("kost", row[2])
+
+        money = {scope_key(row): row.revenue - row.expense for row in money_query.all()}
+        dp = {scope_key(row): (row.dp_total, row.dp_count) for row in dp_query.all()}
+
+        def stats_for(key, row) -> dict:
+            dp_total, dp_count = dp.get(key, (Decimal("0"), 0))
+            return {
+                **_stats_fields(
+                    total_rooms=row.total_rooms if row is not None else 0,
+                    occupied=row.occupied if row is not None else 0,
+                    total_tenants=row.total_tenants if row is not None else 0,
+                    last_month_count=row.last_month_count if row is not None else 0,
+                    net_revenue_to_date=money.get(key, Decimal("0")),
+                ),
+                "dp_total": dp_total,
+                "dp_count": dp_count,
+            }
+
+        totals_row = None
+        regions = {}
+        kosts_by_region = {}
+        for row in occupancy_query.all():
+            if row.level == BREAKDOWN_LEVEL_TOTAL:
+                totals_row = row
+            elif row.level == BREAKDOWN_LEVEL_REGION:
+                regions[row.region_id] = row
+            else:
+                kosts_by_region.setdefault(row.region_id, []).append(
+                    KostBreakdownItem(
+                        kost_id=row.id,
+                        kost_name=row.kost_name,
+                        **stats_for(("kost", row.id), row),
                     )
                 )
 
-                fee_query = self.db.query(func.coalesce(func.sum(Transaction.amount), 0)).join(
-                    Kost, Transaction.kost_id == Kost.id
-                ).filter(
-                    and_(
-                        Transaction.reference_id.isnot(None),
-                        Transaction.transaction_date >= query_start,
-                        Transaction.transaction_date <= query_end,
-                    )
-                )
+        region_items = [
+            RegionBreakdownItem(
+                region_id=region_id,
+                region_name=row.region_name,
+                kosts=sorted(kosts_by_region.get(region_id, []), key=lambda item: item.kost_name or ""),
+                **stats_for(("region", region_id), row),
+            )
+            for region_id, row in regions.items()
+        ]
+        region_items.sort(key=lambda item: item.region_name or "")
 
-                if kost_filter:
-                    income_query = income_query.filter(*kost_filter)
-                    fee_query = fee_query.filter(*kost_filter)
-                
-                income_amount = income_query.scalar() or Decimal("0")
-                fee_amount = fee_query.scalar() or Decimal("0")
-                amount = income_amount - fee_amount
-            else:
-                amount = Decimal("0")
+        return DashboardBreakdownResponse(
+            totals=BreakdownStats(**stats_for(("all",), totals_row)),
+            regions=region_items,
+        )
+
+    def get_income_trend(
+        self,
+        kost_id: UUID = None,
+        region_id: UUID = None,
+        period: str = "month",
+        start: date = None,
+        end: date = None,
+        granularity: str = None,
+        compare_to: str = None,
+    ) -> IncomeTrendResponse:
+        """
+        Get income trend for a specific period (month, semester, year) or an explicit start/end range.
+
+        With compare_to, each bucket also carries the amount of the matching
+        bucket in the comparison range, computed in the same query.
+        """
+        start_date, end_date, period_label, granularity = resolve_range(period, start, end, granularity)
+        shift = compare_shift(compare_to, start_date, end_date)
+
+        buckets = BucketAggregator(self.db).aggregate(
+            start_date,
+            end_date,
+            granularity=granularity or GRANULARITY_WEEK,
+            kost_id=kost_id,
+            region_id=region_id,
+            kost_only=True,
+            shift=shift,
+        )
 
+        items = []
+        total = Decimal("0")
+        previous_total = Decimal("0") if shift else None
+        for bucket in buckets:
+            # Anything linked to a rent payment (extra fees, released DP) is netted out of income.
+            amount = Decimal(bucket.revenue) - Decimal(bucket.linked_total)
             total += amount
-            
-            # Generate label
-            if period == "month":
-                label = f"Minggu {week_num}"
+            previous_amount = None
+            if shift:
+                previous_amount = Decimal(bucket.previous_revenue) - Decimal(bucket.previous_linked_total)
+                previous_total += previous_amount
+
+            if granularity:
+                label = bucket_label(granularity, bucket.anchor)
+            elif period == "month":
+                label = f"Minggu {bucket.index}"
             else:
-                month_name = month_abbr[week_start.month - 1]
-                week_of_month = (week_start.day - 1) // 7 + 1
-                label = f"{month_name} W{week_of_month}"
-            
+                label = week_label(bucket.anchor)
+
             items.append(IncomeTrendItem(
                 label=label,
-                amount=amount
+                amount=amount,
+                previous_amount=previous_amount,
             ))
-            
-            current += timedelta(days=7)
-            week_num += 1
 
         return IncomeTrendResponse(
             period=period_label,
             items=items,
-            total=total
+            total=total,
+            compare_to=compare_to,
+            previous_period=self._comparison_label(start_date, end_date, shift),
+            previous_total=previous_total,
         )
 
-    def get_tenant_tracker(self, kost_id: UUID = None, region_id: UUID = None, limit: int = 10) -> TenantTrackerResponse:
-        """Get tenant payment status tracker."""
+    @staticmethod
+    def _comparison_label(start_date: date, end_date: date, shift) -> Optional[str]:
+        if not shift:
+            return None
+        previous_start, previous_end = shifted_range(start_date, end_date, shift)
+        return f"{date_label(previous_start)} - {date_label(previous_end)}"
+
+    def get_occupancy_history(
+        self,
+        kost_id: UUID = None,
+        region_id: UUID = None,
+        start: date = None,
+        end: date = None,
+    ) -> OccupancyHistoryResponse:
+        """Get daily occupancy points from the nightly snapshots (default: last 30 days)."""
+        end_date = end or date.today()
+        start_date = start or end_date - timedelta(days=29)
+        if start_date > end_date:
+            raise BadRequestException("start must not be after end")
+
+        rows = OccupancyService(self.db).get_history(start_date, end_date, kost_id=kost_id, region_id=region_id)
+        items = []
+        for row in rows:
+            total_units = int(row.total_units or 0)
+            occupied = int(row.occupied or 0)
+            items.append(OccupancyHistoryPoint(
+                snapshot_date=row.snapshot_date,
+                total_rooms=total_units,
+                occupied=occupied,
+                active_tenants=int(row.active_tenants or 0),
+                late_tenants=int(row.late_tenants or 0),
+                dp_tenants=int(row.dp_tenants or 0),
+                # Same definition as get_stats: units held by active tenants of any status
+                occupancy_rate=round(occupied / total_units * 100, 1) if total_units > 0 else 0,
+            ))
+
+        return OccupancyHistoryResponse(start=start_date, end=end_date, items=items)
+
+    def get_tenant_tracker(
+        self,
+        kost_id: UUID = None,
+        region_id: UUID = None,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        tenant_ids: Optional[List[UUID]] = None,
+    ) -> TenantTrackerResponse:
+        """
+        Get tenant payment status tracker, most urgent first (late -> waiting -> paid).
+
+        Tenants, their kost and their latest rent payment are loaded in one query
+        and paged with a keyset cursor over (urgency, name, id). tenant_ids limits
+        the tracker to those tenants (used for stream deltas); their rows keep
+        the room and color of their position in the full tracker.
+        """
         today = date.today()
-        
-        # Get active tenants
-        query = self.db.query(Tenant).join(Kost, Tenant.kost_id == Kost.id).filter(
-            Tenant.status == "aktif",
-            Tenant.is_active == True
+        month_start = today.replace(day=1)
+        next_month_start = (month_start + timedelta(days=32)).replace(day=1)
+
+        # Latest rent payment per tenant (LATERAL ... LIMIT 1).
+        last_payment = (
+            select(Transaction.transaction_date.label("paid_on"))
+            .where(
+                Transaction.tenant_id == Tenant.id,
+                Transaction.financial_class == "REVENUE",
+                Transaction.is_frozen == False,
+                Transaction.category == "rent",
+            )
+            .order_by(Transaction.transaction_date.desc())
+            .limit(1)
+            .lateral("last_payment")
+        )
+
+        # Unpaid tenants are all late after the 25th, otherwise all waiting.
+        unpaid_rank = TRACKER_RANK_LATE if today.day > 25 else TRACKER_RANK_WAITING
+        is_paid = and_(
+            last_payment.c.paid_on >= month_start,
+            last_payment.c.paid_on < next_month_start,
         )
-        
+        urgency = case((is_paid, TRACKER_RANK_PAID), else_=unpaid_rank)
+
+        query = (
+            self.db.query(
+                Tenant.id,
+                Tenant.name,
+                Tenant.phone,
+                Kost.name.label("kost_name"),
+                urgency.label("urgency"),
+            )
+            .join(Kost, Tenant.kost_id == Kost.id)
+            .outerjoin(last_payment, true())
+            .filter(
+                Tenant.status == "aktif",
+                Tenant.is_active == True
+            )
+        )
+
         if kost_id:
             query = query.filter(Tenant.kost_id == kost_id)
         elif region_id:
             query = query.filter(Kost.region_id == region_id)
-        
-        tenants = query.limit(limit).all()
+        order = (urgency, Tenant.name, Tenant.id)
+        if tenant_ids is not None:
+            # Number the whole scoped tracker first, so these rows keep the
+            # room and color of their position in it, then narrow to them.
+            ranked = query.add_columns(
+                func.row_number().over(order_by=order).label("tracker_index")
+            ).subquery("ranked")
+            query = self.db.query(ranked).filter(ranked.c.id.in_(tenant_ids))
+            order = (ranked.c.urgency, ranked.c.name, ranked.c.id)
+        query = query.add_columns(func.count().over().label("remaining"))
+
+        position = 0
+        if cursor:
+            after = decode_cursor(cursor)
+            try:
+                position = int(after["p"])
+                query = query.filter(
+                    tuple_(*order) > tuple_(int(after["u"]), after["n"], UUID(after["i"]))
+                )
+            except (KeyError, TypeError, ValueError):
+                raise BadRequestException(detail="Invalid cursor")
+
+        rows = (
+            query
+            .order_by(*order)
+            .limit(limit + 1)
+            .all()
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        # Calculate due date (assume monthly rent, due on day 25)
+        current_month_due = today.replace(day=25) if today.day < 25 else (today.replace(day=1) + timedelta(days=32)).replace(day=25)
+        due_date_str = f"{current_month_due.day} {MONTH_ABBR[current_month_due.month - 1]} {current_month_due.year}"
+
         items = []
         colors = ["orange", "cyan", "pink", "purple", "blue"]
 
-        for idx, tenant in enumerate(tenants):
-            # Determine payment status based on last transaction
-            last_payment = self.db.query(Transaction).filter(
-                and_(
-                    Transaction.tenant_id == tenant.id,
-                    Transaction.financial_class == "REVENUE",
-                    Transaction.is_frozen == False,
-                    Transaction.category == "rent"
-                )
-            ).order_by(Transaction.transaction_date.desc()).first()
+        for offset, row in enumerate(rows):
+            idx = row.tracker_index - 1 if tenant_ids is not None else position + offset
 
-            # Calculate due date (assume monthly rent, due on day 25)
-            current_month_due = today.replace(day=25) if today.day < 25 else (today.replace(day=1) + timedelta(days=32)).replace(day=25)
-            
-            if last_payment and last_payment.transaction_date.month == today.month:
+            if row.urgency == TRACKER_RANK_PAID:
                 status = TenantPaymentStatus(type="success", label="Lunas")
                 action = "Detail"
-            elif today.day > 25:
+            elif row.urgency == TRACKER_RANK_LATE:
                 status = TenantPaymentStatus(type="danger", label="Terlambat")
                 action = "Tagih"
             else:
                 status = TenantPaymentStatus(type="warning", label="Menunggu")
                 action = "Ingatkan"
 
-            # Format due date
-            months = ["Jan", "Feb", "Mar", "Apr", "Mei", "Jun", "Jul", "Agu", "Sep", "Okt", "Nov", "Des"]
-            due_date_str = f"{current_month_due.day} {months[current_month_due.month - 1]} {current_month_due.year}"
-
             # Get initials
-            name_parts = tenant.name.split()
+            name_parts = row.name.split()
             initials = "".join([p[0].upper() for p in name_parts[:2]]) if name_parts else "?"
 
-            # Get room info from kost
-            kost = self.db.query(Kost).filter(Kost.id == tenant.kost_id).first()
-            room = f"{kost.name[:1]}-{str(idx + 101)}" if kost else f"R-{idx + 1}"
+            room = f"{row.kost_name[:1]}-{str(idx + 101)}" if row.kost_name else f"R-{idx + 1}"
 
             items.append(TenantTrackerItem(
-                id=str(tenant.id),
-                name=tenant.name,
+                id=str(row.id),
+                name=row.name,
                 initials=initials,
-                phone=tenant.phone,
+                phone=row.phone,
                 room=room,
                 floor="Lantai 1",
                 status=status,
@@ -302,175 +572,99 @@ class DashboardService:
                 color=colors[idx % len(colors)]
             ))
 
-        return TenantTrackerResponse(items=items, total=len(items))
-
-    def get_trend_bars(self, kost_id: UUID = None, region_id: UUID = None, period: str = "month") -> TrendBarResponse:
-        """Get income vs expense trend for bar chart."""
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            next_cursor = encode_cursor({
+                "u": last.urgency,
+                "n": last.name,
+                "i": str(last.id),
+                "p": position + len(rows),
+            })
+
+        total = position + (rows[0].remaining if rows else 0)
+        return TenantTrackerResponse(items=items, total=total, next_cursor=next_cursor)
+
+    def get_trend_bars(
+        self,
+        kost_id: UUID = None,
+        region_id: UUID = None,
+        period: str = "month",
+        start: date = None,
+        end: date = None,
+        granularity: str = None,
+        compare_to: str = None,
+    ) -> TrendBarResponse:
+        """Get income vs expense trend for bar chart, optionally with a comparison series."""
         today = date.today()
+        start_date, end_date, period_label, granularity = resolve_range(period, start, end, granularity)
+        shift = compare_shift(compare_to, start_date, end_date)
+        aggregator = BucketAggregator(self.db)
         items = []
 
-        month_abbr = ["Jan", "Feb", "Mar", "Apr", "Mei", "Jun",
-                      "Jul", "Agu", "Sep", "Okt", "Nov", "Des"]
-
-        if period == "month":
-            start_date = today.replace(day=1)
-            last_day = 28 if today.month == 2 else calendar.monthrange(today.year, today.month)[1]
-            end_date = today.replace(day=last_day)
-            period_label = f"Bulan {month_abbr[today.month - 1]} {today.year}"
-        elif period == "semester":
-            if today.month <= 6:
-                start_date = today.replace(month=1, day=1)
-                end_date = today.replace(month=6, day=30)
-                period_label = f"Semester 1 {today.year}"
-            else:
-                start_date = today.replace(month=7, day=1)
-                end_date = today.replace(month=12, day=31)
-                period_label = f"Semester 2 {today.year}"
-        else:
-            start_date = today.replace(month=1, day=1)
-            end_date = today.replace(month=12, day=31)
-            period_label = f"Tahun {today.year}"
-
-        kost_filter = []
-        if kost_id:
-            kost_filter = [Kost.id == kost_id]
-        elif region_id:
-            kost_filter = [Kost.region_id == region_id]
-
-        if period == "month":
+        if granularity:
+            buckets = aggregator.aggregate(
+                start_date,
+                end_date,
+                granularity=granularity,
+                kost_id=kost_id,
+                region_id=region_id,
+                kost_only=True,
+                shift=shift,
+            )
+            labels = [bucket_label(granularity, bucket.anchor) for bucket in buckets]
+        elif period == "month":
             last_day = 28 if today.month == 2 else calendar.monthrange(today.year, today.month)[1]
-            buckets = [
+            day_ranges = [
                 (1, 7),
                 (8, 14),
                 (15, 21),
                 (22, last_day),
             ]
-            for start_day, end_day in buckets:
-                bucket_start = today.replace(day=start_day)
-                bucket_end = today.replace(day=end_day)
-
-                income_query = self.db.query(func.coalesce(func.sum(Transaction.amount), 0)).filter(
-                    Transaction.financial_class == "REVENUE",
-                    Transaction.is_frozen == False,
-                    Transaction.transaction_date >= bucket_start,
-                    Transaction.transaction_date <= bucket_end,
-                )
-                fee_query = self.db.query(func.coalesce(func.sum(Transaction.amount), 0)).filter(
-                    Transaction.financial_class == "EXPENSE",
-                    Transaction.reference_id.isnot(None),
-                    Transaction.transaction_date >= bucket_start,
-                    Transaction.transaction_date <= bucket_end,
-                )
-                expense_query = self.db.query(func.coalesce(func.sum(Transaction.amount), 0)).filter(
-                    Transaction.financial_class == "EXPENSE",
-                    Transaction.transaction_date >= bucket_start,
-                    Transaction.transaction_date <= bucket_end,
-                )
-
-                if kost_id:
-                    income_query = income_query.filter(Transaction.kost_id == kost_id)
-                    fee_query = fee_query.filter(Transaction.kost_id == kost_id)
-                    expense_query = expense_query.filter(Transaction.kost_id == kost_id)
-                elif region_id:
-                    income_query = income_query.filter(Transaction.region_id == region_id)
-                    fee_query = fee_query.filter(Transaction.region_id == region_id)
-                    expense_query = expense_query.filter(Transaction.region_id == region_id)
-
-                income_amount = income_query.scalar() or Decimal("0")
-                fee_amount = fee_query.scalar() or Decimal("0")
-                expense_amount = expense_query.scalar() or Decimal("0")
-                net_income = income_amount - fee_amount
-
-                items.append(TrendBarItem(
-                    label=f"{start_day}-{end_day}",
-                    income=net_income,
-                    expense=expense_amount,
-                ))
-
-            return TrendBarResponse(period=period_label, items=items)
-
-        current = start_date
-        current = current - timedelta(days=current.weekday())
-        week_num = 1
-        while current <= end_date:
-            week_start = current
-            week_end = current + timedelta(days=6)
-            query_start = max(week_start, start_date)
-            query_end = min(week_end, end_date)
-
-            if query_start <= query_end:
-                income_query = self.db.query(func.coalesce(func.sum(Transaction.amount), 0)).join(
-                    Kost, Transaction.kost_id == Kost.id
-                ).filter(
-                    and_(
-                        Transaction.financial_class == "REVENUE",
-                        Transaction.is_frozen == False,
-                        Transaction.transaction_date >= query_start,
-                        Transaction.transaction_date <= query_end,
-                    )
-                )
-                fee_query = self.db.query(func.coalesce(func.sum(Transaction.amount), 0)).join(
-                    Kost, Transaction.kost_id == Kost.id
-                ).filter(
-                    and_(
-                        Transaction.financial_class == "EXPENSE",
-                        Transaction.reference_id.isnot(None),
-                        Transaction.transaction_date >= query_start,
-                        Transaction.transaction_date <= query_end,
-                    )
-                )
-                expense_query = self.db.query(func.coalesce(func.sum(Transaction.amount), 0)).join(
-                    Kost, Transaction.kost_id == Kost.id
-                ).filter(
-                    and_(
-                        Transaction.financial_class == "EXPENSE",
-                        Transaction.transaction_date >= query_start,
-                        Transaction.transaction_date <= query_end,
-                    )
-                )
-
-                if kost_filter:
-                    income_query = income_query.filter(*kost_filter)
-                    fee_query = fee_query.filter(*kost_filter)
-                    expense_query = expense_query.filter(*kost_filter)
-
-                income_amount = income_query.scalar() or Decimal("0")
-                fee_amount = fee_query.scalar() or Decimal("0")
-                expense_amount = expense_query.scalar() or Decimal("0")
-                net_income = income_amount - fee_amount
-            else:
-                net_income = Decimal("0")
-                expense_amount = Decimal("0")
-
-            if period == "month":
-                label = f"Minggu {week_num}"
-            else:
-                month_name = month_abbr[week_start.month - 1]
-                week_of_month = (week_start.day - 1) // 7 + 1
-                label = f"{month_name} W{week_of_month}"
-
+            buckets = aggregator.aggregate(
+                granularity=GRANULARITY_CUSTOM,
+                ranges=[(today.replace(day=start_day), today.replace(day=end_day)) for start_day, end_day in day_ranges],
+                kost_id=kost_id,
+                region_id=region_id,
+                shift=shift,
+            )
+            labels = [f"{start_day}-{end_day}" for start_day, end_day in day_ranges]
+        else:
+            buckets = aggregator.aggregate(
+                start_date,
+                end_date,
+                granularity=GRANULARITY_WEEK,
+                kost_id=kost_id,
+                region_id=region_id,
+                kost_only=True,
+                shift=shift,
+            )
+            labels = [week_label(bucket.anchor) for bucket in buckets]
+
+        for label, bucket in zip(labels, buckets):
             items.append(TrendBarItem(
                 label=label,
-                income=net_income,
-                expense=expense_amount,
+                income=Decimal(bucket.revenue) - Decimal(bucket.fee_offset),
+                expense=Decimal(bucket.expense),
+                previous_income=Decimal(bucket.previous_revenue) - Decimal(bucket.previous_fee_offset) if shift else None,
+                previous_expense=Decimal(bucket.previous_expense) if shift else None,
             ))
 
-            current += timedelta(days=7)
-            week_num += 1
-
-        return TrendBarResponse(period=period_label, items=items)
-
-    def get_summary(self, kost_id: UUID = None, region_id: UUID = None) -> DashboardSummaryResponse:
-        """Get bundled dashboard data."""
-        stats = self.get_stats(kost_id=kost_id, region_id=region_id)
-        trend_bars = self.get_trend_bars(kost_id=kost_id, region_id=region_id, period="month")
-
-        dp_query = self.db.query(func.coalesce(func.sum(Transaction.amount), 0)).filter(
-            Transaction.category == "dp",
-            Transaction.is_frozen == True,
-            Transaction.financial_class == "LIABILITY",
+        return TrendBarResponse(
+            period=period_label,
+            items=items,
+            compare_to=compare_to,
+            previous_period=self._comparison_label(start_date, end_date, shift),
         )
-        dp_count_query = self.db.query(func.count(func.distinct(Transaction.tenant_id))).filter(
+
+    def get_dp_totals(self, kost_id: UUID = None, region_id: UUID = None) -> Tuple[Decimal, int]:
+        """Get total outstanding DP and the number of tenants holding one."""
+        # DP total and distinct DP tenants in a single round trip. Only outstanding
+        # (frozen) deposits are scanned, via the ix_transactions_frozen_dp partial index.
+        dp_query = self.db.query(
+            func.coalesce(func.sum(Transaction.amount), 0),
+            func.count(func.distinct(Transaction.tenant_id)),
+        ).filter(
             Transaction.category == "dp",
             Transaction.is_frozen == True,
             Transaction.financial_class == "LIABILITY",
@@ -478,17 +672,91 @@ class DashboardService:
 
         if kost_id:
             dp_query = dp_query.filter(Transaction.kost_id == kost_id)
-            dp_count_query = dp_count_query.filter(Transaction.kost_id == kost_id)
         elif region_id:
             dp_query = dp_query.filter(Transaction.region_id == region_id)
-            dp_count_query = dp_count_query.filter(Transaction.region_id == region_id)
 
-        dp_total = dp_query.scalar() or Decimal("0")
-        dp_count = dp_count_query.scalar() or 0
+        dp_total, dp_count = dp_query.one()
+        return dp_total or Decimal("0"), dp_count or 0
+
+    def _get_summary_part(self, part: str, kost_id: UUID = None, region_id: UUID = None):
+        if part == "stats":
+            return self.get_stats(kost_id=kost_id, region_id=region_id)
+        if part == "trend_bars":
+            return self.get_trend_bars(kost_id=kost_id, region_id=region_id, period="month")
+        return self.get_dp_totals(kost_id=kost_id, region_id=region_id)
 
+    @staticmethod
+    def _build_summary(parts: Dict[str, object]) -> DashboardSummaryResponse:
+        dp_total, dp_count = parts["dp"]
         return DashboardSummaryResponse(
-            stats=stats,
-            trend_bars=trend_bars,
+            stats=parts["stats"],
+            trend_bars=parts["trend_bars"],
             dp_total=dp_total,
             dp_count=dp_count,
         )
+
+    def get_summary(
+        self,
+        kost_id: UUID = None,
+        region_id: UUID = None,
+        timings: Optional[Dict[str, float]] = None,
+    ) -> DashboardSummaryResponse:
+        """Get bundled dashboard data, one part after another on this session."""
+        parts = {}
+        for part in SUMMARY_PARTS:
+            started = time.perf_counter()
+            parts[part] = self._get_summary_part(part, kost_id=kost_id, region_id=region_id)
+            if timings is not None:
+                timings[part] = (time.perf_counter() - started) * 1000
+        return self._build_summary(parts)
+
+    @staticmethod
+    def get_summary_parallel(
+        kost_id: UUID = None,
+        region_id: UUID = None,
+        timings: Optional[Dict[str, float]] = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ) -> DashboardSummaryResponse:
+        """
+        Get bundled dashboard data with the independent parts running at the same
+        time, each on its own pooled session. Concurrency across all requests is
+        capped by DASHBOARD_FANOUT_LIMIT.
+        """
+        futures = {
+            part: _get_fanout_executor().submit(_run_summary_part, session_factory, part, kost_id, region_id)
+            for part in SUMMARY_PARTS
+        }
+        parts = {}
+        for part, future in futures.items():
+            parts[part], elapsed_ms = future.result()
+            if timings is not None:
+                timings[part] = elapsed_ms
+        return DashboardService._build_summary(parts)
+
+
+SUMMARY_PARTS = ("stats", "trend_bars", "dp")
+
+_fanout_executor: Optional[ThreadPoolExecutor] = None
+_fanout_lock = threading.Lock()
+
+
+def _get_fanout_executor() -> ThreadPoolExecutor:
+    global _fanout_executor
+    with _fanout_lock:
+        if _fanout_executor is None:
+            _fanout_executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.DASHBOARD_FANOUT_LIMIT),
+                thread_name_prefix="dashboard-fanout",
+            )
+        return _fanout_executor
+
+
+def _run_summary_part(session_factory: Callable[[], Session], part: str, kost_id: UUID, region_id: UUID):
+    """Compute one summary part on a dedicated session. Returns (result, elapsed_ms)."""
+    started = time.perf_counter()
+    db = session_factory()
+    try:
+        result = DashboardService(db)._get_summary_part(part, kost_id=kost_id, region_id=region_id)
+    finally:
+        db.close()
+    return result, (time.perf_counter() - started) * 1000
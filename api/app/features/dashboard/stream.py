@@ -0,0 +1,179 @@
+"""
+Dashboard SSE stream - pushes deltas to open dashboards after committed writes.
+
+Committed write events are handled on one background thread, so deltas keep
+commit order. Each delta is computed once per subscribed scope (through the
+dashboard cache) and fanned out to every client of that scope. Subscribers are
+per process, like the dashboard cache.
+"""
+
+import asyncio
+import itertools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.events import WriteEvent, subscribe
+from app.db.session import SessionLocal
+from app.features.dashboard.cache import cached, dashboard_scope
+from app.features.dashboard.schemas import DashboardStreamDelta
+from app.features.dashboard.service import DashboardService
+
+
+logger = logging.getLogger(__name__)
+
+# Sent instead of queued deltas when a client falls too far behind.
+RESYNC = "resync"
+
+
+class StreamSubscriber:
+    """One open stream: its scope and the queue its response generator reads."""
+
+    def __init__(self, kost_id: Optional[UUID], region_id: Optional[UUID], loop: asyncio.AbstractEventLoop):
+        self.kost_id = kost_id
+        self.region_id = region_id
+        self.scope = dashboard_scope(kost_id, region_id)
+        self.loop = loop
+        self.queue: "asyncio.Queue[Tuple[str, str]]" = asyncio.Queue(maxsize=max(1, settings.DASHBOARD_STREAM_QUEUE_SIZE))
+
+    def wants(self, write: WriteEvent) -> bool:
+        if write.is_global:
+            return True
+        if self.kost_id:
+            return write.kost_id == self.kost_id
+        if self.region_id:
+            return write.region_id is None or write.region_id == self.region_id
+        return True
+
+    def offer(self, event: str, data: str) -> None:
+        """Queue a message from any thread."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, event, data)
+        except RuntimeError:
+            pass  # Event loop already closed; the stream is gone.
+
+    def _put(self, event: str, data: str) -> None:
+        try:
+            self.queue.put_nowait((event, data))
+        except asyncio.QueueFull:
+            # Too far behind: drop the backlog and ask the client to refetch.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait((RESYNC, "{}"))
+
+
+class DashboardStreamBroker:
+    """Tracks open dashboard streams and turns committed writes into deltas."""
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._subscribers: Dict[int, StreamSubscriber] = {}
+        self._ids = itertools.count()
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dashboard-stream")
+
+    def subscribe(self, kost_id: Optional[UUID] = None, region_id: Optional[UUID] = None) -> Tuple[int, StreamSubscriber]:
+        """Register a stream. Must be called from the event loop that will read it."""
+        subscriber = StreamSubscriber(kost_id, region_id, asyncio.get_running_loop())
+        with self._lock:
+            subscriber_id = next(self._ids)
+            self._subscribers[subscriber_id] = subscriber
+        return subscriber_id, subscriber
+
+    def unsubscribe(self, subscriber_id: int) -> None:
+        with self._lock:
+            self._subscribers.pop(subscriber_id, None)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, write: WriteEvent) -> None:
+        """Queue a committed write for delta computation (never blocks the writer)."""
+        with self._lock:
+            if not self._subscribers:
+                return
+        self._worker.submit(self._fan_out, write)
+
+    def _fan_out(self, write: WriteEvent) -> None:
+        with self._lock:
+            by_scope: Dict[tuple, List[StreamSubscriber]] = {}
+            for subscriber in self._subscribers.values():
+                if subscriber.wants(write):
+                    by_scope.setdefault(subscriber.scope, []).append(subscriber)
+
+        for subscribers in by_scope.values():
+            first = subscribers[0]
+            try:
+                delta = self._build_delta(write, first.kost_id, first.region_id)
+                event, data = "delta", delta.model_dump_json()
+            except Exception:
+                logger.exception("Failed to build dashboard delta for %r", write)
+                event, data = RESYNC, "{}"
+            for subscriber in subscribers:
+                subscriber.offer(event, data)
+
+    def _build_delta(self, write: WriteEvent, kost_id: Optional[UUID], region_id: Optional[UUID]) -> DashboardStreamDelta:
+        db = self._session_factory()
+        try:
+            service = DashboardService(db)
+            # Shares cache entries with the polling endpoints, so the pushed
+            # figures are computed once per write for pushes and polls alike.
+            stats = cached(
+                "stats",
+                lambda: service.get_stats(kost_id=kost_id, region_id=region_id),
+                kost_id=kost_id,
+                region_id=region_id,
+            )
+
+            trend_bar_index = trend_bar = None
+            today = date.today()
+            tx_date = write.transaction_date
+            if tx_date and (tx_date.year, tx_date.month) == (today.year, today.month):
+                bars = cached(
+                    "trend-bars",
+                    lambda: service.get_trend_bars(kost_id=kost_id, region_id=region_id, period="month"),
+                    kost_id=kost_id,
+                    region_id=region_id,
+                    period=("month", None, None, None, None),  # same key as /trend-bars defaults
+                )
+                # Month bars are days 1-7, 8-14, 15-21 and 22-end.
+                trend_bar_index = min((tx_date.day - 1) // 7, len(bars.items) - 1)
+                trend_bar = bars.items[trend_bar_index] if bars.items else None
+
+            tracker, tracker_removed = [], []
+            if write.tenant_ids:
+                # One query for every tenant the write touched; the ones no
+                # longer in the tracker are sent as removed.
+                tracker = service.get_tenant_tracker(
+                    kost_id=kost_id, region_id=region_id, limit=len(write.tenant_ids), tenant_ids=list(write.tenant_ids)
+                ).items
+                found = {str(row.id) for row in tracker}
+                tracker_removed = [str(tenant_id) for tenant_id in write.tenant_ids if str(tenant_id) not in found]
+
+            return DashboardStreamDelta(
+                entity=write.entity,
+                kost_id=write.kost_id,
+                region_id=write.region_id,
+                stats=stats,
+                trend_bar_index=trend_bar_index,
+                trend_bar=trend_bar,
+                tracker=tracker,
+                tracker_removed=tracker_removed,
+            )
+        finally:
+            db.close()
+
+
+dashboard_stream = DashboardStreamBroker()
+
+
+@subscribe
+def _push_on_write(write: WriteEvent) -> None:
+    dashboard_stream.publish(write)
@@ -0,0 +1,202 @@
+"""
+Export file cache.
+
+Finished export files are kept on local disk, keyed by what was exported
+(region, date range, data types, format) and the data version of that region.
+Any committed tenant/transaction/kost write in the region bumps the version, so
+a repeat export of unchanged data is served straight from the file.
+
+The directory is bounded by size and evicted least recently used first. Files
+are named by key, so worker processes sharing the directory reuse each other's
+exports; each process bounds the files it knows about.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import BinaryIO, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.features.export.service import ExportScope, SheetSpec
+from app.features.versions.service import DataVersionService
+
+
+PART_SUFFIX = ".part"
+
+# Partial files older than this are left over from a crash and removed.
+STALE_PART_SECONDS = 3600
+
+
+def export_cache_key(
+    scope: ExportScope,
+    sheets: List[SheetSpec],
+    format: str,
+    session_factory: Callable[[], Session],
+) -> str:
+    """Cache key of an export at the region's current data version."""
+    db = session_factory()
+    try:
+        version, _ = DataVersionService(db).current(region_id=scope.region_id)
+    finally:
+        db.close()
+    parts = [
+        str(scope.region_id or "all"),
+        scope.start_date.isoformat(),
+        scope.end_date.isoformat(),
+        ",".join(spec.data_type for spec in sheets),
+        format,
+        str(version),
+    ]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+class _TeeFile:
+    """Write-through wrapper copying everything written to a second file."""
+
+    def __init__(self, fileobj, copy: BinaryIO):
+        self._fileobj = fileobj
+        self._copy = copy
+
+    def write(self, data) -> int:
+        written = self._fileobj.write(data)
+        self._copy.write(data)
+        return written
+
+    def __getattr__(self, name):
+        return getattr(self._fileobj, name)
+
+
+class ExportFileCache:
+    """Size-bounded LRU of finished export files."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._files: "OrderedDict[str, int]" = OrderedDict()  # file name -> size, oldest first
+        self._loaded = False
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def get(self, key: str, extension: str) -> Optional[str]:
+        """Path of the cached file for `key`, or None."""
+        name = f"{key}.{extension}"
+        path = os.path.join(self.directory, name)
+        with self._lock:
+            self._load()
+            try:
+                size = os.path.getsize(path)
+                os.utime(path)
+            except OSError:
+                self._files.pop(name, None)
+                self._counters["misses"] += 1
+                return None
+            self._files[name] = size
+            self._files.move_to_end(name)
+            self._counters["hits"] += 1
+            return path
+
+    def caching(self, writer: Callable, key: str, extension: str) -> Callable:
+        """
+        Wrap a writer for an unseekable stream so what it writes is also stored
+        under `key` once it completes.
+        """
+        def write(fileobj, **kwargs) -> None:
+            spool, part = self._open_part()
+            stored = False
+            try:
+                with spool:
+                    writer(_TeeFile(fileobj, spool), **kwargs)
+                self._store(part, key, extension)
+                stored = True
+            finally:
+                if not stored:
+                    _remove_file(part)
+        return write
+
+    def store_copy(self, key: str, extension: str, path: str) -> None:
+        """Store a copy of a finished export file (hard-linked when possible)."""
+        with self._lock:
+            self._load()
+        part = os.path.join(self.directory, uuid.uuid4().hex + PART_SUFFIX)
+        try:
+            os.link(path, part)
+        except OSError:
+            shutil.copyfile(path, part)
+        try:
+            self._store(part, key, extension)
+        except Exception:
+            _remove_file(part)
+            raise
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                **self._counters,
+                "files": len(self._files),
+                "bytes": sum(self._files.values()),
+                "max_bytes": self.max_bytes,
+            }
+
+    def _open_part(self):
+        with self._lock:
+            self._load()
+        fd, part = tempfile.mkstemp(dir=self.directory, suffix=PART_SUFFIX)
+        return os.fdopen(fd, "wb"), part
+
+    def _store(self, part: str, key: str, extension: str) -> None:
+        name = f"{key}.{extension}"
+        size = os.path.getsize(part)
+        if size > self.max_bytes:
+            _remove_file(part)
+            return
+        os.replace(part, os.path.join(self.directory, name))
+        with self._lock:
+            self._files[name] = size
+            self._files.move_to_end(name)
+            self._counters["stores"] += 1
+            total = sum(self._files.values())
+            while total > self.max_bytes and len(self._files) > 1:
+                evicted, evicted_size = self._files.popitem(last=False)
+                _remove_file(os.path.join(self.directory, evicted))
+                total -= evicted_size
+                self._counters["evictions"] += 1
+
+    def _load(self) -> None:
+        """Index files left by earlier runs, oldest access first. Caller holds the lock."""
+        if self._loaded:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        found = []
+        now = time.time()
+        for entry in os.scandir(self.directory):
+            if not entry.is_file():
+                continue
+            stat = entry.stat()
+            if entry.name.endswith(PART_SUFFIX):
+                if now - stat.st_mtime > STALE_PART_SECONDS:
+                    _remove_file(entry.path)
+                continue
+            found.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(found):
+            self._files[name] = size
+        self._loaded = True
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+export_cache = ExportFileCache(
+    directory=settings.EXPORT_CACHE_DIR or os.path.join(tempfile.gettempdir(), "kost-export-cache"),
+    max_bytes=settings.EXPORT_CACHE_MAX_BYTES,
+)
@@ -0,0 +1,213 @@
+"""
+Background export jobs.
+
+Jobs run on a bounded worker pool, each with its own DB session, and write
+their file to a temp directory. Status (including rows written per sheet) is
+kept in memory per process; finished files are deleted after a TTL.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterator, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.exceptions import NotFoundException
+from app.db.session import SessionLocal
+from app.features.export.cache import export_cache, export_cache_key
+from app.features.export.service import ExportScope, SheetSpec
+
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+# Seconds between sweeps for expired job files.
+CLEANUP_INTERVAL_SECONDS = 60
+
+
+class ExportJob:
+    """State of one background export."""
+
+    def __init__(self, owner: str, scope: ExportScope, sheets: List[SheetSpec], format: str,
+                 filename: str, media_type: str, writer: Callable):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.scope = scope
+        self.sheets = sheets
+        self.format = format
+        self.filename = filename
+        self.media_type = media_type
+        self.writer = writer
+        self.status = JOB_QUEUED
+        self.progress: Dict[str, int] = {spec.data_type: 0 for spec in sheets}
+        self.bytes_written = 0
+        self.from_cache = False
+        self.error: Optional[str] = None
+        self.path: Optional[str] = None
+        self.created_at = datetime.now(timezone.utc)
+        self.finished_at: Optional[datetime] = None
+        self.expires_at: Optional[datetime] = None
+
+    # ExportJobResponse fields
+    @property
+    def data_types(self) -> List[str]:
+        return [spec.data_type for spec in self.sheets]
+
+    @property
+    def start_date(self):
+        return self.scope.start_date
+
+    @property
+    def end_date(self):
+        return self.scope.end_date
+
+    @property
+    def download_url(self) -> Optional[str]:
+        return f"/api/export/jobs/{self.id}/download" if self.status == JOB_DONE else None
+
+    def counted(self, spec: SheetSpec) -> SheetSpec:
+        """Same sheet, with rows counted into this job's progress as they are written."""
+        def rows(service, scope) -> Iterator:
+            for row in spec.rows(service, scope):
+                self.progress[spec.data_type] += 1
+                yield row
+        return spec._replace(rows=rows)
+
+
+class _ProgressFile:
+    """Binary file wrapper that keeps the job's byte count current."""
+
+    def __init__(self, fileobj, job: ExportJob):
+        self._fileobj = fileobj
+        self._job = job
+
+    def write(self, data) -> int:
+        written = self._fileobj.write(data)
+        self._job.bytes_written += len(data)
+        return written
+
+    def __getattr__(self, name):
+        return getattr(self._fileobj, name)
+
+
+class ExportJobManager:
+    """Submits, tracks and expires export jobs."""
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, ExportJob] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._janitor: Optional[threading.Thread] = None
+        self.directory = settings.EXPORT_JOB_DIR or os.path.join(tempfile.gettempdir(), "kost-exports")
+
+    def submit(self, job: ExportJob) -> ExportJob:
+        """Queue a job. Raises 429 when too many jobs are pending."""
+        self.purge_expired()
+        with self._lock:
+            pending = sum(1 for j in self._jobs.values() if j.status in (JOB_QUEUED, JOB_RUNNING))
+            if pending >= settings.EXPORT_JOB_MAX_PENDING:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many exports in progress, try again later",
+                )
+            self._jobs[job.id] = job
+            if self._executor is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(1, settings.EXPORT_JOB_WORKERS),
+                    thread_name_prefix="export-job",
+                )
+                self._janitor = threading.Thread(target=self._sweep_forever, name="export-job-janitor", daemon=True)
+                self._janitor.start()
+            self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str, owner: str) -> ExportJob:
+        """A job started by `owner`; other users' jobs are reported as missing."""
+        job = self._jobs.get(job_id)
+        if not job or job.owner != owner or self._is_expired(job):
+            raise NotFoundException("Export job not found")
+        return job
+
+    def _run(self, job: ExportJob) -> None:
+        job.status = JOB_RUNNING
+        extension = job.filename.rsplit(".", 1)[-1]
+        path = os.path.join(self.directory, f"{job.id}.{extension}")
+        try:
+            cache_key = None
+            cached = None
+            if settings.EXPORT_CACHE_ENABLED:
+                cache_key = export_cache_key(job.scope, job.sheets, job.format, self._session_factory)
+                cached = export_cache.get(cache_key, extension)
+            if cached:
+                # Copied, so cache eviction cannot remove a file a download link points to.
+                shutil.copyfile(cached, path)
+                job.from_cache = True
+            else:
+                with open(path, "wb") as fileobj:
+                    job.writer(
+                        _ProgressFile(fileobj, job),
+                        sheets=[job.counted(spec) for spec in job.sheets],
+                        scope=job.scope,
+                        session_factory=self._session_factory,
+                    )
+                if cache_key:
+                    export_cache.store_copy(cache_key, extension, path)
+            # Writers may seek back and rewrite headers; report the final size.
+            job.bytes_written = os.path.getsize(path)
+            job.path = path
+            job.status = JOB_DONE
+        except Exception as exc:
+            logger.exception("Export job %s failed", job.id)
+            job.status = JOB_FAILED
+            job.error = str(exc) or exc.__class__.__name__
+            _remove_file(path)
+        finally:
+            job.finished_at = datetime.now(timezone.utc)
+            job.expires_at = job.finished_at + timedelta(seconds=settings.EXPORT_JOB_TTL_SECONDS)
+
+    @staticmethod
+    def _is_expired(job: ExportJob) -> bool:
+        return job.expires_at is not None and datetime.now(timezone.utc) >= job.expires_at
+
+    def purge_expired(self) -> int:
+        """Forget expired jobs and delete their files. Returns the number purged."""
+        with self._lock:
+            expired = [job for job in self._jobs.values() if self._is_expired(job)]
+            for job in expired:
+                del self._jobs[job.id]
+        for job in expired:
+            if job.path:
+                _remove_file(job.path)
+        return len(expired)
+
+    def _sweep_forever(self) -> None:
+        stop = threading.Event()
+        while not stop.wait(CLEANUP_INTERVAL_SECONDS):
+            try:
+                self.purge_expired()
+            except Exception:
+                logger.exception("Export job cleanup failed")
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+export_jobs = ExportJobManager()
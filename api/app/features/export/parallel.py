@@ -0,0 +1,113 @@
+"""
+Parallel sheet fetching for multi-type exports.
+
+Every sheet's rows are fetched at the same time, each on its own DB session,
+into a temp-file spool. The writer then assembles the output from the spools
+in request order, starting on a sheet as soon as that sheet is fetched. A
+shared pool caps concurrent sheet fetches across all exports.
+"""
+
+import pickle
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Callable, Iterator, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.features.export.service import ExportScope, ExportService, SheetSpec
+
+
+_sheet_executor: Optional[ThreadPoolExecutor] = None
+_sheet_executor_lock = threading.Lock()
+
+
+def _get_sheet_executor() -> ThreadPoolExecutor:
+    global _sheet_executor
+    with _sheet_executor_lock:
+        if _sheet_executor is None:
+            _sheet_executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.EXPORT_SHEET_CONCURRENCY),
+                thread_name_prefix="export-sheet",
+            )
+        return _sheet_executor
+
+
+class _Cancelled(Exception):
+    pass
+
+
+def _fetch_to_spool(
+    spec: SheetSpec,
+    scope: ExportScope,
+    session_factory: Callable[[], Session],
+    spool: BinaryIO,
+    cancelled: threading.Event,
+) -> int:
+    """Write every row of a sheet to `spool`. Returns the row count."""
+    db = session_factory()
+    try:
+        count = 0
+        pickler = pickle.Pickler(spool, protocol=pickle.HIGHEST_PROTOCOL)
+        for row in spec.rows(ExportService(db), scope):
+            if cancelled.is_set():
+                raise _Cancelled()
+            pickler.dump(row)
+            pickler.clear_memo()
+            count += 1
+        spool.flush()
+        return count
+    finally:
+        db.close()
+
+
+def _spooled(spec: SheetSpec, spool: BinaryIO, fetched: Future) -> SheetSpec:
+    """The same sheet, reading its rows back from the spool once fetched."""
+    def rows(service, scope) -> Iterator:
+        count = fetched.result()  # Re-raises a failed fetch
+        spool.seek(0)
+        unpickler = pickle.Unpickler(spool)
+        for _ in range(count):
+            yield unpickler.load()
+    return spec._replace(rows=rows)
+
+
+def parallel_sheets(writer: Callable) -> Callable:
+    """
+    Wrap an export writer so that exports with several sheets fetch them in
+    parallel. Single-sheet exports stream straight from the cursor as before.
+    """
+    def write(fileobj: BinaryIO, sheets: List[SheetSpec], scope: ExportScope, session_factory: Callable[[], Session]) -> None:
+        if len(sheets) < 2:
+            return writer(fileobj, sheets=sheets, scope=scope, session_factory=session_factory)
+
+        executor = _get_sheet_executor()
+        cancelled = threading.Event()
+        spools = [tempfile.TemporaryFile() for _ in sheets]
+        futures = [
+            executor.submit(_fetch_to_spool, spec, scope, session_factory, spool, cancelled)
+            for spec, spool in zip(sheets, spools)
+        ]
+        try:
+            # The writer's own session is never queried (spooled rows ignore it).
+            writer(
+                fileobj,
+                sheets=[_spooled(spec, spool, future) for spec, spool, future in zip(sheets, spools, futures)],
+                scope=scope,
+                session_factory=session_factory,
+            )
+        finally:
+            cancelled.set()
+            for future in futures:
+                future.cancel()
+            for future in futures:
+                if not future.cancelled():
+                    try:
+                        future.result()
+                    except Exception:
+                        pass  # Already surfaced through the writer, or cancelled.
+            for spool in spools:
+                spool.close()
+
+    return write
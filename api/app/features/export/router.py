@@ -3,267 +3,193 @@ Export router - Excel data export endpoints.
 """
 
 from datetime import date
+from functools import partial
 from typing import Optional, List
 from uuid import UUID
-from io import BytesIO
 
 from fastapi import APIRouter, Depends, Query, HTTPException, status
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from fastapi.responses import FileResponse, StreamingResponse
 
-from app.db.session import get_db
+from app.core.config import settings
+from app.db.session import SessionLocal
 from app.core.auth import get_current_firebase_uid
-from app.features.users.service import UserProfileService
-from app.features.tenants.model import Tenant
-from app.features.transactions.model import Transaction
-from app.features.kosts.model import Kost
+from app.features.export.cache import export_cache, export_cache_key
+from app.features.export.parallel import parallel_sheets
+from app.features.export.jobs import JOB_DONE, ExportJob, export_jobs
+from app.features.export.schemas import ExportJobCreate, ExportJobResponse
+from app.features.export.service import ExportScope, ExportService, delta_cursor, resolve_sheets
+from app.features.export.streaming import stream_from_producer
+from app.features.export.text import CSV_MEDIA_TYPE, NDJSON_MEDIA_TYPE, ZIP_MEDIA_TYPE, write_csv, write_ndjson
+from app.features.export.xlsx import XLSX_MEDIA_TYPE, write_xlsx
 
 router = APIRouter()
 
+EXPORT_CURSOR_HEADER = "X-Export-Cursor"
 
-from app.features.common.dependencies import get_current_user_region
 
-
-def style_header_row(ws, row_num: int = 1):
-    """Apply header styling to a row."""
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(start_color="0f766d", end_color="0f766d", fill_type="solid")
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    
-    for cell in ws[row_num]:
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        cell.border = thin_border
-
-
-def auto_size_columns(ws):
-    """Auto-size columns based on content."""
-    for column_cells in ws.columns:
-        max_length = 0
-        column_letter = column_cells[0].column_letter
-        for cell in column_cells:
-            try:
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 50)
-        ws.column_dimensions[column_letter].width = adjusted_width
+from app.features.common.dependencies import get_current_user_region, get_streaming_user_region
 
 
 @router.get("/excel")
-async def export_to_excel(
+def export_to_excel(
     start_date: date = Query(..., description="Start date for export"),
     end_date: date = Query(..., description="End date for export"),
     data_types: List[str] = Query(..., description="Data types to export: tenants, payments, expenses"),
-    region_id: Optional[UUID] = Depends(get_current_user_region),
-    db: Session = Depends(get_db),
+    region_id: Optional[UUID] = Depends(get_streaming_user_region),
 ):
     """
     Export selected data types to a single Excel file with multiple sheets.
     Each data type becomes a separate sheet in the workbook.
+
+    The workbook is generated on a background thread with its own DB session
+    and sent as it is written; the request session is closed once the region
+    is resolved, before streaming starts.
     """
-    
-    if not data_types:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="At least one data type must be selected"
-        )
-    
-    # Get all kost IDs in this region
-    kost_ids = []
-    if region_id:
-        kosts = db.query(Kost).filter(Kost.region_id == region_id).all()
-        kost_ids = [k.id for k in kosts]
-    
-    # Create workbook
-    wb = Workbook()
-    # Remove default sheet
-    wb.remove(wb.active)
-    
-    # Process each data type
-    for data_type in data_types:
-        if data_type == "tenants":
-            _add_tenants_sheet(wb, db, kost_ids)
-        elif data_type == "payments":
-            _add_payments_sheet(wb, db, kost_ids, start_date, end_date)
-        elif data_type == "expenses":
-            _add_financial_sheet(wb, db, kost_ids, start_date, end_date)
-        elif data_type == "activity":
-            # Activity log is no longer supported.
-            continue
-    
-    # If no sheets were added (invalid data types), return error
-    if len(wb.worksheets) == 0:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="No valid data types selected"
-        )
-    
-    # Save to BytesIO
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-    
-    # Generate filename
-    filename = f"ekspor_data_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.xlsx"
-    
+    return _export_response("xlsx", start_date, end_date, data_types, region_id)
+
+
+@router.get("/data")
+def export_data(
+    start_date: date = Query(..., description="Start date for export"),
+    end_date: date = Query(..., description="End date for export"),
+    data_types: List[str] = Query(..., description="Data types to export: tenants, payments, expenses"),
+    format: str = Query("xlsx", pattern="^(xlsx|csv|ndjson)$", description="xlsx, csv (zip of CSVs for several types) or ndjson"),
+    region_id: Optional[UUID] = Depends(get_streaming_user_region),
+):
+    """
+    Export selected data types as XLSX, CSV or NDJSON.
+
+    CSV and NDJSON skip styling entirely and are serialized straight from the
+    DB cursor, for bookkeeping imports.
+    """
+    return _export_response(format, start_date, end_date, data_types, region_id)
+
+
+@router.get("/changes")
+def export_changes(
+    data_types: List[str] = Query(..., description="Data types to export: tenants, payments, expenses"),
+    since: Optional[str] = Query(None, description="X-Export-Cursor of the previous export, or an ISO 8601 timestamp; omit for everything"),
+    format: str = Query("csv", pattern="^(xlsx|csv|ndjson)$", description="xlsx, csv (zip of CSVs for several types) or ndjson"),
+    region_id: Optional[UUID] = Depends(get_streaming_user_region),
+):
+    """
+    Export only the tenants and transactions created or changed since a cursor,
+    for incremental syncs. Rows start with their ID and change time; the
+    cursor for the next sync is returned in the X-Export-Cursor header.
+    """
+    sheets = resolve_sheets(data_types, delta=True)
+    db = SessionLocal()
+    try:
+        changed_after, changed_until = ExportService(db).delta_window(since, region_id)
+    finally:
+        db.close()
+    scope = ExportScope(
+        region_id=region_id,
+        start_date=None,
+        end_date=None,
+        changed_after=changed_after,
+        changed_until=changed_until,
+    )
+    writer, media_type, extension = _export_format(format, len(sheets))
+    filename = f"ekspor_perubahan_{changed_until.strftime('%Y%m%d%H%M%S')}.{extension}"
+
     return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+        stream_from_producer(partial(writer, sheets=sheets, scope=scope, session_factory=SessionLocal)),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            EXPORT_CURSOR_HEADER: delta_cursor(changed_until, region_id),
+        },
     )
 
 
-def _add_tenants_sheet(wb: Workbook, db: Session, kost_ids: list):
-    """Add tenants data sheet."""
-    ws = wb.create_sheet("Data Penyewa")
-    
-    # Headers
-    headers = ["Nama", "Telepon", "Nama Kost", "Tanggal Masuk", "Tanggal Keluar", "Harga Sewa", "Status"]
-    ws.append(headers)
-    style_header_row(ws)
-    
-    # Query tenants (all tenants, including inactive for full recap)
-    query = db.query(Tenant)
-    if kost_ids:
-        query = query.filter(Tenant.kost_id.in_(kost_ids))
-    
-    tenants = query.order_by(Tenant.created_at.desc()).all()
-    
-    for tenant in tenants:
-        # Get kost name
-        kost = db.query(Kost).filter(Kost.id == tenant.kost_id).first()
-        kost_name = kost.name if kost else "-"
-        
-        ws.append([
-            tenant.name,
-            tenant.phone or "-",
-            kost_name,
-            tenant.start_date.strftime("%d/%m/%Y") if tenant.start_date else "-",
-            tenant.end_date.strftime("%d/%m/%Y") if tenant.end_date else "-",
-            float(tenant.rent_price) if tenant.rent_price else 0,
-            tenant.status or "-",
-        ])
-    
-    auto_size_columns(ws)
-
-
-def _add_payments_sheet(wb: Workbook, db: Session, kost_ids: list, start_date: date, end_date: date):
-    """Add payments (income) data sheet."""
-    ws = wb.create_sheet("Riwayat Pembayaran")
-    
-    # Headers
-    headers = ["Tanggal", "Nama Penyewa", "Nama Kost", "Kategori", "Jumlah", "Keterangan"]
-    ws.append(headers)
-    style_header_row(ws)
-    
-    # Query income transactions
-    query = db.query(Transaction).filter(
-        Transaction.financial_class.in_(["REVENUE", "LIABILITY"]),
-        Transaction.transaction_date >= start_date,
-        Transaction.transaction_date <= end_date,
-    )
-    if kost_ids:
-        query = query.filter(Transaction.kost_id.in_(kost_ids))
-    
-    transactions = query.order_by(Transaction.transaction_date.desc()).all()
-    
-    for tx in transactions:
-        # Get names
-        tenant_name = "-"
-        if tx.tenant_id:
-            tenant = db.query(Tenant).filter(Tenant.id == tx.tenant_id).first()
-            tenant_name = tenant.name if tenant else "-"
-        
-        kost = db.query(Kost).filter(Kost.id == tx.kost_id).first()
-        kost_name = kost.name if kost else "-"
-        
-        ws.append([
-            tx.transaction_date.strftime("%d/%m/%Y"),
-            tenant_name,
-            kost_name,
-            tx.category or "-",
-            float(tx.amount),
-            tx.description or "-",
-        ])
-    
-    auto_size_columns(ws)
-
-
-def _add_financial_sheet(wb: Workbook, db: Session, kost_ids: list, start_date: date, end_date: date):
-    """Add financial report sheet (income, expense, and net)."""
-    ws = wb.create_sheet("Laporan Keuangan")
-
-    # Headers
-    headers = ["Tanggal", "Nama Kost", "Jenis", "Kategori", "Jumlah", "Keterangan"]
-    ws.append(headers)
-    style_header_row(ws)
-
-    # Query income (exclude frozen) and expense transactions
-    income_query = db.query(Transaction).filter(
-        Transaction.financial_class == "REVENUE",
-        Transaction.is_frozen == False,
-        Transaction.transaction_date >= start_date,
-        Transaction.transaction_date <= end_date,
+def _export_format(format: str, sheet_count: int):
+    """(writer, media type, file extension) for an export format."""
+    if format == "csv":
+        if sheet_count == 1:
+            return parallel_sheets(write_csv), CSV_MEDIA_TYPE, "csv"
+        return parallel_sheets(write_csv), ZIP_MEDIA_TYPE, "zip"
+    if format == "ndjson":
+        return parallel_sheets(write_ndjson), NDJSON_MEDIA_TYPE, "ndjson"
+    return parallel_sheets(write_xlsx), XLSX_MEDIA_TYPE, "xlsx"
+
+
+def _export_filename(start_date: date, end_date: date, extension: str) -> str:
+    return f"ekspor_data_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}.{extension}"
+
+
+def _export_response(format: str, start_date: date, end_date: date, data_types: List[str], region_id: Optional[UUID]):
+    sheets = resolve_sheets(data_types)
+    scope = ExportScope(region_id=region_id, start_date=start_date, end_date=end_date)
+    writer, media_type, extension = _export_format(format, len(sheets))
+    filename = _export_filename(start_date, end_date, extension)
+
+    if settings.EXPORT_CACHE_ENABLED:
+        # Unchanged data since an identical export: serve the file it produced.
+        key = export_cache_key(scope, sheets, format, SessionLocal)
+        cached = export_cache.get(key, extension)
+        if cached:
+            return FileResponse(cached, media_type=media_type, filename=filename)
+        writer = export_cache.caching(writer, key, extension)
+
+    return StreamingResponse(
+        stream_from_producer(partial(writer, sheets=sheets, scope=scope, session_factory=SessionLocal)),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
-    expense_query = db.query(Transaction).filter(
-        Transaction.financial_class == "EXPENSE",
-        Transaction.transaction_date >= start_date,
-        Transaction.transaction_date <= end_date,
+
+
+@router.post("/jobs", response_model=ExportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_export_job(
+    data: ExportJobCreate,
+    firebase_uid: str = Depends(get_current_firebase_uid),
+    region_id: Optional[UUID] = Depends(get_current_user_region),
+):
+    """
+    Start a background export. Poll GET /export/jobs/{id} for progress and
+    download the file from its download_url once status is "done".
+    """
+    sheets = resolve_sheets(data.data_types)
+    writer, media_type, extension = _export_format(data.format, len(sheets))
+    job = ExportJob(
+        owner=firebase_uid,
+        scope=ExportScope(region_id=region_id, start_date=data.start_date, end_date=data.end_date),
+        sheets=sheets,
+        format=data.format,
+        filename=_export_filename(data.start_date, data.end_date, extension),
+        media_type=media_type,
+        writer=writer,
     )
-    if kost_ids:
-        income_query = income_query.filter(Transaction.kost_id.in_(kost_ids))
-        expense_query = expense_query.filter(Transaction.kost_id.in_(kost_ids))
-
-    income_txs = income_query.order_by(Transaction.transaction_date.desc()).all()
-    expense_txs = expense_query.order_by(Transaction.transaction_date.desc()).all()
-
-    total_income = 0
-    total_expense = 0
-
-    def get_kost_name(kost_id):
-        if not kost_id:
-            return "-"
-        kost = db.query(Kost).filter(Kost.id == kost_id).first()
-        return kost.name if kost else "-"
-
-    for tx in income_txs:
-        total_income += float(tx.amount)
-        ws.append([
-            tx.transaction_date.strftime("%d/%m/%Y"),
-            get_kost_name(tx.kost_id),
-            "Pendapatan",
-            tx.category or "-",
-            float(tx.amount),
-            tx.description or "-",
-        ])
-
-    for tx in expense_txs:
-        total_expense += float(tx.amount)
-        ws.append([
-            tx.transaction_date.strftime("%d/%m/%Y"),
-            get_kost_name(tx.kost_id),
-            "Pengeluaran",
-            tx.category or "-",
-            float(tx.amount),
-            tx.description or "-",
-        ])
-
-    # Summary row
-    ws.append([])
-    ws.append(["", "", "Total Pendapatan", "", total_income, ""])
-    ws.append(["", "", "Total Pengeluaran", "", total_expense, ""])
-    ws.append(["", "", "Pendapatan Bersih", "", total_income - total_expense, ""])
-
-    auto_size_columns(ws)
+    return export_jobs.submit(job)
+
+
+@router.get("/jobs/{job_id}", response_model=ExportJobResponse)
+def get_export_job(
+    job_id: str,
+    firebase_uid: str = Depends(get_current_firebase_uid),
+):
+    """Get export job status and rows written per data type."""
+    return export_jobs.get(job_id, owner=firebase_uid)
 
 
+@router.get("/jobs/{job_id}/download")
+def download_export_job(
+    job_id: str,
+    firebase_uid: str = Depends(get_current_firebase_uid),
+):
+    """Download a finished export. Supports Range requests for resumed downloads."""
+    job = export_jobs.get(job_id, owner=firebase_uid)
+    if job.status != JOB_DONE:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Export job is {job.status}",
+        )
+    return FileResponse(job.path, media_type=job.media_type, filename=job.filename)
+
+
+@router.get("/cache-stats")
+def get_export_cache_stats(
+    firebase_uid: str = Depends(get_current_firebase_uid),
+):
+    """Get export file cache counters (hits, misses, stores, evictions, size)."""
+    return export_cache.stats()
@@ -0,0 +1,37 @@
+"""
+Export schemas (Pydantic models).
+"""
+
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class ExportJobCreate(BaseModel):
+    """Schema for starting a background export."""
+    start_date: date
+    end_date: date
+    data_types: List[str] = Field(min_length=1)
+    format: str = Field("xlsx", pattern="^(xlsx|csv|ndjson)$")
+
+
+class ExportJobResponse(BaseModel):
+    """Schema for export job status."""
+    id: str
+    status: str  # queued, running, done, failed
+    format: str
+    data_types: List[str]
+    start_date: date
+    end_date: date
+    filename: str
+    progress: Dict[str, int]  # Rows written per data type
+    bytes_written: int = 0
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    download_url: Optional[str] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,287 @@
+"""
+Export service - row sources for every exportable data type.
+
+Each sheet is a single query with kost/tenant names joined in, read through a
+server-side cursor (yield_per), so memory does not grow with the row count.
+
+Delta exports cover rows changed in an updated_at window instead of a date
+range, and start each row with its id and change time so it can be matched to
+the copy from an earlier export.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.exceptions import BadRequestException
+from app.features.common.cursor import decode_cursor, encode_cursor
+from app.features.kosts.model import Kost
+from app.features.tenants.model import Tenant
+from app.features.transactions.model import Transaction
+
+
+# Rows fetched per round trip from the server-side cursor.
+EXPORT_BATCH_SIZE = 1000
+
+Row = List[Any]
+
+
+class SummaryRow(list):
+    """A totals row after the data rows (spreadsheets only; not a record)."""
+
+
+class SheetSpec(NamedTuple):
+    """One exportable data type: sheet title, column headers, field names and its row source."""
+    data_type: str
+    title: str
+    headers: List[str]
+    fields: List[str]  # Machine-readable column names (NDJSON keys)
+    rows: Callable[["ExportService", "ExportScope"], Iterator[Row]]
+
+
+class ExportScope(NamedTuple):
+    """What an export covers: a transaction date range, or (delta) a change window."""
+    region_id: Optional[UUID]
+    start_date: Optional[date]
+    end_date: Optional[date]
+    changed_after: Optional[datetime] = None  # Exclusive; None for everything
+    changed_until: Optional[datetime] = None  # Inclusive; set for delta exports
+
+    @property
+    def is_delta(self) -> bool:
+        return self.changed_until is not None
+
+
+# Leading columns of delta export rows.
+DELTA_HEADERS = ["ID", "Diubah Pada"]
+DELTA_FIELDS = ["id", "updated_at"]
+
+
+def _format_date(value: Optional[date]) -> str:
+    return value.strftime("%d/%m/%Y") if value else "-"
+
+
+def _delta_columns(row, scope: ExportScope) -> Row:
+    if not scope.is_delta:
+        return []
+    return [str(row.id), row.updated_at.isoformat() if row.updated_at else "-"]
+
+
+class ExportService:
+    """Streams export rows straight from the database."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _in_region(self, query, region_id: Optional[UUID]):
+        # Rows must belong to a kost in the region (rows without a kost are excluded).
+        if region_id:
+            query = query.filter(Kost.region_id == region_id)
+        return query
+
+    def _changed(self, query, updated_at, scope: ExportScope):
+        if scope.changed_after is not None:
+            query = query.filter(updated_at > scope.changed_after)
+        if scope.changed_until is not None:
+            query = query.filter(updated_at <= scope.changed_until)
+        return query
+
+    def delta_window(self, since: Optional[str], region_id: Optional[UUID]) -> Tuple[Optional[datetime], datetime]:
+        """
+        (changed_after, changed_until) for a delta export continuing from `since`.
+
+        The window ends EXPORT_DELTA_SETTLE_SECONDS behind database time and
+        never before its start, so consecutive windows neither overlap nor skip.
+        """
+        after = parse_since(since, region_id)
+        now = self.db.query(func.now()).scalar()
+        until = now - timedelta(seconds=settings.EXPORT_DELTA_SETTLE_SECONDS)
+        if after is not None and until < after:
+            until = after
+        return after, until
+
+    def tenant_rows(self, scope: ExportScope) -> Iterator[Row]:
+        """All tenants, including inactive ones for a full recap."""
+        query = (
+            self.db.query(
+                Tenant.id,
+                Tenant.updated_at,
+                Tenant.name,
+                Tenant.phone,
+                Kost.name.label("kost_name"),
+                Tenant.start_date,
+                Tenant.end_date,
+                Tenant.rent_price,
+                Tenant.status,
+            )
+            .outerjoin(Kost, Kost.id == Tenant.kost_id)
+        )
+        query = self._in_region(query, scope.region_id)
+        query = self._changed(query, Tenant.updated_at, scope)
+
+        for row in query.order_by(Tenant.created_at.desc()).yield_per(EXPORT_BATCH_SIZE):
+            yield _delta_columns(row, scope) + [
+                row.name,
+                row.phone or "-",
+                row.kost_name or "-",
+                _format_date(row.start_date),
+                _format_date(row.end_date),
+                float(row.rent_price) if row.rent_price else 0,
+                row.status or "-",
+            ]
+
+    def _transactions(self, scope: ExportScope, *conditions):
+        query = (
+            self.db.query(
+                Transaction.id,
+                Transaction.updated_at,
+                Transaction.transaction_date,
+                Tenant.name.label("tenant_name"),
+                Kost.name.label("kost_name"),
+                Transaction.category,
+                Transaction.amount,
+                Transaction.description,
+            )
+            .outerjoin(Tenant, Tenant.id == Transaction.tenant_id)
+            .outerjoin(Kost, Kost.id == Transaction.kost_id)
+            .filter(*conditions)
+        )
+        if scope.start_date is not None:
+            query = query.filter(Transaction.transaction_date >= scope.start_date)
+        if scope.end_date is not None:
+            query = query.filter(Transaction.transaction_date <= scope.end_date)
+        query = self._in_region(query, scope.region_id)
+        query = self._changed(query, Transaction.updated_at, scope)
+        return query.order_by(Transaction.transaction_date.desc()).yield_per(EXPORT_BATCH_SIZE)
+
+    def payment_rows(self, scope: ExportScope) -> Iterator[Row]:
+        """Income transactions (revenue and DP liabilities) in the date range."""
+        for row in self._transactions(scope, Transaction.financial_class.in_(["REVENUE", "LIABILITY"])):
+            yield _delta_columns(row, scope) + [
+                _format_date(row.transaction_date),
+                row.tenant_name or "-",
+                row.kost_name or "-",
+                row.category or "-",
+                float(row.amount),
+                row.description or "-",
+            ]
+
+    def financial_rows(self, scope: ExportScope) -> Iterator[Row]:
+        """Income (excluding frozen DP) then expenses, followed by summary rows."""
+        total_income = 0
+        total_expense = 0
+
+        income = self._transactions(
+            scope,
+            Transaction.financial_class == "REVENUE",
+            Transaction.is_frozen == False,
+        )
+        for row in income:
+            total_income += float(row.amount)
+            yield _delta_columns(row, scope) + [
+                _format_date(row.transaction_date),
+                row.kost_name or "-",
+                "Pendapatan",
+                row.category or "-",
+                float(row.amount),
+                row.description or "-",
+            ]
+
+        for row in self._transactions(scope, Transaction.financial_class == "EXPENSE"):
+            total_expense += float(row.amount)
+            yield _delta_columns(row, scope) + [
+                _format_date(row.transaction_date),
+                row.kost_name or "-",
+                "Pengeluaran",
+                row.category or "-",
+                float(row.amount),
+                row.description or "-",
+            ]
+
+        if scope.is_delta:
+            return  # Totals of changed rows alone mean nothing.
+
+        # Summary rows
+        yield []
+        yield SummaryRow(["", "", "Total Pendapatan", "", total_income, ""])
+        yield SummaryRow(["", "", "Total Pengeluaran", "", total_expense, ""])
+        yield SummaryRow(["", "", "Pendapatan Bersih", "", total_income - total_expense, ""])
+
+
+SHEETS: Dict[str, SheetSpec] = {
+    spec.data_type: spec
+    for spec in (
+        SheetSpec(
+            "tenants",
+            "Data Penyewa",
+            ["Nama", "Telepon", "Nama Kost", "Tanggal Masuk", "Tanggal Keluar", "Harga Sewa", "Status"],
+            ["name", "phone", "kost_name", "start_date", "end_date", "rent_price", "status"],
+            ExportService.tenant_rows,
+        ),
+        SheetSpec(
+            "payments",
+            "Riwayat Pembayaran",
+            ["Tanggal", "Nama Penyewa", "Nama Kost", "Kategori", "Jumlah", "Keterangan"],
+            ["date", "tenant_name", "kost_name", "category", "amount", "description"],
+            ExportService.payment_rows,
+        ),
+        SheetSpec(
+            "expenses",
+            "Laporan Keuangan",
+            ["Tanggal", "Nama Kost", "Jenis", "Kategori", "Jumlah", "Keterangan"],
+            ["date", "kost_name", "type", "category", "amount", "description"],
+            ExportService.financial_rows,
+        ),
+    )
+}
+
+
+def resolve_sheets(data_types: List[str], delta: bool = False) -> List[SheetSpec]:
+    """Sheets for the requested data types, in request order. Unknown types are skipped."""
+    if not data_types:
+        raise BadRequestException("At least one data type must be selected")
+    # "activity" (activity log) is no longer supported and is ignored like unknown types.
+    sheets = []
+    for data_type in data_types:
+        spec = SHEETS.get(data_type)
+        if spec and spec not in sheets:
+            sheets.append(spec)
+    if not sheets:
+        raise BadRequestException("No valid data types selected")
+    if delta:
+        sheets = [
+            spec._replace(headers=DELTA_HEADERS + spec.headers, fields=DELTA_FIELDS + spec.fields)
+            for spec in sheets
+        ]
+    return sheets
+
+
+def delta_cursor(changed_until: datetime, region_id: Optional[UUID]) -> str:
+    """Opaque cursor continuing a delta export after `changed_until`."""
+    return encode_cursor({"after": changed_until.isoformat(), "region_id": region_id})
+
+
+def parse_since(since: Optional[str], region_id: Optional[UUID]) -> Optional[datetime]:
+    """
+    Start of a delta window: a cursor from a previous delta export, or an ISO
+    8601 timestamp (UTC when it has no offset). Raises 400 on anything else.
+    """
+    if not since:
+        return None
+    try:
+        after = datetime.fromisoformat(since)
+    except ValueError:
+        payload = decode_cursor(since)
+        try:
+            after = datetime.fromisoformat(payload["after"])
+        except (KeyError, TypeError, ValueError):
+            raise BadRequestException(detail="Invalid cursor")
+        if payload.get("region_id") != (str(region_id) if region_id else None):
+            raise BadRequestException(detail="Cursor was issued for a different region")
+    if after.tzinfo is None:
+        after = after.replace(tzinfo=timezone.utc)
+    return after
@@ -0,0 +1,120 @@
+"""
+Pipe bytes written by a blocking producer (openpyxl, csv, ...) to a streaming response.
+
+The producer runs on its own thread and writes into a file-like object; the
+response iterates the chunks as they are produced. The queue between them is
+bounded, so a slow client slows the producer down instead of buffering the
+whole file in memory.
+"""
+
+import queue
+import threading
+from typing import BinaryIO, Callable, Iterator, Optional
+
+
+CHUNK_SIZE = 64 * 1024
+MAX_QUEUED_CHUNKS = 16
+
+_DONE = object()
+
+
+class ExportCancelled(Exception):
+    """Raised inside the producer when the client went away."""
+
+
+class QueueWriter:
+    """
+    Write-only, unseekable file object feeding a queue in CHUNK_SIZE pieces.
+
+    zipfile (and so openpyxl) detects that tell() is unsupported and writes
+    archive entries in streaming mode.
+    """
+
+    def __init__(self, chunks: "queue.Queue", cancelled: threading.Event, chunk_size: int = CHUNK_SIZE):
+        self._chunks = chunks
+        self._cancelled = cancelled
+        self._chunk_size = chunk_size
+        self._buffer = bytearray()
+        self.bytes_written = 0
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self.bytes_written += len(data)
+        while len(self._buffer) >= self._chunk_size:
+            self._emit(bytes(self._buffer[:self._chunk_size]))
+            del self._buffer[:self._chunk_size]
+        return len(data)
+
+    def flush(self) -> None:
+        # Small writes are batched into full chunks; close() emits the rest.
+        pass
+
+    def tell(self) -> int:
+        raise OSError("QueueWriter is not seekable")
+
+    def seekable(self) -> bool:
+        return False
+
+    def writable(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        if self._buffer:
+            self._emit(bytes(self._buffer))
+            self._buffer.clear()
+
+    def _emit(self, chunk: bytes) -> None:
+        while True:
+            if self._cancelled.is_set():
+                raise ExportCancelled()
+            try:
+                self._chunks.put(chunk, timeout=1)
+                return
+            except queue.Full:
+                continue
+
+
+def stream_from_producer(produce: Callable[[BinaryIO], None], name: str = "export") -> Iterator[bytes]:
+    """
+    Run `produce(fileobj)` on a background thread and yield what it writes.
+
+    Errors raised by the producer are re-raised to the consumer. Closing the
+    iterator early (client disconnect) cancels the producer.
+    """
+    chunks: "queue.Queue" = queue.Queue(maxsize=MAX_QUEUED_CHUNKS)
+    cancelled = threading.Event()
+    failure: list = []
+
+    def run() -> None:
+        writer = QueueWriter(chunks, cancelled)
+        try:
+            produce(writer)
+            writer.close()
+        except ExportCancelled:
+            pass
+        except BaseException as exc:
+            failure.append(exc)
+        finally:
+            _put_until_cancelled(chunks, cancelled, _DONE)
+
+    thread = threading.Thread(target=run, name=f"{name}-producer", daemon=True)
+    thread.start()
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is _DONE:
+                break
+            yield chunk
+        if failure:
+            raise failure[0]
+    finally:
+        cancelled.set()
+
+
+def _put_until_cancelled(chunks: "queue.Queue", cancelled: threading.Event, item) -> None:
+    while not cancelled.is_set():
+        try:
+            chunks.put(item, timeout=1)
+            return
+        except queue.Full:
+            continue
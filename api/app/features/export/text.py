@@ -0,0 +1,86 @@
+"""
+CSV and NDJSON export writers.
+
+Rows are serialized straight from the export row sources into the output in
+batches; no styling, no workbook. Several data types are written as a zip of
+per-sheet CSVs, or as one NDJSON stream tagged with the data type.
+"""
+
+import csv
+import io
+import json
+import zipfile
+from typing import BinaryIO, Callable, List
+
+from sqlalchemy.orm import Session
+
+from app.features.export.service import ExportScope, ExportService, SheetSpec, SummaryRow
+
+
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+ZIP_MEDIA_TYPE = "application/zip"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Serialized text is handed to the output in pieces of about this size.
+FLUSH_SIZE = 64 * 1024
+
+
+def _write_csv_sheet(out: BinaryIO, spec: SheetSpec, service: ExportService, scope: ExportScope) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(spec.headers)
+    for row in spec.rows(service, scope):
+        writer.writerow(row)
+        if buffer.tell() >= FLUSH_SIZE:
+            out.write(buffer.getvalue().encode("utf-8"))
+            buffer.seek(0)
+            buffer.truncate()
+    out.write(buffer.getvalue().encode("utf-8"))
+
+
+def write_csv(
+    fileobj: BinaryIO,
+    sheets: List[SheetSpec],
+    scope: ExportScope,
+    session_factory: Callable[[], Session],
+) -> None:
+    """One data type: a plain CSV. Several: a zip with one CSV per data type."""
+    db = session_factory()
+    try:
+        service = ExportService(db)
+        if len(sheets) == 1:
+            _write_csv_sheet(fileobj, sheets[0], service, scope)
+            return
+        with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+            for spec in sheets:
+                with archive.open(f"{spec.data_type}.csv", "w", force_zip64=True) as entry:
+                    _write_csv_sheet(entry, spec, service, scope)
+    finally:
+        db.close()
+
+
+def write_ndjson(
+    fileobj: BinaryIO,
+    sheets: List[SheetSpec],
+    scope: ExportScope,
+    session_factory: Callable[[], Session],
+) -> None:
+    """One JSON object per row, keyed by field name, with the data type in "data_type"."""
+    db = session_factory()
+    try:
+        service = ExportService(db)
+        buffer = io.StringIO()
+        for spec in sheets:
+            for row in spec.rows(service, scope):
+                if not row or isinstance(row, SummaryRow):
+                    continue  # Spacer and totals rows only make sense in spreadsheets.
+                record = {"data_type": spec.data_type, **dict(zip(spec.fields, row))}
+                buffer.write(json.dumps(record, ensure_ascii=False, default=str))
+                buffer.write("\n")
+                if buffer.tell() >= FLUSH_SIZE:
+                    fileobj.write(buffer.getvalue().encode("utf-8"))
+                    buffer.seek(0)
+                    buffer.truncate()
+        fileobj.write(buffer.getvalue().encode("utf-8"))
+    finally:
+        db.close()
@@ -0,0 +1,123 @@
+"""
+XLSX export writer - openpyxl write-only workbooks.
+
+Rows are appended straight from the export row sources; openpyxl spools each
+worksheet to a temp file, so memory stays flat regardless of row count.
+Column widths are sized while rows are appended (from the first rows only,
+since a write-only sheet needs its widths before any row is written).
+"""
+
+from itertools import islice
+from typing import Any, BinaryIO, Callable, List, Optional
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.features.export.service import ExportScope, ExportService, Row, SheetSpec
+
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+MIN_COLUMN_WIDTH = 14
+MAX_COLUMN_WIDTH = 50
+
+HEADER_STYLE = "export_header"
+
+
+def header_style() -> NamedStyle:
+    """Header cell style; registered once per workbook."""
+    thin = Side(style="thin")
+    return NamedStyle(
+        name=HEADER_STYLE,
+        font=Font(bold=True, color="FFFFFF"),
+        fill=PatternFill(start_color="0f766d", end_color="0f766d", fill_type="solid"),
+        alignment=Alignment(horizontal="center", vertical="center"),
+        border=Border(left=thin, right=thin, top=thin, bottom=thin),
+    )
+
+
+def header_cells(ws, headers: List[str]) -> List[WriteOnlyCell]:
+    """Header row for a write-only worksheet whose workbook has the header style."""
+    cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.style = HEADER_STYLE
+        cells.append(cell)
+    return cells
+
+
+def _display_length(value: Any) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, float):
+        # Amounts are shown without trailing ".0"
+        value = int(value) if value.is_integer() else value
+    return len(str(value))
+
+
+class ColumnWidthTracker:
+    """Widest value seen per column, fed row by row."""
+
+    def __init__(self, headers: List[str]):
+        self.lengths = [len(header) for header in headers]
+
+    def add(self, row: Row) -> None:
+        lengths = self.lengths
+        for index, value in enumerate(row):
+            length = _display_length(value)
+            if index >= len(lengths):
+                lengths.append(length)
+            elif length > lengths[index]:
+                lengths[index] = length
+
+    def apply(self, ws) -> None:
+        """Set the tracked widths; must run before the first row of a write-only sheet."""
+        for index, length in enumerate(self.lengths, start=1):
+            width = min(max(length + 2, MIN_COLUMN_WIDTH), MAX_COLUMN_WIDTH)
+            ws.column_dimensions[get_column_letter(index)].width = width
+
+
+def write_sheet(ws, headers: List[str], rows, sample_rows: Optional[int] = None) -> None:
+    """
+    Size columns from the header and the first `sample_rows` rows, then write
+    the header and every row. Each value is measured at most once.
+    """
+    if sample_rows is None:
+        sample_rows = settings.EXPORT_XLSX_WIDTH_SAMPLE_ROWS
+    rows = iter(rows)
+    sample = list(islice(rows, max(0, sample_rows)))
+
+    widths = ColumnWidthTracker(headers)
+    for row in sample:
+        widths.add(row)
+    widths.apply(ws)
+
+    ws.append(header_cells(ws, headers))
+    for row in sample:
+        ws.append(row)
+    for row in rows:
+        ws.append(row)
+
+
+def write_xlsx(
+    fileobj: BinaryIO,
+    sheets: List[SheetSpec],
+    scope: ExportScope,
+    session_factory: Callable[[], Session],
+) -> None:
+    """Write one sheet per data type to `fileobj`."""
+    db = session_factory()
+    try:
+        service = ExportService(db)
+        wb = Workbook(write_only=True)
+        wb.add_named_style(header_style())
+        for spec in sheets:
+            ws = wb.create_sheet(spec.title)
+            write_sheet(ws, spec.headers, spec.rows(service, scope))
+        wb.save(fileobj)
+    finally:
+        db.close()
@@ -21,5 +21,6 @@ class Kost(Base):
     name = Column(String, nullable=False)
     address = Column(Text, nullable=True)
     total_units = Column(Integer, nullable=False, default=0)
+    active_tenants = Column(Integer, nullable=False, default=0)  # is_active tenants, kept by KostsService.reserve_units/release_units
     notes = Column(Text, nullable=True)
-    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
@@ -5,7 +5,7 @@ Kosts router - API endpoints.
 from uuid import UUID
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Query, status, HTTPException
+from fastapi import APIRouter, Depends, Query, Request, Response, status, HTTPException
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
@@ -22,6 +22,7 @@ router = APIRouter()
 
 
 from app.features.common.dependencies import get_current_user_region
+from app.features.common.conditional import check_not_modified
 
 
 def _enforce_region_scope(kost_id: UUID, region_id: Optional[UUID], db: Session) -> None:
@@ -36,15 +37,28 @@ def _enforce_region_scope(kost_id: UUID, region_id: Optional[UUID], db: Session)
 
 @router.get("", response_model=KostListResponse)
 async def get_kosts(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
+    after: Optional[str] = Query(None, description="next_cursor from the previous page (replaces page)"),
+    include_total: bool = Query(True, description="Include the total count"),
     region_id: Optional[UUID] = Depends(get_current_user_region),
     db: Session = Depends(get_db),
 ):
     """Get paginated list of kosts, filtered by user's region."""
+    not_modified = check_not_modified(request, response, db, region_id=region_id)
+    if not_modified:
+        return not_modified
     service = KostsService(db)
-    items, total = service.get_all(page=page, page_size=page_size, region_id=region_id)
-    return KostListResponse(items=items, total=total, page=page, page_size=page_size)
+    items, total, next_cursor = service.get_all(
+        page=page,
+        page_size=page_size,
+        region_id=region_id,
+        after=after,
+        include_total=include_total,
+    )
+    return KostListResponse(items=items, total=total, page=page, page_size=page_size, next_cursor=next_cursor)
 
 
 @router.get("/{kost_id}", response_model=KostResponse)
@@ -35,6 +35,7 @@ class KostResponse(KostBase):
     """Schema for kost response."""
     id: UUID
     region_id: Optional[UUID] = None
+    active_tenants: int = 0
     created_at: datetime
 
     class Config:
@@ -44,6 +45,7 @@ class KostResponse(KostBase):
 class KostListResponse(BaseModel):
     """Schema for paginated kost list."""
     items: list[KostResponse]
-    total: int
+    total: Optional[int] = None  # Omitted when include_total=false
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
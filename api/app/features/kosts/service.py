@@ -2,17 +2,20 @@
 Kosts service - Business logic with database operations.
 """
 
+from datetime import datetime
 from typing import List, Optional
 from uuid import UUID
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, tuple_, update
 from fastapi import HTTPException, status
 
-from app.core.exceptions import NotFoundException
+from app.core.events import stage_write
+from app.core.exceptions import BadRequestException, NotFoundException
+from app.features.common.cursor import decode_cursor, encode_cursor
+from app.features.common.totals import cached_total
 from app.features.kosts.model import Kost
 from app.features.kosts.schemas import KostCreate, KostUpdate
-from app.features.tenants.model import Tenant
 
 
 class KostsService:
@@ -21,38 +24,92 @@ class KostsService:
     def __init__(self, db: Session):
         self.db = db
 
-    def _count_active_tenants(self, kost_id: UUID) -> int:
-        return (
-            self.db.query(func.count(Tenant.id))
-            .filter(
-                Tenant.kost_id == kost_id,
-                Tenant.is_active == True,
+    def reserve_units(self, kost_id: UUID, count: int = 1) -> int:
+        """
+        Take `count` units of a kost for newly active tenants and return the new
+        occupancy. The check and increment are a single conditional UPDATE, so
+        concurrent writers cannot overfill a kost. Raises 400 when it is full.
+        """
+        occupied = self.db.execute(
+            update(Kost)
+            .where(Kost.id == kost_id, Kost.active_tenants + count <= Kost.total_units)
+            .values(active_tenants=Kost.active_tenants + count)
+            .returning(Kost.active_tenants)
+            .execution_options(synchronize_session="fetch")
+        ).scalar()
+        if occupied is None:
+            kost = self.db.query(Kost.active_tenants, Kost.total_units).filter(Kost.id == kost_id).first()
+            if not kost:
+                raise NotFoundException("Kost not found")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Kost sudah penuh ({kost.active_tenants}/{kost.total_units}).",
             )
-            .scalar()
-            or 0
+        return occupied
+
+    def release_units(self, kost_id: UUID, count: int = 1) -> None:
+        """Give back `count` units of a kost when tenants stop being active."""
+        self.db.execute(
+            update(Kost)
+            .where(Kost.id == kost_id)
+            .values(active_tenants=func.greatest(Kost.active_tenants - count, 0))
+            .execution_options(synchronize_session="fetch")
         )
 
-    def get_all(self, page: int = 1, page_size: int = 10, region_id: Optional[UUID] = None) -> tuple[List[Kost], int]:
-        """Get paginated list of kosts, optionally filtered by region."""
+    def _get_for_update(self, kost_id: UUID) -> Kost:
+        # Row lock: tenant writes reserving units wait until this transaction ends.
+        kost = self.db.query(Kost).filter(Kost.id == kost_id).populate_existing().with_for_update().first()
+        if not kost:
+            raise NotFoundException(f"Kost with id {kost_id} not found")
+        return kost
+
+    def get_all(
+        self,
+        page: int = 1,
+        page_size: int = 10,
+        region_id: Optional[UUID] = None,
+        after: Optional[str] = None,
+        include_total: bool = True,
+    ) -> tuple[List[Kost], Optional[int], Optional[str]]:
+        """
+        Get a page of kosts, optionally filtered by region, newest first.
+
+        Pages by `after` (the previous page's next_cursor) when given, else by
+        page number. The total comes from the list total cache and is skipped
+        when `include_total` is false. Returns (items, total, next_cursor).
+        """
         query = self.db.query(Kost)
         
         if region_id:
             query = query.filter(Kost.region_id == region_id)
 
-        # Get total count
-        total = query.with_entities(func.count(Kost.id)).scalar()
-        
-        # Get paginated items
-        offset = (page - 1) * page_size
-        items = (
-            query
-            .order_by(Kost.created_at.desc())
-            .offset(offset)
-            .limit(page_size)
-            .all()
-        )
+        total = None
+        if include_total:
+            total = cached_total(
+                "kosts",
+                lambda: query.with_entities(func.count(Kost.id)).scalar(),
+                region_id=region_id,
+            )
+
+        query = query.order_by(Kost.created_at.desc(), Kost.id.desc())
+        if after:
+            cursor = decode_cursor(after)
+            try:
+                key = (datetime.fromisoformat(cursor["c"]), UUID(cursor["i"]))
+            except (KeyError, TypeError, ValueError):
+                raise BadRequestException(detail="Invalid cursor")
+            query = query.filter(tuple_(Kost.created_at, Kost.id) < tuple_(*key))
+        else:
+            query = query.offset((page - 1) * page_size)
+
+        items = query.limit(page_size + 1).all()
+        next_cursor = None
+        if len(items) > page_size:
+            items = items[:page_size]
+            last = items[-1]
+            next_cursor = encode_cursor({"c": last.created_at.isoformat(), "i": str(last.id)})
         
-        return items, total
+        return items, total, next_cursor
 
     def get_by_id(self, kost_id: UUID) -> Kost:
         """Get kost by ID."""
@@ -67,37 +124,43 @@ class KostsService:
         """Create new kost."""
         kost = Kost(**data.model_dump())
         self.db.add(kost)
+        self.db.flush()
+        stage_write(self.db, "kost", region_id=kost.region_id, kost_id=kost.id)
         self.db.commit()
         self.db.refresh(kost)
         return kost
 
     def update(self, kost_id: UUID, data: KostUpdate) -> Kost:
         """Update existing kost."""
-        kost = self.get_by_id(kost_id)
-        
         update_data = data.model_dump(exclude_unset=True)
-        if "total_units" in update_data and update_data["total_units"] is not None:
-            active_tenants = self._count_active_tenants(kost_id)
-            if update_data["total_units"] < active_tenants:
+        if update_data.get("total_units") is not None:
+            kost = self._get_for_update(kost_id)
+            if update_data["total_units"] < kost.active_tenants:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Jumlah unit tidak boleh kurang dari jumlah penyewa aktif ({active_tenants}).",
+                    detail=f"Jumlah unit tidak boleh kurang dari jumlah penyewa aktif ({kost.active_tenants}).",
                 )
+        else:
+            kost = self.get_by_id(kost_id)
+        previous_region_id = kost.region_id
         for key, value in update_data.items():
             setattr(kost, key, value)
         
+        stage_write(self.db, "kost", region_id=kost.region_id, kost_id=kost.id)
+        if previous_region_id != kost.region_id:
+            stage_write(self.db, "kost", region_id=previous_region_id, kost_id=kost.id)
         self.db.commit()
         self.db.refresh(kost)
         return kost
 
     def delete(self, kost_id: UUID) -> None:
         """Delete kost."""
-        kost = self.get_by_id(kost_id)
-        active_tenants = self._count_active_tenants(kost_id)
-        if active_tenants > 0:
+        kost = self._get_for_update(kost_id)
+        if kost.active_tenants > 0:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Kost masih memiliki penyewa aktif dan tidak bisa dihapus.",
             )
+        stage_write(self.db, "kost", region_id=kost.region_id, kost_id=kost.id)
         self.db.delete(kost)
         self.db.commit()
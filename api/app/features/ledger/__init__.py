@@ -0,0 +1,3 @@
+"""
+Ledger feature package.
+"""
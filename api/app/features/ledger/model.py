@@ -0,0 +1,43 @@
+"""
+Ledger daily rollup model - SQLAlchemy ORM model.
+"""
+
+from sqlalchemy import Column, String, Date, BigInteger, Integer, Boolean, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID, ENUM as PGEnum
+
+from app.db.base import Base
+
+
+class LedgerDaily(Base):
+    """
+    Daily transaction totals per (region, kost, date, class, category, frozen, linked).
+
+    Maintained incrementally by LedgerService in the same DB transaction as every
+    transaction write; rebuilt from scratch by scripts/rebuild_ledger_daily.py.
+    """
+
+    __tablename__ = "ledger_daily"
+    __table_args__ = (
+        UniqueConstraint(
+            "region_id", "kost_id", "ledger_date", "financial_class", "category", "is_frozen", "is_linked",
+            name="uq_ledger_daily_key",
+            postgresql_nulls_not_distinct=True,
+        ),
+        Index("ix_ledger_daily_region_date", "region_id", "ledger_date"),
+        Index("ix_ledger_daily_kost_date", "kost_id", "ledger_date"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    region_id = Column(UUID(as_uuid=True), ForeignKey("regions.id"), nullable=True)
+    kost_id = Column(UUID(as_uuid=True), ForeignKey("kosts.id"), nullable=True)
+    ledger_date = Column(Date, nullable=False)
+    financial_class = Column(
+        PGEnum("REVENUE", "EXPENSE", "LIABILITY", "REFUND", "ADJUSTMENT", name="financial_class", create_type=False),
+        nullable=False,
+    )
+    category = Column(String, nullable=True)
+    is_frozen = Column(Boolean, nullable=False, default=False)
+    # True when the rows reference a rent payment (extra fees, released DP).
+    is_linked = Column(Boolean, nullable=False, default=False)
+    amount = Column(BigInteger, nullable=False, default=0)
+    tx_count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,153 @@
+"""
+Ledger service - keeps the ledger_daily rollup in sync with transaction writes.
+"""
+
+from collections import defaultdict
+from datetime import date
+from typing import Dict, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.features.ledger.model import LedgerDaily
+from app.features.transactions.model import Transaction
+
+
+class LedgerKey(NamedTuple):
+    """Rollup key of a single transaction."""
+    region_id: Optional[UUID]
+    kost_id: Optional[UUID]
+    ledger_date: date
+    financial_class: str
+    category: Optional[str]
+    is_frozen: bool
+    is_linked: bool
+
+
+# (key, amount) of a transaction as it was before a change.
+LedgerSnapshot = Tuple[LedgerKey, int]
+
+
+class LedgerService:
+    """
+    Collects rollup deltas for transaction writes and applies them in one upsert.
+
+    Usage inside a write path (before commit):
+        ledger = LedgerService(db)
+        ledger.add(new_tx)
+        before = LedgerService.snapshot(existing_tx)
+        ...mutate existing_tx...
+        ledger.change(before, existing_tx)
+        ledger.apply()
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._deltas: Dict[LedgerKey, list] = defaultdict(lambda: [0, 0])
+
+    @staticmethod
+    def key_for(tx: Transaction) -> LedgerKey:
+        return LedgerKey(
+            region_id=tx.region_id,
+            kost_id=tx.kost_id,
+            ledger_date=tx.transaction_date,
+            financial_class=tx.financial_class,
+            category=tx.category,
+            is_frozen=bool(tx.is_frozen),
+            is_linked=tx.reference_id is not None,
+        )
+
+    @classmethod
+    def snapshot(cls, tx: Transaction) -> LedgerSnapshot:
+        """Capture a transaction's rollup contribution before mutating it."""
+        return cls.key_for(tx), int(tx.amount or 0)
+
+    def add_delta(self, key: LedgerKey, amount: int, count: int) -> None:
+        delta = self._deltas[key]
+        delta[0] += amount
+        delta[1] += count
+
+    def add(self, tx: Transaction) -> None:
+        """Account for a newly created transaction."""
+        self.add_delta(self.key_for(tx), int(tx.amount or 0), 1)
+
+    def change(self, before: LedgerSnapshot, tx: Transaction) -> None:
+        """Move a mutated transaction from its previous key/amount to the current one."""
+        key, amount = before
+        self.add_delta(key, -amount, -1)
+        self.add(tx)
+
+    def apply(self) -> None:
+        """Write pending deltas to ledger_daily (no commit)."""
+        rows = [
+            {**key._asdict(), "amount": amount, "tx_count": count}
+            for key, (amount, count) in self._deltas.items()
+            if amount or count
+        ]
+        self._deltas.clear()
+        if not rows:
+            return
+
+        stmt = pg_insert(LedgerDaily).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_ledger_daily_key",
+            set_={
+                "amount": LedgerDaily.amount + stmt.excluded.amount,
+                "tx_count": LedgerDaily.tx_count + stmt.excluded.tx_count,
+            },
+        )
+        self.db.execute(stmt)
+
+    def rebuild_kost(self, kost_id: Optional[UUID]) -> int:
+        """
+        Recompute all rollup rows of one kost from transactions (no commit).
+        kost_id=None rebuilds region-level rows (transactions without kost).
+        Returns the number of rollup rows written.
+        """
+        if kost_id is None:
+            tx_scope = Transaction.kost_id.is_(None)
+            ledger_scope = LedgerDaily.kost_id.is_(None)
+        else:
+            tx_scope = Transaction.kost_id == kost_id
+            ledger_scope = LedgerDaily.kost_id == kost_id
+
+        self.db.execute(delete(LedgerDaily).where(ledger_scope))
+
+        is_linked = Transaction.reference_id.isnot(None)
+        group_columns = (
+            Transaction.region_id,
+            Transaction.kost_id,
+            Transaction.transaction_date,
+            Transaction.financial_class,
+            Transaction.category,
+            Transaction.is_frozen,
+            is_linked,
+        )
+        aggregated = (
+            select(
+                *group_columns,
+                func.sum(Transaction.amount),
+                func.count(Transaction.id),
+            )
+            .where(tx_scope)
+            .group_by(*group_columns)
+        )
+        result = self.db.execute(
+            insert(LedgerDaily).from_select(
+                [
+                    "region_id",
+                    "kost_id",
+                    "ledger_date",
+                    "financial_class",
+                    "category",
+                    "is_frozen",
+                    "is_linked",
+                    "amount",
+                    "tx_count",
+                ],
+                aggregated,
+            )
+        )
+        return result.rowcount or 0
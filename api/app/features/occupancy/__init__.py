@@ -0,0 +1,3 @@
+"""
+Occupancy feature package.
+"""
@@ -0,0 +1,54 @@
+"""
+Occupancy models - tenant status history and nightly per-kost snapshots.
+"""
+
+from sqlalchemy import Column, String, Date, DateTime, BigInteger, Integer, Boolean, ForeignKey, Index, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base import Base
+
+
+class TenantStatusHistory(Base):
+    """
+    One row per tenant state transition (kost, status, is_active).
+
+    Written by every path that changes a tenant's state; the first row of a
+    tenant has no from_* values.
+    """
+
+    __tablename__ = "tenant_status_history"
+    __table_args__ = (
+        Index("ix_tenant_status_history_tenant_changed", "tenant_id", "changed_at"),
+        Index("ix_tenant_status_history_changed", "changed_at"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
+    kost_id = Column(UUID(as_uuid=True), ForeignKey("kosts.id", ondelete="CASCADE"), nullable=False)
+    from_status = Column(String, nullable=True)
+    to_status = Column(String, nullable=False)
+    from_active = Column(Boolean, nullable=True)
+    to_active = Column(Boolean, nullable=False)
+    source = Column(String, nullable=False)  # create, import, update, delete, bulk_status, payment, cron, backfill
+    changed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class OccupancySnapshot(Base):
+    """Tenant counts per kost at the end of a day, built from tenant_status_history."""
+
+    __tablename__ = "occupancy_snapshots"
+    __table_args__ = (
+        UniqueConstraint("snapshot_date", "kost_id", name="uq_occupancy_snapshots_date_kost"),
+        Index("ix_occupancy_snapshots_kost_date", "kost_id", "snapshot_date"),
+        Index("ix_occupancy_snapshots_region_date", "region_id", "snapshot_date"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    snapshot_date = Column(Date, nullable=False)
+    kost_id = Column(UUID(as_uuid=True), ForeignKey("kosts.id", ondelete="CASCADE"), nullable=False)
+    region_id = Column(UUID(as_uuid=True), ForeignKey("regions.id"), nullable=True)
+    total_units = Column(Integer, nullable=False, default=0)
+    occupied = Column(Integer, nullable=False, default=0)  # is_active, any status
+    active_tenants = Column(Integer, nullable=False, default=0)  # status aktif (dashboard "total tenants")
+    late_tenants = Column(Integer, nullable=False, default=0)
+    dp_tenants = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,186 @@
+"""
+Occupancy service - records tenant state transitions and builds daily snapshots.
+"""
+
+from datetime import date, datetime, time, timedelta
+from typing import List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import Date, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.features.kosts.model import Kost
+from app.features.occupancy.model import OccupancySnapshot, TenantStatusHistory
+from app.features.tenants.model import Tenant
+
+
+class TenantState(NamedTuple):
+    """The part of a tenant that occupancy depends on."""
+    kost_id: Optional[UUID]
+    status: Optional[str]
+    is_active: Optional[bool]
+
+    @classmethod
+    def of(cls, tenant: Tenant) -> "TenantState":
+        return cls(tenant.kost_id, tenant.status, bool(tenant.is_active))
+
+
+class OccupancyService:
+    """
+    Tenant status history and per-kost occupancy snapshots.
+
+    Usage inside a tenant write path (before commit):
+        before = TenantState.of(tenant)
+        ...mutate tenant...
+        OccupancyService(db).record(tenant, before, "update")
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record(self, tenant: Tenant, before: Optional[TenantState], source: str) -> bool:
+        """Add a history row if the tenant's state changed. Returns whether one was added."""
+        after = TenantState.of(tenant)
+        if before == after:
+            return False
+        self.db.add(TenantStatusHistory(
+            tenant_id=tenant.id,
+            kost_id=after.kost_id,
+            from_status=before.status if before else None,
+            to_status=after.status,
+            from_active=before.is_active if before else None,
+            to_active=after.is_active,
+            source=source,
+        ))
+        return True
+
+    def record_created(self, tenants: List[Tenant], source: str) -> None:
+        """First history row of many new tenants, in one multi-row insert."""
+        self.record_many([(tenant.id, None, TenantState.of(tenant)) for tenant in tenants], source)
+
+    def record_many(self, changes: List[Tuple[UUID, Optional[TenantState], TenantState]], source: str) -> None:
+        """History rows for many (tenant_id, before, after) transitions, in one multi-row insert."""
+        rows = [
+            {
+                "tenant_id": tenant_id,
+                "kost_id": after.kost_id,
+                "from_status": before.status if before else None,
+                "to_status": after.status,
+                "from_active": before.is_active if before else None,
+                "to_active": after.is_active,
+                "source": source,
+            }
+            for tenant_id, before, after in changes
+            if before != after
+        ]
+        if rows:
+            self.db.execute(insert(TenantStatusHistory), rows)
+
+    def build_snapshot(self, snapshot_date: date) -> int:
+        """
+        Upsert one snapshot row per kost for the end of `snapshot_date`.
+
+        Each tenant's state is its latest history row before the next local
+        midnight (the same local day as date.today()), so snapshots can be
+        rebuilt for past days. Returns the number of rows written.
+        """
+        # Aware, so the timestamptz comparison doesn't depend on the session TimeZone.
+        cutoff = datetime.combine(snapshot_date + timedelta(days=1), time.min).astimezone()
+        latest = (
+            select(
+                TenantStatusHistory.tenant_id,
+                TenantStatusHistory.kost_id,
+                TenantStatusHistory.to_status,
+                TenantStatusHistory.to_active,
+            )
+            .where(TenantStatusHistory.changed_at < cutoff)
+            .order_by(
+                TenantStatusHistory.tenant_id,
+                TenantStatusHistory.changed_at.desc(),
+                TenantStatusHistory.id.desc(),
+            )
+            .distinct(TenantStatusHistory.tenant_id)
+            .subquery("latest")
+        )
+
+        def count(*conditions):
+            return func.count(latest.c.tenant_id).filter(latest.c.to_active == True, *conditions)
+
+        counts = (
+            select(
+                literal(snapshot_date, Date).label("snapshot_date"),
+                Kost.id.label("kost_id"),
+                Kost.region_id.label("region_id"),
+                func.coalesce(Kost.total_units, 0).label("total_units"),
+                count().label("occupied"),
+                count(latest.c.to_status == "aktif").label("active_tenants"),
+                count(latest.c.to_status == "telat").label("late_tenants"),
+                count(latest.c.to_status == "dp").label("dp_tenants"),
+            )
+            .select_from(Kost)
+            .outerjoin(latest, latest.c.kost_id == Kost.id)
+            .group_by(Kost.id, Kost.region_id, Kost.total_units)
+        )
+
+        columns = [
+            "snapshot_date", "kost_id", "region_id", "total_units",
+            "occupied", "active_tenants", "late_tenants", "dp_tenants",
+        ]
+        stmt = pg_insert(OccupancySnapshot).from_select(columns, counts)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_occupancy_snapshots_date_kost",
+            set_={name: stmt.excluded[name] for name in columns[2:]},
+        )
+        return self.db.execute(stmt).rowcount
+
+    def _scoped(self, query, kost_id: UUID = None, region_id: UUID = None):
+        if kost_id:
+            return query.filter(OccupancySnapshot.kost_id == kost_id)
+        if region_id:
+            return query.filter(OccupancySnapshot.region_id == region_id)
+        return query
+
+    def active_tenants_on(self, reference_date: date, kost_id: UUID = None, region_id: UUID = None) -> Optional[int]:
+        """Active tenants in scope per the latest snapshot on or before `reference_date` (None if none)."""
+        latest_date = self._scoped(
+            self.db.query(func.max(OccupancySnapshot.snapshot_date))
+            .filter(OccupancySnapshot.snapshot_date <= reference_date),
+            kost_id, region_id,
+        ).scalar_subquery()
+        total = self._scoped(
+            self.db.query(func.sum(OccupancySnapshot.active_tenants))
+            .filter(OccupancySnapshot.snapshot_date == latest_date),
+            kost_id, region_id,
+        ).scalar()
+        return int(total) if total is not None else None
+
+    def get_history(
+        self,
+        start_date: date,
+        end_date: date,
+        kost_id: UUID = None,
+        region_id: UUID = None,
+    ) -> List:
+        """Daily totals over the scope's kosts, oldest first."""
+        query = self._scoped(
+            self.db.query(
+                OccupancySnapshot.snapshot_date,
+                func.sum(OccupancySnapshot.total_units).label("total_units"),
+                func.sum(OccupancySnapshot.occupied).label("occupied"),
+                func.sum(OccupancySnapshot.active_tenants).label("active_tenants"),
+                func.sum(OccupancySnapshot.late_tenants).label("late_tenants"),
+                func.sum(OccupancySnapshot.dp_tenants).label("dp_tenants"),
+            )
+            .filter(
+                OccupancySnapshot.snapshot_date >= start_date,
+                OccupancySnapshot.snapshot_date <= end_date,
+            ),
+            kost_id, region_id,
+        )
+        return (
+            query
+            .group_by(OccupancySnapshot.snapshot_date)
+            .order_by(OccupancySnapshot.snapshot_date)
+            .all()
+        )
@@ -7,6 +7,7 @@ from datetime import date
 from uuid import UUID
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
+from app.core.events import stage_write
 from app.features.regions.model import Regions
 from app.core.exceptions import NotFoundException
 from app.features.regions.schemas import RegionsCreate, RegionsUpdate
@@ -46,6 +47,7 @@ class RegionsService:
         for owner in owners:
             self.db.add(UserRegion(user_id=owner.id, region_id=db_item.id))
 
+        stage_write(self.db, "region", region_id=db_item.id)
         self.db.commit()
         self.db.refresh(db_item)
         return db_item
@@ -57,6 +59,8 @@ class RegionsService:
         for key, value in update_data.items():
             setattr(item, key, value)
 
+        # Global: region names appear in kost-scoped responses too.
+        stage_write(self.db, "region")
         self.db.commit()
         self.db.refresh(item)
         return item
@@ -83,4 +87,5 @@ class RegionsService:
 
         self.db.query(UserRegion).filter(UserRegion.region_id == item_id).delete(synchronize_session=False)
         self.db.delete(item)
+        stage_write(self.db, "region", region_id=item_id)
         self.db.commit()
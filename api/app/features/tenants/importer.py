@@ -0,0 +1,152 @@
+"""
+Tenant import file reader - CSV and XLSX.
+
+Rows are read one at a time (csv reader / openpyxl read-only mode) and mapped
+to TenantCreate field names by header. Headers may be the API field names or
+the Indonesian column titles used by the export and the old Excel books. Values
+are only normalized here; validation is left to TenantCreate and the service.
+"""
+
+import csv
+import io
+import re
+from datetime import date, datetime
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple
+
+from openpyxl import load_workbook
+
+from app.core.exceptions import BadRequestException
+
+
+IMPORT_MAX_ROWS = 5000
+
+# Accepted header titles (lowercased) per field.
+FIELD_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "name": ("name", "nama", "nama penyewa"),
+    "phone": ("phone", "telepon", "no hp", "no. hp"),
+    "kost_id": ("kost_id",),
+    "kost_name": ("kost_name", "kost", "nama kost"),
+    "start_date": ("start_date", "tanggal masuk"),
+    "rent_price": ("rent_price", "harga sewa"),
+    "trash_fee": ("trash_fee", "biaya sampah"),
+    "security_fee": ("security_fee", "biaya keamanan"),
+    "admin_fee": ("admin_fee", "biaya admin"),
+    "dp_amount": ("dp_amount", "jumlah dp"),
+    "dp_due_date": ("dp_due_date", "jatuh tempo dp"),
+    "status": ("status",),
+}
+
+_HEADER_FIELDS = {alias: field for field, aliases in FIELD_ALIASES.items() for alias in aliases}
+
+DATE_FIELDS = {"start_date", "dp_due_date"}
+AMOUNT_FIELDS = {"rent_price", "trash_fee", "security_fee", "admin_fee", "dp_amount"}
+
+# 1.500.000 / 1,500,000 (thousands separators only)
+_GROUPED_NUMBER = re.compile(r"\d{1,3}([.,]\d{3})+")
+
+ImportRow = Tuple[int, Dict[str, Any]]  # (spreadsheet row number, field values)
+
+
+def _normalize_date(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            return datetime.strptime(text, "%d/%m/%Y").date()  # Export format
+        except ValueError:
+            return text  # ISO dates are parsed by the schema
+    return value
+
+
+def _normalize_amount(value: Any) -> Any:
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        text = value.strip()
+        if text.lower().startswith("rp"):
+            text = text[2:].strip()
+        if _GROUPED_NUMBER.fullmatch(text):
+            text = re.sub(r"[.,]", "", text)
+        return text
+    return value
+
+
+def _normalize(field: str, value: Any) -> Any:
+    if isinstance(value, str) and not value.strip():
+        return None
+    if value is None:
+        return None
+    if field in DATE_FIELDS:
+        return _normalize_date(value)
+    if field in AMOUNT_FIELDS:
+        return _normalize_amount(value)
+    if field == "status" and isinstance(value, str):
+        return value.strip().lower()
+    if field == "phone" and isinstance(value, (int, float)):
+        # Phone numbers typed into Excel as numbers lose their leading zero.
+        digits = str(int(value))
+        return digits if digits.startswith("62") else "0" + digits
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, date):
+        return value
+    return str(value)
+
+
+def _map_headers(headers) -> Dict[int, str]:
+    columns = {}
+    for index, header in enumerate(headers):
+        field = _HEADER_FIELDS.get(str(header or "").strip().lower())
+        if field and field not in columns.values():
+            columns[index] = field
+    if "name" not in columns.values():
+        raise BadRequestException("Import file must have a name (Nama) column")
+    if "kost_id" not in columns.values() and "kost_name" not in columns.values():
+        raise BadRequestException("Import file must have a kost_id or kost name (Nama Kost) column")
+    return columns
+
+
+def _rows(table: Iterator[tuple], first_row: int) -> Iterator[ImportRow]:
+    try:
+        headers = next(table)
+    except StopIteration:
+        raise BadRequestException("Import file is empty")
+    columns = _map_headers(headers)
+
+    count = 0
+    for row_number, values in enumerate(table, start=first_row + 1):
+        if not any(value not in (None, "") for value in values):
+            continue  # Blank line
+        count += 1
+        if count > IMPORT_MAX_ROWS:
+            raise BadRequestException(f"Import files are limited to {IMPORT_MAX_ROWS} rows")
+        yield row_number, {
+            field: _normalize(field, values[index] if index < len(values) else None)
+            for index, field in columns.items()
+        }
+
+
+def read_import_rows(fileobj: BinaryIO, filename: Optional[str]) -> Iterator[ImportRow]:
+    """Rows of an uploaded .csv or .xlsx file (first sheet), by spreadsheet row number."""
+    name = (filename or "").lower()
+    if name.endswith(".xlsx"):
+        try:
+            workbook = load_workbook(fileobj, read_only=True, data_only=True)
+        except Exception:
+            raise BadRequestException("Could not read the Excel file")
+        try:
+            sheet = workbook.worksheets[0]
+            yield from _rows(sheet.iter_rows(values_only=True), first_row=1)
+        finally:
+            workbook.close()
+    elif name.endswith(".csv"):
+        text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+        try:
+            yield from _rows((tuple(row) for row in csv.reader(text)), first_row=1)
+        except UnicodeDecodeError:
+            raise BadRequestException("CSV files must be UTF-8 encoded")
+        finally:
+            text.detach()
+    else:
+        raise BadRequestException("Import file must be .csv or .xlsx")
@@ -6,7 +6,7 @@ import uuid
 from datetime import datetime, date
 from decimal import Decimal
 
-from sqlalchemy import Column, String, Date, DateTime, ForeignKey, BigInteger, Boolean, Text, Integer
+from sqlalchemy import Column, String, Date, DateTime, ForeignKey, BigInteger, Boolean, Text, Integer, Computed, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -22,6 +22,8 @@ class Tenant(Base):
     kost_id = Column(UUID(as_uuid=True), ForeignKey("kosts.id"), nullable=False)
     name = Column(String, nullable=False)
     phone = Column(String, nullable=True)
+    # Phone with formatting stripped, for digit search (generated by the database)
+    phone_digits = Column(String, Computed("regexp_replace(coalesce(phone, ''), '\\D', '', 'g')", persisted=True))
     start_date = Column(Date, nullable=True)
     end_date = Column(Date, nullable=True)
     rent_price = Column(BigInteger, nullable=True)
@@ -30,7 +32,9 @@ class Tenant(Base):
     admin_fee = Column(Integer, nullable=True)
     status = Column(String, nullable=False, default="active")  # active, inactive, pending
     is_active = Column(Boolean, nullable=False, default=True)
-    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    # Database time of the last change (also kept by a trigger for raw SQL updates)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
 
     # Relationships
     kost = relationship("Kost", backref="tenants")
@@ -3,58 +3,110 @@ Tenants router - API endpoints.
 """
 
 from uuid import UUID
-from typing import Optional
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Query, status, HTTPException
+from fastapi import APIRouter, Depends, File, Query, Request, Response, UploadFile, status, HTTPException
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
 from app.core.auth import get_current_firebase_uid
 from app.features.users.service import UserProfileService
 from app.features.tenants.schemas import (
+    TenantBulkStatusRequest,
+    TenantBulkStatusResponse,
     TenantCreate,
     TenantUpdate,
     TenantResponse,
     TenantListResponse,
     TenantDetailResponse,
+    TenantImportResponse,
     TenantStatus,
+    TenantSuggestion,
+    TenantTransactionsResponse,
 )
-from app.features.tenants.service import TenantsService
+from app.features.tenants.importer import read_import_rows
+from app.features.tenants.service import TENANT_DETAIL_TRANSACTIONS, TenantsService
 
 router = APIRouter()
 
 
 from app.features.common.dependencies import get_current_user_region
+from app.features.common.conditional import check_not_modified
 
 
 @router.get("", response_model=TenantListResponse)
 async def get_tenants(
+    request: Request,
+    response: Response,
     kost_id: Optional[UUID] = Query(None, description="Filter by kost ID"),
     search: Optional[str] = Query(None, description="Search by name or phone"),
     status: Optional[TenantStatus] = Query(None, description="Filter by tenant status"),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
+    after: Optional[str] = Query(None, description="next_cursor from the previous page (replaces page)"),
+    include_total: bool = Query(True, description="Include the total count"),
     region_id: Optional[UUID] = Depends(get_current_user_region),
     db: Session = Depends(get_db),
 ):
     """Get paginated list of tenants, filtered by user's region."""
+    not_modified = check_not_modified(request, response, db, kost_id=kost_id, region_id=region_id)
+    if not_modified:
+        return not_modified
     service = TenantsService(db)
-    items, total = service.get_all(
+    items, total, next_cursor = service.get_all(
         kost_id=kost_id,
         region_id=region_id,
         page=page, 
         page_size=page_size,
         search=search,
         status=status.value if status else None,
+        after=after,
+        include_total=include_total,
     )
-    return TenantListResponse(items=items, total=total, page=page, page_size=page_size)
+    return TenantListResponse(items=items, total=total, page=page, page_size=page_size, next_cursor=next_cursor)
+
+
+@router.get("/autocomplete", response_model=List[TenantSuggestion])
+def autocomplete_tenants(
+    q: str = Query(..., min_length=1, max_length=100, description="Name or phone being typed"),
+    kost_id: Optional[UUID] = Query(None, description="Filter by kost ID"),
+    limit: int = Query(10, ge=1, le=20),
+    active_only: bool = Query(True, description="Only active tenants"),
+    region_id: Optional[UUID] = Depends(get_current_user_region),
+    db: Session = Depends(get_db),
+):
+    """Best-matching tenant ids and names for as-you-type search (no count, no joins to details)."""
+    service = TenantsService(db)
+    return service.autocomplete(q, kost_id=kost_id, region_id=region_id, limit=limit, active_only=active_only)
 
 
 @router.get("/{tenant_id}", response_model=TenantDetailResponse)
-async def get_tenant(tenant_id: UUID, db: Session = Depends(get_db)):
-    """Get a single tenant by ID with details."""
+async def get_tenant(
+    tenant_id: UUID,
+    transactions_limit: int = Query(TENANT_DETAIL_TRANSACTIONS, ge=1, le=100, description="Most recent transactions to include"),
+    db: Session = Depends(get_db),
+):
+    """Get a single tenant by ID with details and its most recent transactions."""
+    service = TenantsService(db)
+    tenant, transactions, next_cursor = service.get_detail(tenant_id, transactions_limit=transactions_limit)
+    return TenantDetailResponse(
+        **TenantResponse.model_validate(tenant).model_dump(),
+        transactions=transactions,
+        transactions_next_cursor=next_cursor,
+    )
+
+
+@router.get("/{tenant_id}/transactions", response_model=TenantTransactionsResponse)
+async def get_tenant_transactions(
+    tenant_id: UUID,
+    limit: int = Query(50, ge=1, le=200),
+    after: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    db: Session = Depends(get_db),
+):
+    """Get a tenant's transactions, newest first, a page at a time."""
     service = TenantsService(db)
-    return service.get_by_id(tenant_id)
+    items, next_cursor = service.get_transactions(tenant_id, limit=limit, after=after)
+    return TenantTransactionsResponse(items=items, next_cursor=next_cursor)
 
 
 @router.post("", response_model=TenantResponse, status_code=status.HTTP_201_CREATED)
@@ -64,6 +116,47 @@ async def create_tenant(data: TenantCreate, db: Session = Depends(get_db)):
     return service.create(data)
 
 
+@router.post("/import", response_model=TenantImportResponse)
+def import_tenants(
+    file: UploadFile = File(..., description=".csv or .xlsx file, one tenant per row"),
+    dry_run: bool = Query(False, description="Validate only, write nothing"),
+    all_or_nothing: bool = Query(False, description="Write nothing if any row is invalid"),
+    region_id: Optional[UUID] = Depends(get_current_user_region),
+    db: Session = Depends(get_db),
+):
+    """
+    Import tenants in bulk, with the same validation and initial transactions
+    as creating them one by one. Kosts are given by kost_id or by name (within
+    the user's region). Returns the rows that could not be imported and why.
+    """
+    service = TenantsService(db)
+    return service.bulk_create(
+        read_import_rows(file.file, file.filename),
+        region_id=region_id,
+        dry_run=dry_run,
+        all_or_nothing=all_or_nothing,
+    )
+
+
+@router.post("/bulk-status", response_model=TenantBulkStatusResponse)
+async def bulk_update_tenant_status(
+    data: TenantBulkStatusRequest,
+    region_id: Optional[UUID] = Depends(get_current_user_region),
+    db: Session = Depends(get_db),
+):
+    """
+    Change the status of many tenants and/or deactivate them in one
+    transaction. Returns the outcome per tenant id.
+    """
+    service = TenantsService(db)
+    return service.bulk_update_status(
+        data.tenant_ids,
+        new_status=data.status.value if data.status else None,
+        deactivate=data.deactivate,
+        region_id=region_id,
+    )
+
+
 @router.put("/{tenant_id}", response_model=TenantResponse)
 async def update_tenant(tenant_id: UUID, data: TenantUpdate, db: Session = Depends(get_db)):
     """Update an existing tenant."""
@@ -110,14 +110,66 @@ class TenantResponse(TenantBase):
 
 
 class TenantDetailResponse(TenantResponse):
-    """Schema for detailed tenant response with relationships."""
+    """Schema for detailed tenant response with its most recent transactions."""
     transactions: List[TransactionResponse] = []
+    transactions_next_cursor: Optional[str] = None  # Continue with GET /tenants/{id}/transactions
+
+
+class TenantTransactionsResponse(BaseModel):
+    """Schema for a page of a tenant's transactions, newest first."""
+    items: List[TransactionResponse]
+    next_cursor: Optional[str] = None
 
 
 class TenantListResponse(BaseModel):
     """Schema for tenant list response."""
     items: List[TenantResponse]
-    total: int
+    total: Optional[int] = None  # Omitted when include_total=false
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
+
+
+
+class TenantSuggestion(BaseModel):
+    """Schema for a tenant autocomplete match."""
+    id: UUID
+    name: str
+    kost_id: UUID
+
+    class Config:
+        from_attributes = True
+
+
+class TenantImportRowError(BaseModel):
+    """Problems with one row of an import file."""
+    row: int  # Spreadsheet row number (the header is row 1)
+    errors: List[str]
+
+
+class TenantImportResponse(BaseModel):
+    """Schema for a bulk tenant import report."""
+    total_rows: int
+    valid_rows: int
+    imported: int
+    dry_run: bool = False
+    errors: List[TenantImportRowError] = []
+
+
+class TenantBulkStatusRequest(BaseModel):
+    """Schema for changing the status of many tenants at once."""
+    tenant_ids: List[UUID] = Field(..., min_length=1, max_length=500)
+    status: Optional[TenantStatus] = None
+    deactivate: bool = False  # Soft delete, as DELETE /tenants/{id}
+
+
+class TenantBulkStatusResult(BaseModel):
+    """Outcome for one tenant of a bulk status change."""
+    tenant_id: UUID
+    result: str  # updated, unchanged or not_found
+
 
+class TenantBulkStatusResponse(BaseModel):
+    """Schema for a bulk status change report."""
+    updated: int
+    results: List[TenantBulkStatusResult]
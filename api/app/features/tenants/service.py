@@ -2,21 +2,97 @@
 Tenants service - Business logic with database operations.
 """
 
-from typing import List, Optional
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
 from uuid import UUID
-from datetime import date
+from datetime import date, datetime
 import re
+import uuid
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import case, func, insert, or_, true, tuple_, update
 from fastapi import HTTPException, status
+from pydantic import ValidationError
 
-from app.core.exceptions import NotFoundException
+from app.core.events import stage_write
+from app.core.exceptions import BadRequestException, NotFoundException
+from app.features.common.cursor import decode_cursor, encode_cursor
+from app.features.common.totals import cached_total
 from app.features.tenants.model import Tenant
+from app.features.tenants.importer import ImportRow
 from app.features.tenants.schemas import TenantCreate, TenantUpdate
 from app.features.kosts.model import Kost
+from app.features.kosts.service import KostsService
 from app.features.transactions.model import Transaction
+from app.features.transactions.service import TransactionsService
 from app.features.regions.model import Regions
+from app.features.ledger.service import LedgerService
+from app.features.occupancy.service import OccupancyService, TenantState
+
+
+# Columns written by bulk_create (the rest use their defaults).
+TENANT_IMPORT_COLUMNS = (
+    "id", "kost_id", "name", "phone", "start_date", "rent_price",
+    "trash_fee", "security_fee", "admin_fee", "status", "is_active",
+)
+TRANSACTION_IMPORT_COLUMNS = (
+    "id", "kost_id", "tenant_id", "financial_class", "category", "amount",
+    "transaction_date", "description", "region_id", "is_frozen", "reference_id", "due_date",
+)
+
+
+def _column_values(obj, columns) -> dict:
+    return {column: getattr(obj, column) for column in columns}
+
+
+# Shorter search terms only match name prefixes (substring matches need a trigram).
+SEARCH_MIN_SUBSTRING = 3
+AUTOCOMPLETE_MAX_RESULTS = 20
+
+# Most recent transactions included in tenant detail; the rest are paged.
+TENANT_DETAIL_TRANSACTIONS = 20
+
+
+def _like_escape(term: str) -> str:
+    # Backslash is the default LIKE escape character in PostgreSQL.
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _normalize_phone_search(term: str) -> str:
+    """Digits of a phone search, without the 0 / 62 prefix so either form matches."""
+    digits = re.sub(r"\D", "", term)
+    return re.sub(r"^(62|0)", "", digits)
+
+
+def tenant_search(term: str):
+    """
+    (condition, rank) for a tenant name/phone search, served by the pg_trgm
+    indexes on tenants.name and tenants.phone_digits.
+
+    Names match by substring, or by trigram similarity to tolerate typos; phone
+    numbers match on digits regardless of formatting. Rank favours name
+    prefixes, then phone matches, then similarity. Terms shorter than
+    SEARCH_MIN_SUBSTRING only match name prefixes and have no rank (None).
+    """
+    term = term.strip()
+    escaped = _like_escape(term)
+    prefix = Tenant.name.ilike(f"{escaped}%")
+    if len(term) < SEARCH_MIN_SUBSTRING:
+        return prefix, None
+
+    conditions = [
+        Tenant.name.ilike(f"%{escaped}%"),
+        Tenant.name.op("%")(term),
+    ]
+    rank = func.similarity(Tenant.name, term) + case((prefix, 2.0), else_=0.0)
+
+    digits = _normalize_phone_search(term)
+    if len(digits) >= SEARCH_MIN_SUBSTRING:
+        phone_match = Tenant.phone_digits.like(f"%{digits}%")
+        conditions.append(phone_match)
+        rank = rank + case((phone_match, 1.0), else_=0.0)
+
+    return or_(*conditions), rank
 
 
 class TenantsService:
@@ -25,47 +101,14 @@ class TenantsService:
     def __init__(self, db: Session):
         self.db = db
 
-    def _count_active_tenants(self, kost_id: UUID, exclude_tenant_id: Optional[UUID] = None) -> int:
-        query = self.db.query(func.count(Tenant.id)).filter(
-            Tenant.kost_id == kost_id,
-            Tenant.is_active == True,
-        )
-        if exclude_tenant_id:
-            query = query.filter(Tenant.id != exclude_tenant_id)
-        return query.scalar() or 0
-
-    @staticmethod
-    def _extract_due_date_from_description(description: Optional[str]) -> Optional[date]:
-        if not description:
-            return None
-        match = re.search(r"due_date:(\d{4}-\d{2}-\d{2})", description)
-        if not match:
-            return None
-        try:
-            return date.fromisoformat(match.group(1))
-        except ValueError:
-            return None
-
-    def _get_dp_info(self, tenant_id: UUID) -> tuple[Optional[int], Optional[date]]:
-        dp_tx = (
-            self.db.query(Transaction)
-            .filter(
-                Transaction.tenant_id == tenant_id,
-                Transaction.category == "dp",
-                Transaction.is_frozen == True,
-            )
-            .order_by(Transaction.transaction_date.desc(), Transaction.created_at.desc())
-            .first()
-        )
-        if not dp_tx:
-            return None, None
-        return int(dp_tx.amount), self._extract_due_date_from_description(dp_tx.description)
-
-    def _attach_dp_fields(self, tenant: Tenant) -> Tenant:
-        dp_amount, dp_due_date = self._get_dp_info(tenant.id)
-        setattr(tenant, "dp_amount", dp_amount)
-        setattr(tenant, "dp_due_date", dp_due_date)
-        return tenant
+    def _attach_dp_fields(self, tenants: list[Tenant]) -> list[Tenant]:
+        """DP amount and due date from each tenant's frozen DP, loaded in one query."""
+        deposits = TransactionsService(self.db).frozen_deposits(t.id for t in tenants)
+        for tenant in tenants:
+            deposit = deposits.get(tenant.id)
+            setattr(tenant, "dp_amount", int(deposit.amount) if deposit else None)
+            setattr(tenant, "dp_due_date", deposit.due_date if deposit else None)
+        return tenants
 
     def _attach_kost_region_fields(self, tenants: list[Tenant]) -> list[Tenant]:
         if not tenants:
@@ -84,6 +127,16 @@ class TenantsService:
             setattr(tenant, "region_name", region.name if region else None)
         return tenants
 
+    def _stage_tenant_write(self, tenant: Tenant, kost: Optional[Kost] = None) -> None:
+        kost = kost or tenant.kost
+        stage_write(
+            self.db,
+            "tenant",
+            region_id=kost.region_id if kost else None,
+            kost_id=tenant.kost_id,
+            tenant_id=tenant.id,
+        )
+
     def get_all(
         self, 
         kost_id: UUID = None,
@@ -92,20 +145,22 @@ class TenantsService:
         page_size: int = 10,
         search: str = None,
         status: str = None,
-    ) -> tuple[List[Tenant], int]:
-        """Get paginated list of tenants, optionally filtered by region."""
-        query = self.db.query(Tenant)
+        after: str = None,
+        include_total: bool = True,
+    ) -> tuple[List[Tenant], Optional[int], Optional[str]]:
+        """
+        Get a page of tenants, optionally filtered by region, newest first (best
+        search matches first when searching).
+
+        Pages by `after` (the previous page's next_cursor) when given, else by
+        page number. The total comes from the list total cache and is skipped
+        when `include_total` is false. Returns (items, total, next_cursor).
+        """
+        query = self.db.query(Tenant).outerjoin(Kost, Kost.id == Tenant.kost_id)
         
         # Filter by region_id through kost relationship
         if region_id:
-            # Get all kost IDs in this region
-            kost_ids_in_region = (
-                self.db.query(Kost.id)
-                .filter(Kost.region_id == region_id)
-                .all()
-            )
-            kost_ids = [k[0] for k in kost_ids_in_region]
-            query = query.filter(Tenant.kost_id.in_(kost_ids))
+            query = query.filter(Kost.region_id == region_id)
         # Filter by kost_id if provided (more specific filter)
         if kost_id:
             query = query.filter(Tenant.kost_id == kost_id)
@@ -114,54 +169,159 @@ class TenantsService:
         if status:
             query = query.filter(Tenant.status == status)
         
-        # Search by name or phone
-        if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                (Tenant.name.ilike(search_term)) | 
-                (Tenant.phone.ilike(search_term))
+        # Search by name or phone, best matches first
+        rank = None
+        if search and search.strip():
+            condition, rank = tenant_search(search)
+            query = query.filter(condition)
+
+        total = None
+        if include_total:
+            total = cached_total(
+                "tenants",
+                query.count,
+                kost_id=kost_id,
+                region_id=region_id,
+                filters=(kost_id, status, search.strip().lower() if search else None),
             )
-        
-        # Get total count
-        total = query.count()
-        
-        # Get paginated items
-        offset = (page - 1) * page_size
-        items = (
+
+        # Keyset order: (rank,) created_at, id - all descending
+        keys = [Tenant.created_at, Tenant.id]
+        if rank is not None:
+            keys.insert(0, rank)
+        query = query.outerjoin(Regions, Regions.id == Kost.region_id).add_columns(
+            Kost.name.label("kost_name"),
+            Regions.name.label("region_name"),
+        )
+        if rank is not None:
+            query = query.add_columns(rank.label("rank"))
+        query = query.order_by(*(key.desc() for key in keys))
+        if after:
+            query = query.filter(tuple_(*keys) < tuple_(*self._decode_list_cursor(after, ranked=rank is not None)))
+        else:
+            query = query.offset((page - 1) * page_size)
+
+        rows = query.limit(page_size + 1).all()
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+
+        items = []
+        for row in rows:
+            tenant = row[0]
+            setattr(tenant, "kost_name", row.kost_name)
+            setattr(tenant, "region_name", row.region_name)
+            items.append(tenant)
+
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            payload = {"c": last[0].created_at.isoformat(), "i": str(last[0].id)}
+            if rank is not None:
+                payload["r"] = float(last.rank)
+            next_cursor = encode_cursor(payload)
+
+        items = self._attach_dp_fields(items)
+        return items, total, next_cursor
+
+    @staticmethod
+    def _decode_list_cursor(cursor: str, ranked: bool) -> list:
+        after = decode_cursor(cursor)
+        try:
+            values = [datetime.fromisoformat(after["c"]), UUID(after["i"])]
+            if ranked:
+                values.insert(0, float(after["r"]))
+        except (KeyError, TypeError, ValueError):
+            raise BadRequestException(detail="Invalid cursor")
+        return values
+
+    def autocomplete(
+        self,
+        q: str,
+        kost_id: UUID = None,
+        region_id: UUID = None,
+        limit: int = 10,
+        active_only: bool = True,
+    ) -> List:
+        """Best-matching tenants (id, name, kost) for as-you-type search."""
+        if not q or not q.strip():
+            return []
+        condition, rank = tenant_search(q)
+        order_by = [Tenant.name, Tenant.id]
+        if rank is not None:
+            order_by.insert(0, rank.desc())
+        query = self.db.query(Tenant.id, Tenant.name, Tenant.kost_id).filter(condition)
+        if region_id:
+            query = query.join(Kost, Kost.id == Tenant.kost_id).filter(Kost.region_id == region_id)
+        if kost_id:
+            query = query.filter(Tenant.kost_id == kost_id)
+        if active_only:
+            query = query.filter(Tenant.is_active == True)
+        return (
             query
-            .order_by(Tenant.created_at.desc())
-            .offset(offset)
-            .limit(page_size)
+            .order_by(*order_by)
+            .limit(min(limit, AUTOCOMPLETE_MAX_RESULTS))
             .all()
         )
 
-        items = [self._attach_dp_fields(item) for item in items]
-        items = self._attach_kost_region_fields(items)
-        return items, total
-
     def get_by_id(self, tenant_id: UUID) -> Tenant:
         """Get tenant by ID."""
         tenant = self.db.query(Tenant).filter(Tenant.id == tenant_id).first()
         
         if not tenant:
             raise NotFoundException(f"Tenant with id {tenant_id} not found")
-        tenant = self._attach_dp_fields(tenant)
+        self._attach_dp_fields([tenant])
         self._attach_kost_region_fields([tenant])
         return tenant
 
-    def create(self, data: TenantCreate) -> Tenant:
-        """Create new tenant and optionally record initial payment transaction."""
-        payload = data.model_dump()
-        dp_amount = payload.pop("dp_amount", None)
-        dp_due_date = payload.pop("dp_due_date", None)
+    def get_detail(
+        self,
+        tenant_id: UUID,
+        transactions_limit: int = TENANT_DETAIL_TRANSACTIONS,
+    ) -> Tuple[Tenant, List[Transaction], Optional[str]]:
+        """
+        Tenant with kost/region names and DP fields, plus its most recent
+        transactions. Returns (tenant, transactions, next transactions cursor).
+
+        The tenant, names and first transaction page come from one statement
+        (LEFT JOIN LATERAL over the tenant's newest transactions).
+        """
+        latest = TransactionsService.latest_per_tenant(transactions_limit + 1)
+        rows = (
+            self.db.query(Tenant, Kost.name.label("kost_name"), Regions.name.label("region_name"), latest)
+            .outerjoin(Kost, Kost.id == Tenant.kost_id)
+            .outerjoin(Regions, Regions.id == Kost.region_id)
+            .outerjoin(latest, true())
+            .filter(Tenant.id == tenant_id)
+            .order_by(latest.transaction_date.desc(), latest.created_at.desc(), latest.id.desc())
+            .all()
+        )
+        if not rows:
+            raise NotFoundException(f"Tenant with id {tenant_id} not found")
+        tenant = rows[0].Tenant
+        setattr(tenant, "kost_name", rows[0].kost_name)
+        setattr(tenant, "region_name", rows[0].region_name)
+        self._attach_dp_fields([tenant])
 
-        if not payload.get("kost_id"):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="kost_id is required",
-            )
+        transactions, next_cursor = TransactionsService.history_page(
+            [row[3] for row in rows if row[3] is not None], transactions_limit
+        )
+        return tenant, transactions, next_cursor
+
+    def get_transactions(
+        self,
+        tenant_id: UUID,
+        limit: int,
+        after: Optional[str] = None,
+    ) -> Tuple[List[Transaction], Optional[str]]:
+        """A page of a tenant's transactions, newest first. Returns (items, next_cursor)."""
+        if not self.db.query(Tenant.id).filter(Tenant.id == tenant_id).first():
+            raise NotFoundException(f"Tenant with id {tenant_id} not found")
+        return TransactionsService(self.db).tenant_history(tenant_id, limit, after=after)
 
-        if payload.get("status") == "dp":
+    @staticmethod
+    def _validate_initial_dp(tenant_status: Optional[str], dp_amount: Optional[int], dp_due_date: Optional[date]) -> None:
+        """DP tenants must be created with a positive DP amount and a due date."""
+        if tenant_status == "dp":
             if dp_amount is None or dp_amount <= 0:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -173,83 +333,247 @@ class TenantsService:
                     detail="dp_due_date is required when status is DP",
                 )
 
+    @staticmethod
+    def _initial_transactions(
+        tenant: Tenant,
+        kost: Optional[Kost],
+        dp_amount: Optional[int],
+        dp_due_date: Optional[date],
+    ) -> List[Transaction]:
+        """
+        Transactions recorded with a new tenant: a frozen DP, or the first rent
+        payment plus extra fees linked to it. IDs are assigned up front so the
+        fee can reference the rent payment without a flush.
+        """
+        region_id = kost.region_id if kost else None
+        transaction_date = tenant.start_date or date.today()
+
+        if tenant.status == "dp" and dp_amount and dp_amount > 0:
+            return [Transaction(
+                id=uuid.uuid4(),
+                kost_id=tenant.kost_id,
+                tenant_id=tenant.id,
+                financial_class="LIABILITY",
+                category="dp",
+                amount=dp_amount,
+                transaction_date=transaction_date,
+                description=f"Pembayaran DP penyewa {tenant.name} due_date:{dp_due_date.isoformat()}",
+                region_id=region_id,
+                is_frozen=True,
+                reference_id=None,
+                due_date=dp_due_date,
+            )]
+
+        transactions = []
+        rent_tx_id = None
+        rent_amount = tenant.rent_price or 0
+        if rent_amount > 0:
+            rent_tx_id = uuid.uuid4()
+            transactions.append(Transaction(
+                id=rent_tx_id,
+                kost_id=tenant.kost_id,
+                tenant_id=tenant.id,
+                financial_class="REVENUE",
+                category="rent",
+                amount=rent_amount,
+                transaction_date=transaction_date,
+                description=f"Pembayaran awal penyewa {tenant.name}",
+                region_id=region_id,
+                is_frozen=False,
+                reference_id=None,
+                due_date=None,
+            ))
+
+        extra_fees = (
+            (tenant.trash_fee or 0)
+            + (tenant.security_fee or 0)
+            + (tenant.admin_fee or 0)
+        )
+        if extra_fees > 0:
+            transactions.append(Transaction(
+                id=uuid.uuid4(),
+                kost_id=tenant.kost_id,
+                tenant_id=tenant.id,
+                financial_class="EXPENSE",
+                category="extra_fee",
+                amount=extra_fees,
+                transaction_date=transaction_date,
+                description=f"Biaya ekstra penyewa {tenant.name}",
+                region_id=region_id,
+                is_frozen=False,
+                reference_id=rent_tx_id,
+                due_date=None,
+            ))
+        return transactions
+
+    def create(self, data: TenantCreate) -> Tenant:
+        """Create new tenant and optionally record initial payment transaction."""
+        payload = data.model_dump()
+        dp_amount = payload.pop("dp_amount", None)
+        dp_due_date = payload.pop("dp_due_date", None)
+
+        if not payload.get("kost_id"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="kost_id is required",
+            )
+
+        self._validate_initial_dp(payload.get("status"), dp_amount, dp_due_date)
+
         kost = self.db.query(Kost).filter(Kost.id == payload.get("kost_id")).first()
         if not kost:
             raise NotFoundException("Kost not found")
 
         if payload.get("is_active", True):
-            active_count = self._count_active_tenants(kost.id)
-            if active_count >= kost.total_units:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Kost sudah penuh ({active_count}/{kost.total_units}).",
-                )
+            KostsService(self.db).reserve_units(kost.id)
 
         tenant = Tenant(**payload)
         self.db.add(tenant)
 
         # Flush first to get tenant.id without committing yet.
         self.db.flush()
+        OccupancyService(self.db).record(tenant, None, "create")
 
         # Auto-create initial income transaction if tenant has non-zero payable amount.
         # This keeps tenant creation and initial payment history in sync.
-        kost = kost or self.db.query(Kost).filter(Kost.id == tenant.kost_id).first()
-
-        if tenant.status == "dp" and dp_amount and dp_amount > 0:
-            transaction = Transaction(
-                kost_id=tenant.kost_id,
-                tenant_id=tenant.id,
-                financial_class="LIABILITY",
-                category="dp",
-                amount=dp_amount,
-                transaction_date=tenant.start_date or date.today(),
-                description=f"Pembayaran DP penyewa {tenant.name} due_date:{dp_due_date.isoformat()}",
-                region_id=kost.region_id if kost else None,
-                is_frozen=True,
-            )
+        ledger = LedgerService(self.db)
+        for transaction in self._initial_transactions(tenant, kost, dp_amount, dp_due_date):
             self.db.add(transaction)
-        else:
-            rent_amount = tenant.rent_price or 0
-            rent_tx_id = None
-            if rent_amount > 0:
-                transaction = Transaction(
-                    kost_id=tenant.kost_id,
-                    tenant_id=tenant.id,
-                    financial_class="REVENUE",
-                    category="rent",
-                    amount=rent_amount,
-                    transaction_date=tenant.start_date or date.today(),
-                    description=f"Pembayaran awal penyewa {tenant.name}",
-                    region_id=kost.region_id if kost else None,
-                    is_frozen=False,
-                )
-                self.db.add(transaction)
-                self.db.flush()
-                rent_tx_id = transaction.id
-
-            extra_fees = (
-                (tenant.trash_fee or 0)
-                + (tenant.security_fee or 0)
-                + (tenant.admin_fee or 0)
-            )
-            if extra_fees > 0:
-                fee_tx = Transaction(
-                    kost_id=tenant.kost_id,
-                    tenant_id=tenant.id,
-                    financial_class="EXPENSE",
-                    category="extra_fee",
-                    amount=extra_fees,
-                    transaction_date=tenant.start_date or date.today(),
-                    description=f"Biaya ekstra penyewa {tenant.name}",
-                    region_id=kost.region_id if kost else None,
-                    is_frozen=False,
-                    reference_id=rent_tx_id,
-                )
-                self.db.add(fee_tx)
+            ledger.add(transaction)
 
+        ledger.apply()
+        self._stage_tenant_write(tenant, kost)
         self.db.commit()
         self.db.refresh(tenant)
-        return self._attach_dp_fields(tenant)
+        return self._attach_dp_fields([tenant])[0]
+
+    def bulk_create(
+        self,
+        rows: Iterable[ImportRow],
+        region_id: UUID = None,
+        dry_run: bool = False,
+        all_or_nothing: bool = False,
+    ) -> dict:
+        """
+        Create many tenants (with the same initial transactions as create) from
+        import rows and report problems per row.
+
+        Rows are validated with TenantCreate and the DP rules; the kosts they
+        name are locked and their units reserved once for the whole batch.
+        Valid rows are written with multi-row inserts in one transaction,
+        unless this is a dry run or `all_or_nothing` is set and a row failed.
+        """
+        parsed = list(rows)
+        errors: Dict[int, List[str]] = defaultdict(list)
+
+        kost_ids = set()
+        kost_names = set()
+        for row_number, values in parsed:
+            if values.get("kost_id"):
+                try:
+                    values["kost_id"] = UUID(str(values["kost_id"]))
+                    kost_ids.add(values["kost_id"])
+                except ValueError:
+                    errors[row_number].append("kost_id: Invalid kost ID")
+            elif values.get("kost_name"):
+                kost_names.add(values["kost_name"].lower())
+            else:
+                errors[row_number].append("kost: kost_id or kost name is required")
+
+        kosts = self._lock_import_kosts(kost_ids, kost_names, region_id)
+        kosts_by_id = {kost.id: kost for kost in kosts}
+        kosts_by_name = defaultdict(list)
+        for kost in kosts:
+            kosts_by_name[kost.name.lower()].append(kost)
+        active_counts = {kost.id: kost.active_tenants for kost in kosts}
+
+        planned = []  # (tenant, kost, dp_amount, dp_due_date)
+        for row_number, values in parsed:
+            if errors.get(row_number):
+                continue
+            if values.get("kost_id"):
+                kost = kosts_by_id.get(values["kost_id"])
+            else:
+                matches = kosts_by_name.get(values["kost_name"].lower(), [])
+                if len(matches) > 1:
+                    errors[row_number].append("kost: Several kosts have this name, use kost_id")
+                    continue
+                kost = matches[0] if matches else None
+            if kost is None:
+                errors[row_number].append("kost: Kost not found")
+                continue
+
+            fields = {key: value for key, value in values.items() if key not in ("kost_id", "kost_name")}
+            try:
+                data = TenantCreate(**fields, kost_id=kost.id)
+                self._validate_initial_dp(data.status.value, data.dp_amount, data.dp_due_date)
+            except ValidationError as exc:
+                errors[row_number].extend(
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+                )
+                continue
+            except HTTPException as exc:
+                errors[row_number].append(exc.detail)
+                continue
+
+            active_count = active_counts.get(kost.id, 0)
+            if active_count >= kost.total_units:
+                errors[row_number].append(f"Kost sudah penuh ({active_count}/{kost.total_units}).")
+                continue
+            active_counts[kost.id] = active_count + 1
+
+            payload = data.model_dump(exclude={"dp_amount", "dp_due_date"})
+            payload["status"] = data.status.value
+            tenant = Tenant(id=uuid.uuid4(), is_active=True, **payload)
+            planned.append((tenant, kost, data.dp_amount, data.dp_due_date))
+
+        write = bool(planned) and not dry_run and not (all_or_nothing and errors)
+        if write:
+            tenants = [tenant for tenant, _, _, _ in planned]
+            self.db.execute(insert(Tenant), [_column_values(t, TENANT_IMPORT_COLUMNS) for t in tenants])
+
+            ledger = LedgerService(self.db)
+            transactions = []
+            for tenant, kost, dp_amount, dp_due_date in planned:
+                for transaction in self._initial_transactions(tenant, kost, dp_amount, dp_due_date):
+                    ledger.add(transaction)
+                    transactions.append(transaction)
+            if transactions:
+                self.db.execute(
+                    insert(Transaction),
+                    [_column_values(tx, TRANSACTION_IMPORT_COLUMNS) for tx in transactions],
+                )
+            OccupancyService(self.db).record_created(tenants, "import")
+            ledger.apply()
+            kosts_service = KostsService(self.db)
+            for kost_id, count in Counter(tenant.kost_id for tenant in tenants).items():
+                kosts_service.reserve_units(kost_id, count)
+                stage_write(self.db, "tenant", region_id=kosts_by_id[kost_id].region_id, kost_id=kost_id)
+            self.db.commit()
+        else:
+            self.db.rollback()  # Releases the kost locks
+
+        return {
+            "total_rows": len(parsed),
+            "valid_rows": len(planned),
+            "imported": len(planned) if write else 0,
+            "dry_run": dry_run,
+            "errors": [{"row": row, "errors": messages} for row, messages in sorted(errors.items()) if messages],
+        }
+
+    def _lock_import_kosts(self, kost_ids: set, kost_names: set, region_id: Optional[UUID]) -> List[Kost]:
+        """Kosts named by an import (by id or lowercase name), locked against concurrent tenant writes."""
+        conditions = []
+        if kost_ids:
+            conditions.append(Kost.id.in_(kost_ids))
+        if kost_names:
+            conditions.append(func.lower(Kost.name).in_(kost_names))
+        if not conditions:
+            return []
+        query = self.db.query(Kost).filter(or_(*conditions))
+        if region_id:
+            query = query.filter(Kost.region_id == region_id)
+        return query.order_by(Kost.id).populate_existing().with_for_update().all()
 
     def update(self, tenant_id: UUID, data: TenantUpdate) -> Tenant:
         """Update existing tenant."""
@@ -258,35 +582,17 @@ class TenantsService:
         update_data = data.model_dump(exclude_unset=True)
         dp_amount = update_data.pop("dp_amount", None)
         dp_due_date = update_data.pop("dp_due_date", None)
+        before = TenantState.of(tenant)
 
         for key, value in update_data.items():
             setattr(tenant, key, value)
 
-        if tenant.is_active:
-            kost = self.db.query(Kost).filter(Kost.id == tenant.kost_id).first()
-            if kost:
-                active_count = self._count_active_tenants(kost.id, exclude_tenant_id=tenant.id)
-                if active_count >= kost.total_units:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Kost sudah penuh ({active_count}/{kost.total_units}).",
-                    )
-
         # If tenant is in DP state and DP metadata is provided, upsert DP transaction metadata.
         if tenant.status == "dp" and (dp_amount is not None or dp_due_date is not None):
-            dp_tx = (
-                self.db.query(Transaction)
-                .filter(
-                    Transaction.tenant_id == tenant.id,
-                    Transaction.category == "dp",
-                    Transaction.is_frozen == True,
-                )
-                .order_by(Transaction.transaction_date.desc(), Transaction.created_at.desc())
-                .first()
-            )
+            dp_tx = TransactionsService(self.db).frozen_deposit(tenant.id)
             kost = self.db.query(Kost).filter(Kost.id == tenant.kost_id).first()
             effective_dp_amount = dp_amount if dp_amount is not None else (int(dp_tx.amount) if dp_tx else 0)
-            effective_due_date = dp_due_date or self._extract_due_date_from_description(dp_tx.description if dp_tx else None)
+            effective_due_date = dp_due_date or (dp_tx.due_date if dp_tx else None)
 
             if effective_dp_amount <= 0:
                 raise HTTPException(
@@ -299,47 +605,171 @@ class TenantsService:
                     detail="dp_due_date is required when status is DP",
                 )
 
+            ledger = LedgerService(self.db)
             if dp_tx:
+                dp_before = LedgerService.snapshot(dp_tx)
                 dp_tx.amount = effective_dp_amount
                 dp_tx.description = f"Pembayaran DP penyewa {tenant.name} due_date:{effective_due_date.isoformat()}"
+                dp_tx.due_date = effective_due_date
                 dp_tx.financial_class = "LIABILITY"
                 dp_tx.is_frozen = True
+                ledger.change(dp_before, dp_tx)
             else:
-                self.db.add(
-                    Transaction(
-                        kost_id=tenant.kost_id,
-                        tenant_id=tenant.id,
-                        financial_class="LIABILITY",
-                        category="dp",
-                        amount=effective_dp_amount,
-                        transaction_date=tenant.start_date or date.today(),
-                        description=f"Pembayaran DP penyewa {tenant.name} due_date:{effective_due_date.isoformat()}",
-                        region_id=kost.region_id if kost else None,
-                        is_frozen=True,
-                    )
+                dp_tx = Transaction(
+                    kost_id=tenant.kost_id,
+                    tenant_id=tenant.id,
+                    financial_class="LIABILITY",
+                    category="dp",
+                    amount=effective_dp_amount,
+                    transaction_date=tenant.start_date or date.today(),
+                    description=f"Pembayaran DP penyewa {tenant.name} due_date:{effective_due_date.isoformat()}",
+                    region_id=kost.region_id if kost else None,
+                    is_frozen=True,
+                    due_date=effective_due_date,
                 )
+                self.db.add(dp_tx)
+                ledger.add(dp_tx)
+            ledger.apply()
         
+        OccupancyService(self.db).record(tenant, before, "update")
+        self._stage_tenant_write(tenant)
         self.db.commit()
         self.db.refresh(tenant)
-        return self._attach_dp_fields(tenant)
+        return self._attach_dp_fields([tenant])[0]
 
     def delete(self, tenant_id: UUID) -> None:
         """Soft delete tenant by setting is_active to False."""
-        tenant = self.get_by_id(tenant_id)
+        # Row lock: concurrent or retried deletes must not release the unit and DP twice.
+        tenant = (
+            self.db.query(Tenant)
+            .filter(Tenant.id == tenant_id)
+            .populate_existing()
+            .with_for_update()
+            .first()
+        )
+        if not tenant:
+            raise NotFoundException(f"Tenant with id {tenant_id} not found")
+        if not tenant.is_active:
+            self.db.rollback()  # Already deleted; releases the lock
+            return
+        before = TenantState.of(tenant)
         # If tenant is DP, release frozen DP as revenue before deactivating.
         if tenant.status == "dp":
-            dp_tx = (
-                self.db.query(Transaction)
-                .filter(
-                    Transaction.tenant_id == tenant.id,
-                    Transaction.category == "dp",
-                    Transaction.is_frozen == True,
-                )
-                .order_by(Transaction.transaction_date.desc(), Transaction.created_at.desc())
-                .first()
-            )
+            dp_tx = TransactionsService(self.db).frozen_deposit(tenant.id)
             if dp_tx:
+                ledger = LedgerService(self.db)
+                dp_before = LedgerService.snapshot(dp_tx)
                 dp_tx.is_frozen = False
                 dp_tx.financial_class = "REVENUE"
+                ledger.change(dp_before, dp_tx)
+                ledger.apply()
+        KostsService(self.db).release_units(tenant.kost_id)
         tenant.is_active = False
+        OccupancyService(self.db).record(tenant, before, "delete")
+        self._stage_tenant_write(tenant)
+        self.db.commit()
+
+    def bulk_update_status(
+        self,
+        tenant_ids: List[UUID],
+        new_status: Optional[str] = None,
+        deactivate: bool = False,
+        region_id: Optional[UUID] = None,
+    ) -> dict:
+        """
+        Set the status of many tenants and/or deactivate them (as delete does,
+        releasing frozen DP) in one transaction, with one UPDATE per table.
+        Tenants outside `region_id` are reported as not found.
+        """
+        if new_status is None and not deactivate:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="status or deactivate is required",
+            )
+        if new_status == "dp":
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="DP status needs a DP amount and due date; update tenants one by one",
+            )
+
+        tenant_ids = list(dict.fromkeys(tenant_ids))
+        query = (
+            self.db.query(Tenant.id, Tenant.kost_id, Tenant.status, Tenant.is_active, Kost.region_id)
+            .outerjoin(Kost, Kost.id == Tenant.kost_id)
+            .filter(Tenant.id.in_(tenant_ids))
+        )
+        if region_id:
+            query = query.filter(Kost.region_id == region_id)
+        # Locked, so is_active below is current: concurrent deletes and bulk
+        # changes wait here and never release the same unit or DP twice.
+        rows = {row.id: row for row in query.order_by(Tenant.id).with_for_update(of=Tenant).all()}
+
+        changes = []  # (tenant_id, before, after)
+        results = []
+        for tenant_id in tenant_ids:
+            row = rows.get(tenant_id)
+            if row is None:
+                results.append({"tenant_id": tenant_id, "result": "not_found"})
+                continue
+            before = TenantState(row.kost_id, row.status, bool(row.is_active))
+            after = before._replace(
+                status=new_status or before.status,
+                is_active=before.is_active and not deactivate,
+            )
+            if before == after:
+                results.append({"tenant_id": tenant_id, "result": "unchanged"})
+                continue
+            changes.append((tenant_id, before, after))
+            results.append({"tenant_id": tenant_id, "result": "updated"})
+
+        if not changes:
+            self.db.rollback()  # Releases the row locks
+            return {"updated": 0, "results": results}
+
+        values = {}
+        if new_status is not None:
+            values["status"] = new_status
+        if deactivate:
+            values["is_active"] = False
+        changed_ids = [tenant_id for tenant_id, _, _ in changes]
+        self.db.execute(
+            update(Tenant).where(Tenant.id.in_(changed_ids)).values(**values),
+            execution_options={"synchronize_session": False},
+        )
+
+        # Deactivated DP tenants: release their frozen DP as revenue, like delete.
+        deactivated = [
+            (tenant_id, before)
+            for tenant_id, before, after in changes
+            if before.is_active and not after.is_active
+        ]
+        dp_tenant_ids = [tenant_id for tenant_id, before in deactivated if before.status == "dp"]
+        deposits = list(TransactionsService(self.db).frozen_deposits(dp_tenant_ids).values())
+        if deposits:
+            ledger = LedgerService(self.db)
+            for dp_tx in deposits:
+                key, amount = LedgerService.snapshot(dp_tx)
+                ledger.add_delta(key, -amount, -1)
+                ledger.add_delta(key._replace(financial_class="REVENUE", is_frozen=False), amount, 1)
+            self.db.execute(
+                update(Transaction)
+                .where(Transaction.id.in_([dp_tx.id for dp_tx in deposits]))
+                .values(is_frozen=False, financial_class="REVENUE")
+            )
+            ledger.apply()
+
+        kosts_service = KostsService(self.db)
+        for kost_id, count in Counter(before.kost_id for _, before in deactivated).items():
+            kosts_service.release_units(kost_id, count)
+
+        OccupancyService(self.db).record_many(changes, "bulk_status")
+        for tenant_id, before, _ in changes:
+            stage_write(
+                self.db,
+                "tenant",
+                region_id=rows[tenant_id].region_id,
+                kost_id=before.kost_id,
+                tenant_id=tenant_id,
+            )
         self.db.commit()
+        return {"updated": len(changes), "results": results}
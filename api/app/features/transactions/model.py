@@ -5,7 +5,7 @@ Transaction model - SQLAlchemy ORM model.
 import uuid
 from datetime import datetime, date
 
-from sqlalchemy import Column, String, Date, DateTime, ForeignKey, BigInteger, Text, Boolean
+from sqlalchemy import Column, String, Date, DateTime, ForeignKey, BigInteger, Text, Boolean, func
 from sqlalchemy.dialects.postgresql import UUID, ENUM as PGEnum
 from sqlalchemy.orm import relationship
 
@@ -28,10 +28,13 @@ class Transaction(Base):
     amount = Column(BigInteger, nullable=False)
     transaction_date = Column(Date, nullable=False)
     description = Column(Text, nullable=True)
-    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    # Database time of the last change (also kept by a trigger for raw SQL updates)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
     region_id = Column(UUID(as_uuid=True), ForeignKey("regions.id"), nullable=True)
     is_frozen = Column(Boolean, nullable=False, default=False)
     reference_id = Column(UUID(as_uuid=True), nullable=True)
+    due_date = Column(Date, nullable=True)  # DP (deposit) rows: when the remaining rent is due
 
     # Relationships
     kost = relationship("Kost", backref="transactions")
@@ -4,29 +4,25 @@ Transactions router - API endpoints.
 
 from uuid import UUID
 from datetime import date
-from typing import Optional
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
 
 from app.db.session import get_db
+from app.core.events import stage_write
 from app.features.transactions.model import Transaction
-from app.features.transactions.schemas import TransactionResponse
+from app.features.transactions.schemas import PaymentBatchCreate, PaymentCreate, TransactionResponse
+from app.features.transactions.service import TransactionsService
 from app.features.tenants.model import Tenant
 from app.features.kosts.model import Kost
+from app.features.ledger.service import LedgerService
+from app.features.occupancy.service import OccupancyService, TenantState
 
 router = APIRouter()
 
 
-class PaymentCreate(BaseModel):
-    """Schema for creating a rent payment."""
-    kost_id: UUID
-    tenant_id: UUID
-    amount: int = Field(..., ge=0)
-    transaction_date: date
-
-
 class ExpenseCreate(BaseModel):
     """Schema for creating an expense."""
     kost_id: Optional[UUID] = None
@@ -80,22 +76,18 @@ async def create_payment(data: PaymentCreate, db: Session = Depends(get_db)):
     db.add(rent_tx)
     db.flush()
 
+    ledger = LedgerService(db)
+    ledger.add(rent_tx)
+
     # If tenant has a frozen DP, release it as revenue and link to this rent payment.
     if tenant.status == "dp":
-        dp_tx = (
-            db.query(Transaction)
-            .filter(
-                Transaction.tenant_id == tenant.id,
-                Transaction.category == "dp",
-                Transaction.is_frozen == True,
-            )
-            .order_by(Transaction.transaction_date.desc(), Transaction.created_at.desc())
-            .first()
-        )
+        dp_tx = TransactionsService(db).frozen_deposit(tenant.id)
         if dp_tx:
+            before = LedgerService.snapshot(dp_tx)
             dp_tx.is_frozen = False
             dp_tx.financial_class = "REVENUE"
             dp_tx.reference_id = rent_tx.id
+            ledger.change(before, dp_tx)
 
     # Record extra fees as contra expenses (linked to the rent payment).
     extra_fees = (
@@ -117,17 +109,39 @@ async def create_payment(data: PaymentCreate, db: Session = Depends(get_db)):
             reference_id=rent_tx.id,
         )
         db.add(fee_tx)
+        ledger.add(fee_tx)
     
     # Update tenant status to aktif if currently telat or dp
     if tenant.status in ("telat", "dp"):
+        before = TenantState.of(tenant)
         tenant.status = "aktif"
+        OccupancyService(db).record(tenant, before, "payment")
     
+    ledger.apply()
+    stage_write(
+        db,
+        "transaction",
+        region_id=rent_tx.region_id,
+        kost_id=rent_tx.kost_id,
+        tenant_id=tenant.id,
+        transaction_date=rent_tx.transaction_date,
+    )
     db.commit()
     db.refresh(rent_tx)
     
     return rent_tx
 
 
+@router.post("/payments/batch", response_model=List[TransactionResponse], status_code=status.HTTP_201_CREATED)
+async def create_payments(data: PaymentBatchCreate, db: Session = Depends(get_db)):
+    """
+    Record many rent payments in one transaction, each exactly as
+    POST /payments would. Returns the rent transactions in request order.
+    Nothing is recorded if any tenant is not found.
+    """
+    return TransactionsService(db).record_payments(data.payments)
+
+
 @router.post("/expenses", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
 async def create_expense(data: ExpenseCreate, db: Session = Depends(get_db)):
     """
@@ -169,6 +183,16 @@ async def create_expense(data: ExpenseCreate, db: Session = Depends(get_db)):
         is_frozen=False,
     )
     db.add(transaction)
+    ledger = LedgerService(db)
+    ledger.add(transaction)
+    ledger.apply()
+    stage_write(
+        db,
+        "transaction",
+        region_id=transaction.region_id,
+        kost_id=transaction.kost_id,
+        transaction_date=transaction.transaction_date,
+    )
     db.commit()
     db.refresh(transaction)
     
@@ -2,7 +2,7 @@
 Transactions schemas (Pydantic models).
 """
 
-from typing import Optional, Literal
+from typing import List, Optional, Literal
 from datetime import date, datetime
 from uuid import UUID
 
@@ -26,7 +26,21 @@ class TransactionResponse(TransactionBase):
     region_id: Optional[UUID] = None
     is_frozen: bool = False
     reference_id: Optional[UUID] = None
+    due_date: Optional[date] = None
     created_at: datetime
 
     class Config:
         from_attributes = True
+
+
+class PaymentCreate(BaseModel):
+    """Schema for creating a rent payment."""
+    kost_id: UUID
+    tenant_id: UUID
+    amount: int = Field(..., ge=0)
+    transaction_date: date
+
+
+class PaymentBatchCreate(BaseModel):
+    """Schema for recording many rent payments at once."""
+    payments: List[PaymentCreate] = Field(..., min_length=1, max_length=500)
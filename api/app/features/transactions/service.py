@@ -0,0 +1,262 @@
+"""
+Transactions service - shared transaction lookups and batch payments.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+import uuid
+
+from sqlalchemy import insert, select, tuple_, update
+from sqlalchemy.orm import Session, aliased
+
+from app.core.events import stage_write
+from app.core.exceptions import BadRequestException, NotFoundException
+from app.features.common.cursor import decode_cursor, encode_cursor
+from app.features.kosts.model import Kost
+from app.features.ledger.service import LedgerService
+from app.features.occupancy.service import OccupancyService, TenantState
+from app.features.tenants.model import Tenant
+from app.features.transactions.model import Transaction
+from app.features.transactions.schemas import PaymentCreate
+
+
+# Newest first; the keyset of tenant transaction pages.
+TENANT_HISTORY_ORDER = (Transaction.transaction_date, Transaction.created_at, Transaction.id)
+
+# Columns written by record_payments.
+PAYMENT_COLUMNS = (
+    "id", "kost_id", "tenant_id", "financial_class", "category", "amount",
+    "transaction_date", "description", "region_id", "is_frozen", "reference_id", "created_at",
+)
+
+
+class TransactionsService:
+    """Service class for transaction lookups shared by several write paths, and batch payments."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def frozen_deposits(self, tenant_ids: Iterable[UUID]) -> Dict[UUID, Transaction]:
+        """Latest frozen DP (deposit) transaction per tenant, in one query."""
+        tenant_ids = list({tenant_id for tenant_id in tenant_ids if tenant_id})
+        if not tenant_ids:
+            return {}
+        deposits = (
+            self.db.query(Transaction)
+            .filter(
+                Transaction.tenant_id.in_(tenant_ids),
+                Transaction.category == "dp",
+                Transaction.is_frozen == True,
+            )
+            .distinct(Transaction.tenant_id)
+            .order_by(Transaction.tenant_id, Transaction.transaction_date.desc(), Transaction.created_at.desc())
+            .all()
+        )
+        return {deposit.tenant_id: deposit for deposit in deposits}
+
+    def frozen_deposit(self, tenant_id: UUID) -> Optional[Transaction]:
+        """Latest frozen DP transaction of one tenant."""
+        return self.frozen_deposits([tenant_id]).get(tenant_id)
+
+    def tenant_history(
+        self,
+        tenant_id: UUID,
+        limit: int,
+        after: Optional[str] = None,
+    ) -> Tuple[List[Transaction], Optional[str]]:
+        """
+        A page of a tenant's transactions, newest first, continuing after
+        `after` (the previous page's next_cursor). Returns (items, next_cursor).
+        """
+        query = self.db.query(Transaction).filter(Transaction.tenant_id == tenant_id)
+        if after:
+            cursor = decode_cursor(after)
+            try:
+                key = (date.fromisoformat(cursor["d"]), datetime.fromisoformat(cursor["c"]), UUID(cursor["i"]))
+            except (KeyError, TypeError, ValueError):
+                raise BadRequestException(detail="Invalid cursor")
+            query = query.filter(tuple_(*TENANT_HISTORY_ORDER) < tuple_(*key))
+
+        items = (
+            query
+            .order_by(*(column.desc() for column in TENANT_HISTORY_ORDER))
+            .limit(limit + 1)
+            .all()
+        )
+        return self.history_page(items, limit)
+
+    @staticmethod
+    def latest_per_tenant(limit: int):
+        """
+        Transaction entity over a LATERAL subquery of the outer query's tenant's
+        `limit` newest transactions, in tenant_history order. Outer-join it on
+        true() to load a tenant and its first history page in one statement.
+        """
+        latest = (
+            select(Transaction)
+            .where(Transaction.tenant_id == Tenant.id)
+            .order_by(*(column.desc() for column in TENANT_HISTORY_ORDER))
+            .limit(limit)
+            .lateral("latest_transactions")
+        )
+        return aliased(Transaction, latest)
+
+    @staticmethod
+    def history_page(items: List[Transaction], limit: int) -> Tuple[List[Transaction], Optional[str]]:
+        """(items, next_cursor) from up to limit + 1 rows in tenant_history order."""
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            last = items[-1]
+            next_cursor = encode_cursor({
+                "d": last.transaction_date.isoformat(),
+                "c": last.created_at.isoformat(),
+                "i": str(last.id),
+            })
+        return items, next_cursor
+
+    def record_payments(self, payments: List[PaymentCreate]) -> List[Transaction]:
+        """
+        Record many rent payments with the same rows, ledger entries and status
+        changes as POST /transactions/payments, applied in request order.
+
+        Tenants are locked in id order (as in bulk status changes) so their
+        status and frozen DP are current. Kosts load in one query, new rows are
+        written with one multi-row insert and the batch commits once. Raises
+        404 (nothing written) if any tenant is not found in its kost. Returns
+        the stored rent transactions in request order.
+        """
+        tenants = {
+            tenant.id: tenant
+            for tenant in (
+                self.db.query(Tenant)
+                .filter(Tenant.id.in_({p.tenant_id for p in payments}))
+                .order_by(Tenant.id)
+                .populate_existing()
+                .with_for_update()
+                .all()
+            )
+        }
+        missing = [
+            index for index, payment in enumerate(payments)
+            if payment.tenant_id not in tenants or tenants[payment.tenant_id].kost_id != payment.kost_id
+        ]
+        if missing:
+            raise NotFoundException(f"Tenant not found (payments {', '.join(str(index) for index in missing)})")
+        kosts = {
+            kost.id: kost
+            for kost in self.db.query(Kost).filter(Kost.id.in_({p.kost_id for p in payments})).all()
+        }
+        deposits = self.frozen_deposits(tenant.id for tenant in tenants.values() if tenant.status == "dp")
+
+        ledger = LedgerService(self.db)
+        statuses = {tenant.id: tenant.status for tenant in tenants.values()}  # As of the payment being applied
+        created_at = datetime.now(timezone.utc)
+        new_rows = []
+        rent_ids = []
+        released = []  # Frozen DP rows released as revenue
+        status_changes = []  # (tenant_id, before, after)
+        written = defaultdict(set)  # (region_id, kost_id, transaction_date) -> tenant ids
+
+        for payment in payments:
+            tenant = tenants[payment.tenant_id]
+            kost = kosts.get(payment.kost_id)
+            region_id = kost.region_id if kost else None
+            tenant_status = statuses[tenant.id]
+
+            description = f"Pembayaran sewa dari {tenant.name}"
+            if tenant_status == "dp":
+                description = f"Pelunasan DP dari {tenant.name}"
+            rent_tx = Transaction(
+                id=uuid.uuid4(),
+                kost_id=payment.kost_id,
+                tenant_id=payment.tenant_id,
+                financial_class="REVENUE",
+                category="rent",
+                amount=payment.amount,
+                transaction_date=payment.transaction_date,
+                description=description,
+                region_id=region_id,
+                is_frozen=False,
+                created_at=created_at,
+            )
+            new_rows.append(rent_tx)
+            rent_ids.append(rent_tx.id)
+            ledger.add(rent_tx)
+            written[(region_id, payment.kost_id, payment.transaction_date)].add(tenant.id)
+
+            # A frozen DP is released as revenue and linked to the rent payment.
+            dp_tx = deposits.pop(tenant.id, None) if tenant_status == "dp" else None
+            if dp_tx:
+                key, amount = LedgerService.snapshot(dp_tx)
+                ledger.add_delta(key, -amount, -1)
+                ledger.add_delta(key._replace(financial_class="REVENUE", is_frozen=False, is_linked=True), amount, 1)
+                released.append({
+                    "id": dp_tx.id,
+                    "is_frozen": False,
+                    "financial_class": "REVENUE",
+                    "reference_id": rent_tx.id,
+                })
+
+            # Extra fees are contra expenses linked to the rent payment.
+            extra_fees = (tenant.trash_fee or 0) + (tenant.security_fee or 0) + (tenant.admin_fee or 0)
+            if extra_fees > 0:
+                fee_tx = Transaction(
+                    id=uuid.uuid4(),
+                    kost_id=payment.kost_id,
+                    tenant_id=payment.tenant_id,
+                    financial_class="EXPENSE",
+                    category="extra_fee",
+                    amount=extra_fees,
+                    transaction_date=payment.transaction_date,
+                    description=f"Biaya ekstra penyewa {tenant.name}",
+                    region_id=region_id,
+                    is_frozen=False,
+                    reference_id=rent_tx.id,
+                    created_at=created_at,
+                )
+                new_rows.append(fee_tx)
+                ledger.add(fee_tx)
+
+            if tenant_status in ("telat", "dp"):
+                statuses[tenant.id] = "aktif"
+                before = TenantState(tenant.kost_id, tenant_status, bool(tenant.is_active))
+                status_changes.append((tenant.id, before, before._replace(status="aktif")))
+
+        stored = {
+            tx.id: tx
+            for tx in self.db.scalars(
+                insert(Transaction).returning(Transaction, sort_by_parameter_order=True),
+                [{column: getattr(tx, column) for column in PAYMENT_COLUMNS} for tx in new_rows],
+            )
+        }
+        if released:
+            self.db.execute(update(Transaction), released)  # Bulk UPDATE by primary key
+        if status_changes:
+            self.db.execute(
+                update(Tenant)
+                .where(Tenant.id.in_([tenant_id for tenant_id, _, _ in status_changes]))
+                .values(status="aktif")
+            )
+            OccupancyService(self.db).record_many(status_changes, "payment")
+        ledger.apply()
+        # One event per kost and payment date, listing its tenants, so caches
+        # and the dashboard stream do one refresh for the whole group.
+        for (region_id, kost_id, transaction_date), tenant_ids in written.items():
+            stage_write(
+                self.db,
+                "transaction",
+                region_id=region_id,
+                kost_id=kost_id,
+                transaction_date=transaction_date,
+                tenant_ids=sorted(tenant_ids),
+            )
+        rent_txs = [stored[tx_id] for tx_id in rent_ids]
+        # Detached with the values RETURNING loaded, so the commit doesn't
+        # expire them and serializing them doesn't reload each row.
+        for tx in stored.values():
+            self.db.expunge(tx)
+        self.db.commit()
+        return rent_txs
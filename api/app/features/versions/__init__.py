@@ -0,0 +1,3 @@
+"""
+Data versions feature package.
+"""
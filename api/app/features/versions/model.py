@@ -0,0 +1,22 @@
+"""
+Data version model - SQLAlchemy ORM model.
+"""
+
+from sqlalchemy import Column, String, BigInteger, DateTime, func
+
+from app.db.base import Base
+
+
+class DataVersion(Base):
+    """
+    Write counter per scope ("global", "region:<id>", "kost:<id>").
+
+    Bumped in the same DB transaction as every staged write, so a scope's
+    version changes exactly when its data does.
+    """
+
+    __tablename__ = "data_versions"
+
+    scope = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -0,0 +1,87 @@
+"""
+Data version service - per-scope write counters for conditional GETs.
+"""
+
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import event, func, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.events import WriteEvent, pending_writes
+from app.features.versions.model import DataVersion
+
+
+SCOPE_GLOBAL = "global"
+
+
+def region_scope(region_id: UUID) -> str:
+    return f"region:{region_id}"
+
+
+def kost_scope(kost_id: UUID) -> str:
+    return f"kost:{kost_id}"
+
+
+def scopes_for(write: WriteEvent) -> List[str]:
+    """Scopes whose version a write bumps. Writes without a region bump the global scope."""
+    scopes = [region_scope(write.region_id) if write.region_id else SCOPE_GLOBAL]
+    if write.kost_id:
+        scopes.append(kost_scope(write.kost_id))
+    return scopes
+
+
+class DataVersionService:
+    """Reads and bumps data versions."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def bump(self, scopes: Iterable[str]) -> None:
+        """Increment each scope's version (sorted, so concurrent bumps lock rows in the same order)."""
+        scopes = sorted(set(scopes))
+        if not scopes:
+            return
+        stmt = pg_insert(DataVersion).values([{"scope": scope, "version": 1} for scope in scopes])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DataVersion.scope],
+            set_={"version": DataVersion.version + 1, "updated_at": func.now()},
+        )
+        self.db.execute(stmt)
+
+    def current(
+        self,
+        kost_id: UUID = None,
+        region_id: UUID = None,
+        region_ids: Optional[List[UUID]] = None,
+    ) -> Tuple[int, Optional[datetime]]:
+        """
+        Combined (version, last write time) of a read scope.
+
+        A kost or region scope also includes global writes; the all-regions
+        scope covers every region. The sum of counters only ever grows, so it
+        changes whenever any included scope is written.
+        """
+        if kost_id:
+            condition = DataVersion.scope.in_([kost_scope(kost_id), SCOPE_GLOBAL])
+        elif region_id:
+            condition = DataVersion.scope.in_([region_scope(region_id), SCOPE_GLOBAL])
+        elif region_ids is not None:
+            condition = DataVersion.scope.in_([region_scope(r) for r in region_ids] + [SCOPE_GLOBAL])
+        else:
+            condition = or_(DataVersion.scope.like("region:%"), DataVersion.scope == SCOPE_GLOBAL)
+
+        version, updated_at = self.db.query(
+            func.coalesce(func.sum(DataVersion.version), 0),
+            func.max(DataVersion.updated_at),
+        ).filter(condition).one()
+        return int(version), updated_at
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_pending_versions(session: Session) -> None:
+    writes = pending_writes(session)
+    if writes:
+        DataVersionService(session).bump(scope for write in writes for scope in scopes_for(write))
@@ -37,6 +37,7 @@ def create_application() -> FastAPI:
         allow_credentials=False,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Export-Cursor"],
     )
 
     # Routes: /api/{feature_name} (no v1)
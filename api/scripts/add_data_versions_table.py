@@ -0,0 +1,32 @@
+import sys
+import os
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.db.session import SessionLocal
+
+
+def add_data_versions_table():
+    """Per-scope write counters used for ETag/Last-Modified on GET endpoints."""
+    db = SessionLocal()
+    try:
+        print("Creating table data_versions...")
+        db.execute(text("""
+            CREATE TABLE IF NOT EXISTS data_versions (
+                scope VARCHAR PRIMARY KEY,
+                version BIGINT NOT NULL DEFAULT 0,
+                updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+        """))
+        db.commit()
+        print("Table created successfully.")
+    except Exception as e:
+        print(f"Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    add_data_versions_table()
@@ -0,0 +1,47 @@
+import sys
+import os
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.db.session import SessionLocal
+
+
+def add_kost_active_tenants():
+    """
+    kosts.active_tenants (active tenants per kost, used for capacity checks),
+    recounted from tenants. Safe to re-run to repair the counter.
+    """
+    db = SessionLocal()
+    try:
+        print("Adding kosts.active_tenants...")
+        db.execute(text("ALTER TABLE kosts ADD COLUMN IF NOT EXISTS active_tenants INTEGER NOT NULL DEFAULT 0"))
+
+        # Block tenant writes while counting so the counter starts exact.
+        db.execute(text("LOCK TABLE tenants IN SHARE MODE"))
+        result = db.execute(text("""
+            UPDATE kosts k
+            SET active_tenants = counts.active_tenants
+            FROM (
+                SELECT k2.id, count(t.id) AS active_tenants
+                FROM kosts k2
+                LEFT JOIN tenants t ON t.kost_id = k2.id AND t.is_active = true
+                GROUP BY k2.id
+            ) counts
+            WHERE counts.id = k.id AND k.active_tenants IS DISTINCT FROM counts.active_tenants
+        """))
+        print(f"Recounted {result.rowcount} kosts.")
+
+        db.execute(text("ALTER TABLE kosts DROP CONSTRAINT IF EXISTS kosts_active_tenants_check"))
+        db.execute(text("ALTER TABLE kosts ADD CONSTRAINT kosts_active_tenants_check CHECK (active_tenants >= 0)"))
+        db.commit()
+        print("Done.")
+    except Exception as e:
+        print(f"Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    add_kost_active_tenants()
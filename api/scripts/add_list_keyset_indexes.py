@@ -0,0 +1,49 @@
+import sys
+import os
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.db.session import SessionLocal
+
+
+INDEXES = {
+    "ix_tenants_created_id": "tenants (created_at DESC, id DESC)",
+    "ix_tenants_kost_created_id": "tenants (kost_id, created_at DESC, id DESC)",
+    "ix_kosts_created_id": "kosts (created_at DESC, id DESC)",
+    "ix_kosts_region_created_id": "kosts (region_id, created_at DESC, id DESC)",
+}
+
+
+TABLES = ["tenants", "kosts"]
+
+
+def add_list_keyset_indexes():
+    """
+    Composite indexes matching the (created_at, id) keyset order of the tenant
+    and kost lists. created_at is made NOT NULL first: keyset cursors cannot
+    encode NULL and row comparisons would skip those rows.
+    """
+    db = SessionLocal()
+    try:
+        for table in TABLES:
+            print(f"Making {table}.created_at NOT NULL...")
+            # NULLs sorted first in the old newest-first order; now() keeps them there.
+            result = db.execute(text(f"UPDATE {table} SET created_at = now() WHERE created_at IS NULL"))
+            print(f"Backfilled {result.rowcount} rows.")
+            db.execute(text(f"ALTER TABLE {table} ALTER COLUMN created_at SET DEFAULT now()"))
+            db.execute(text(f"ALTER TABLE {table} ALTER COLUMN created_at SET NOT NULL"))
+        for name, definition in INDEXES.items():
+            print(f"Creating index {name}...")
+            db.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}"))
+        db.commit()
+        print("Indexes created successfully.")
+    except Exception as e:
+        print(f"Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    add_list_keyset_indexes()
@@ -0,0 +1,42 @@
+import sys
+import os
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.db.session import SessionLocal
+
+
+def add_tenant_search_indexes():
+    """pg_trgm indexes behind tenant search and autocomplete (name, normalized phone digits)."""
+    db = SessionLocal()
+    try:
+        print("Enabling pg_trgm...")
+        db.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+        print("Adding tenants.phone_digits...")
+        db.execute(text(r"""
+            ALTER TABLE tenants ADD COLUMN IF NOT EXISTS phone_digits VARCHAR
+                GENERATED ALWAYS AS (regexp_replace(coalesce(phone, ''), '\D', '', 'g')) STORED
+        """))
+
+        print("Creating trigram indexes...")
+        db.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_tenants_name_trgm
+                ON tenants USING gin (name gin_trgm_ops)
+        """))
+        db.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_tenants_phone_digits_trgm
+                ON tenants USING gin (phone_digits gin_trgm_ops)
+        """))
+        db.commit()
+        print("Indexes created successfully.")
+    except Exception as e:
+        print(f"Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    add_tenant_search_indexes()
@@ -0,0 +1,30 @@
+import sys
+import os
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.db.session import SessionLocal
+
+
+def add_tenant_tracker_index():
+    """Index backing the tenant tracker's latest-rent-payment lookup per tenant."""
+    db = SessionLocal()
+    try:
+        print("Creating index ix_transactions_tenant_rent_date...")
+        db.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_transactions_tenant_rent_date
+                ON transactions (tenant_id, transaction_date DESC)
+                WHERE category = 'rent' AND financial_class = 'REVENUE' AND is_frozen = false
+        """))
+        db.commit()
+        print("Index created successfully.")
+    except Exception as e:
+        print(f"Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    add_tenant_tracker_index()
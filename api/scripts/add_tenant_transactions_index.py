@@ -0,0 +1,40 @@
+import sys
+import os
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.db.session import SessionLocal
+
+
+def add_tenant_transactions_index():
+    """
+    Index matching the newest-first keyset of a tenant's transaction pages.
+    created_at is made NOT NULL first, since page cursors encode it.
+    """
+    db = SessionLocal()
+    try:
+        print("Making transactions.created_at NOT NULL...")
+        result = db.execute(text("""
+            UPDATE transactions SET created_at = transaction_date::timestamptz WHERE created_at IS NULL
+        """))
+        print(f"Backfilled {result.rowcount} rows.")
+        db.execute(text("ALTER TABLE transactions ALTER COLUMN created_at SET DEFAULT now()"))
+        db.execute(text("ALTER TABLE transactions ALTER COLUMN created_at SET NOT NULL"))
+
+        print("Creating index ix_transactions_tenant_history...")
+        db.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_transactions_tenant_history
+                ON transactions (tenant_id, transaction_date DESC, created_at DESC, id DESC)
+        """))
+        db.commit()
+        print("Index created successfully.")
+    except Exception as e:
+        print(f"Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    add_tenant_transactions_index()
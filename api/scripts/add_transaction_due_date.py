@@ -0,0 +1,63 @@
+import sys
+import os
+import re
+from datetime import date
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.db.session import SessionLocal
+
+
+DUE_DATE_PATTERN = re.compile(r"due_date:(\d{4}-\d{2}-\d{2})")
+
+
+def parse_due_date(description):
+    """The due date DP descriptions used to carry as 'due_date:YYYY-MM-DD'."""
+    match = DUE_DATE_PATTERN.search(description or "")
+    if not match:
+        return None
+    try:
+        return date.fromisoformat(match.group(1))
+    except ValueError:
+        return None
+
+
+def add_transaction_due_date():
+    """transactions.due_date for DP deposits, backfilled from descriptions, plus the frozen-DP lookup index."""
+    db = SessionLocal()
+    try:
+        print("Adding transactions.due_date...")
+        db.execute(text("ALTER TABLE transactions ADD COLUMN IF NOT EXISTS due_date DATE"))
+
+        rows = db.execute(text("""
+            SELECT id, description
+            FROM transactions
+            WHERE category = 'dp' AND due_date IS NULL AND description LIKE '%due_date:%'
+        """)).all()
+        updates = [
+            {"id": row.id, "due_date": due_date}
+            for row in rows
+            if (due_date := parse_due_date(row.description))
+        ]
+        if updates:
+            db.execute(text("UPDATE transactions SET due_date = :due_date WHERE id = :id"), updates)
+        print(f"Backfilled {len(updates)} of {len(rows)} DP transactions.")
+
+        print("Creating index ix_transactions_tenant_frozen_dp...")
+        db.execute(text("""
+            CREATE INDEX IF NOT EXISTS ix_transactions_tenant_frozen_dp
+                ON transactions (tenant_id, transaction_date DESC, created_at DESC)
+                WHERE category = 'dp' AND is_frozen = true
+        """))
+        db.commit()
+        print("Done.")
+    except Exception as e:
+        print(f"Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    add_transaction_due_date()
@@ -0,0 +1,49 @@
+import sys
+import os
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.db.session import SessionLocal
+
+
+TABLES = ["tenants", "transactions"]
+
+
+def add_updated_at_columns():
+    """updated_at on tenants and transactions, kept current by a trigger, for delta exports."""
+    db = SessionLocal()
+    try:
+        db.execute(text("""
+            CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
+            BEGIN
+                NEW.updated_at = now();
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+        """))
+        for table in TABLES:
+            print(f"Adding {table}.updated_at...")
+            db.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ"))
+            # Existing rows count as changed when they were created.
+            db.execute(text(f"UPDATE {table} SET updated_at = COALESCE(created_at, now()) WHERE updated_at IS NULL"))
+            db.execute(text(f"ALTER TABLE {table} ALTER COLUMN updated_at SET DEFAULT now()"))
+            db.execute(text(f"ALTER TABLE {table} ALTER COLUMN updated_at SET NOT NULL"))
+            db.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_updated_at ON {table} (updated_at)"))
+            db.execute(text(f"DROP TRIGGER IF EXISTS trg_{table}_updated_at ON {table}"))
+            db.execute(text(f"""
+                CREATE TRIGGER trg_{table}_updated_at
+                    BEFORE UPDATE ON {table}
+                    FOR EACH ROW EXECUTE FUNCTION set_updated_at()
+            """))
+        db.commit()
+        print("Columns added successfully.")
+    except Exception as e:
+        print(f"Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    add_updated_at_columns()
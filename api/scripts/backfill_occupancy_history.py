@@ -0,0 +1,124 @@
+"""
+Create (if missing) the occupancy tables, seed tenant_status_history and
+build occupancy snapshots for past days.
+
+Tenants without any history get one seed row with their current state at
+created_at. Departures and status changes before this script ran are not
+known, so back-filled snapshots are an approximation; snapshots built by the
+nightly cron from then on are exact.
+
+Usage:
+    python scripts/backfill_occupancy_history.py              # last 62 days
+    python scripts/backfill_occupancy_history.py --days 400
+"""
+
+import argparse
+import sys
+import os
+from datetime import date, timedelta
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.db.session import SessionLocal
+import app.main  # noqa: F401  (registers all models)
+from app.features.occupancy.service import OccupancyService
+
+
+SCHEMA_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS tenant_status_history (
+        id BIGSERIAL PRIMARY KEY,
+        tenant_id UUID NOT NULL REFERENCES tenants(id),
+        kost_id UUID NOT NULL REFERENCES kosts(id) ON DELETE CASCADE,
+        from_status VARCHAR,
+        to_status VARCHAR NOT NULL,
+        from_active BOOLEAN,
+        to_active BOOLEAN NOT NULL,
+        source VARCHAR NOT NULL,
+        changed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_tenant_status_history_tenant_changed
+        ON tenant_status_history (tenant_id, changed_at)
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_tenant_status_history_changed ON tenant_status_history (changed_at)",
+    """
+    CREATE TABLE IF NOT EXISTS occupancy_snapshots (
+        id BIGSERIAL PRIMARY KEY,
+        snapshot_date DATE NOT NULL,
+        kost_id UUID NOT NULL REFERENCES kosts(id) ON DELETE CASCADE,
+        region_id UUID REFERENCES regions(id),
+        total_units INTEGER NOT NULL DEFAULT 0,
+        occupied INTEGER NOT NULL DEFAULT 0,
+        active_tenants INTEGER NOT NULL DEFAULT 0,
+        late_tenants INTEGER NOT NULL DEFAULT 0,
+        dp_tenants INTEGER NOT NULL DEFAULT 0,
+        CONSTRAINT uq_occupancy_snapshots_date_kost UNIQUE (snapshot_date, kost_id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_occupancy_snapshots_kost_date ON occupancy_snapshots (kost_id, snapshot_date)",
+    "CREATE INDEX IF NOT EXISTS ix_occupancy_snapshots_region_date ON occupancy_snapshots (region_id, snapshot_date)",
+    # Tables created before the kost foreign keys cascaded: deleting a kost must
+    # not be blocked by its nightly snapshots or history rows.
+    """
+    ALTER TABLE tenant_status_history
+        DROP CONSTRAINT IF EXISTS tenant_status_history_kost_id_fkey,
+        ADD CONSTRAINT tenant_status_history_kost_id_fkey
+            FOREIGN KEY (kost_id) REFERENCES kosts(id) ON DELETE CASCADE
+    """,
+    """
+    ALTER TABLE occupancy_snapshots
+        DROP CONSTRAINT IF EXISTS occupancy_snapshots_kost_id_fkey,
+        ADD CONSTRAINT occupancy_snapshots_kost_id_fkey
+            FOREIGN KEY (kost_id) REFERENCES kosts(id) ON DELETE CASCADE
+    """,
+]
+
+SEED_SQL = """
+    INSERT INTO tenant_status_history
+        (tenant_id, kost_id, from_status, to_status, from_active, to_active, source, changed_at)
+    SELECT t.id, t.kost_id, NULL, t.status, NULL, t.is_active, 'backfill', COALESCE(t.created_at, now())
+    FROM tenants t
+    WHERE NOT EXISTS (
+        SELECT 1 FROM tenant_status_history h WHERE h.tenant_id = t.id
+    )
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Back-fill tenant status history and occupancy snapshots.")
+    parser.add_argument("--days", type=int, default=62, help="Number of past days to snapshot (up to yesterday)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print("Ensuring occupancy schema...")
+        for statement in SCHEMA_SQL:
+            db.execute(text(statement))
+        db.commit()
+
+        seeded = db.execute(text(SEED_SQL)).rowcount
+        db.commit()
+        print(f"Seeded history for {seeded} tenant(s).")
+
+        service = OccupancyService(db)
+        yesterday = date.today() - timedelta(days=1)
+        for offset in range(args.days - 1, -1, -1):
+            snapshot_date = yesterday - timedelta(days=offset)
+            rows = service.build_snapshot(snapshot_date)
+            db.commit()
+            print(f"  {snapshot_date}: {rows} kost(s)")
+        print("Done.")
+    except Exception as e:
+        print(f"Error: {e}")
+        db.rollback()
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import sys
+import os
+import argparse
+from uuid import UUID
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.exceptions import BadRequestException
+from app.db.session import SessionLocal
+from app.features.tenants.importer import read_import_rows
+from app.features.tenants.service import TenantsService
+
+
+def import_tenants(path, region_id=None, dry_run=False, all_or_nothing=False):
+    """Bulk-import tenants from a .csv or .xlsx file (same rules as POST /api/tenants/import)."""
+    db = SessionLocal()
+    try:
+        with open(path, "rb") as fileobj:
+            report = TenantsService(db).bulk_create(
+                read_import_rows(fileobj, path),
+                region_id=region_id,
+                dry_run=dry_run,
+                all_or_nothing=all_or_nothing,
+            )
+        for error in report["errors"]:
+            print(f"Row {error['row']}: {'; '.join(error['errors'])}")
+        action = "Validated" if dry_run else "Imported"
+        count = report["valid_rows"] if dry_run else report["imported"]
+        print(f"{action} {count} of {report['total_rows']} rows ({len(report['errors'])} with errors).")
+    except BadRequestException as e:
+        print(f"Error: {e.detail}")
+        db.rollback()
+    except Exception as e:
+        print(f"Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import tenants from a CSV/XLSX file")
+    parser.add_argument("path")
+    parser.add_argument("--region-id", type=UUID, help="Only accept kosts in this region")
+    parser.add_argument("--dry-run", action="store_true", help="Validate only")
+    parser.add_argument("--all-or-nothing", action="store_true", help="Import nothing if any row is invalid")
+    args = parser.parse_args()
+    import_tenants(args.path, args.region_id, args.dry_run, args.all_or_nothing)
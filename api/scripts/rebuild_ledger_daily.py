@@ -0,0 +1,120 @@
+"""
+Create (if missing) and rebuild the ledger_daily rollup from transactions.
+
+Each kost is rebuilt in its own DB transaction, several kosts in parallel.
+Region-level rows (expenses without a kost) are rebuilt as one extra unit.
+Writes that commit while a kost is being rebuilt can be missed, so run it
+during a quiet period (or re-run it for the affected kosts).
+
+Usage:
+    python scripts/rebuild_ledger_daily.py                 # all kosts
+    python scripts/rebuild_ledger_daily.py --workers 8
+    python scripts/rebuild_ledger_daily.py --kost-id <uuid> --kost-id <uuid>
+"""
+
+import argparse
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from uuid import UUID
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from app.db.session import SessionLocal
+import app.main  # noqa: F401  (registers all models)
+from app.features.kosts.model import Kost
+from app.features.ledger.service import LedgerService
+
+
+SCHEMA_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS ledger_daily (
+        id BIGSERIAL PRIMARY KEY,
+        region_id UUID REFERENCES regions(id),
+        kost_id UUID REFERENCES kosts(id),
+        ledger_date DATE NOT NULL,
+        financial_class financial_class NOT NULL,
+        category VARCHAR,
+        is_frozen BOOLEAN NOT NULL DEFAULT false,
+        is_linked BOOLEAN NOT NULL DEFAULT false,
+        amount BIGINT NOT NULL DEFAULT 0,
+        tx_count INTEGER NOT NULL DEFAULT 0,
+        CONSTRAINT uq_ledger_daily_key UNIQUE NULLS NOT DISTINCT
+            (region_id, kost_id, ledger_date, financial_class, category, is_frozen, is_linked)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_ledger_daily_region_date ON ledger_daily (region_id, ledger_date)",
+    "CREATE INDEX IF NOT EXISTS ix_ledger_daily_kost_date ON ledger_daily (kost_id, ledger_date)",
+    # Outstanding deposits are still read from transactions (distinct tenant count).
+    """
+    CREATE INDEX IF NOT EXISTS ix_transactions_frozen_dp
+        ON transactions (region_id, kost_id)
+        WHERE category = 'dp' AND is_frozen = true
+    """,
+]
+
+
+def ensure_schema():
+    db = SessionLocal()
+    try:
+        for statement in SCHEMA_SQL:
+            db.execute(text(statement))
+        db.commit()
+    finally:
+        db.close()
+
+
+def rebuild_unit(kost_id):
+    db = SessionLocal()
+    try:
+        rows = LedgerService(db).rebuild_kost(kost_id)
+        db.commit()
+        return kost_id, rows
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the ledger_daily rollup.")
+    parser.add_argument("--kost-id", action="append", type=UUID, default=[], help="Only rebuild these kosts")
+    parser.add_argument("--workers", type=int, default=4, help="Number of kosts rebuilt in parallel")
+    args = parser.parse_args()
+
+    print("Ensuring ledger_daily schema...")
+    ensure_schema()
+
+    if args.kost_id:
+        units = list(args.kost_id)
+    else:
+        db = SessionLocal()
+        try:
+            units = [row[0] for row in db.query(Kost.id).all()]
+        finally:
+            db.close()
+        units.append(None)  # region-level rows
+
+    print(f"Rebuilding {len(units)} unit(s) with {args.workers} worker(s)...")
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        futures = {executor.submit(rebuild_unit, unit): unit for unit in units}
+        for future in as_completed(futures):
+            unit = futures[future]
+            label = unit or "region-level"
+            try:
+                _, rows = future.result()
+                print(f"  {label}: {rows} row(s)")
+            except Exception as e:
+                failed += 1
+                print(f"  {label}: Error: {e}")
+
+    print("Done." if not failed else f"Done with {failed} error(s).")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()